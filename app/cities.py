@@ -0,0 +1,95 @@
+import glob
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.config import config
+from app.lazy import Lazy
+
+
+class CityProfile(BaseModel):
+    """Everything the MCP tools need to know about one supported city."""
+
+    name: str
+    lat: float
+    lon: float
+
+    # Overpass search area, most specific first: a precomputed area ID
+    # (3600000000 + OSM relation ID), a (south, west, north, east) bounding
+    # box, or an area name that Overpass resolves on every query.
+    overpass_area_id: Optional[int] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    overpass_area_name: Optional[str] = None
+
+    # Average effective city speed used by the travel-time heuristic
+    avg_speed_kmh: float = 25
+
+    rag_sources: List[str] = []
+    poi_snapshot_path: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return city_key(self.name)
+
+
+def city_key(city: str) -> str:
+    return (city or "").strip().lower()
+
+
+def load_city_profile(path: str) -> CityProfile:
+    with open(path, "r", encoding="utf-8") as f:
+        return CityProfile.model_validate(json.load(f))
+
+
+class CityRegistry:
+    """
+    Supported cities, one JSON profile per city in `directory`.
+
+    Only the directory listing is read up front; each profile is parsed on
+    first use and cached on its own, so adding a city costs nothing until
+    someone asks for it.
+    """
+
+    def __init__(self, directory: str = config.CITIES_DIR):
+        self.directory = directory
+        self._profiles: Dict[str, Lazy[CityProfile]] = {}
+        self._listed = False
+        self._lock = threading.Lock()
+
+    def _list(self) -> Dict[str, Lazy[CityProfile]]:
+        if not self._listed:
+            with self._lock:
+                if not self._listed:
+                    for path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+                        key = city_key(os.path.splitext(os.path.basename(path))[0])
+                        self._profiles[key] = Lazy(lambda path=path: load_city_profile(path))
+                    self._listed = True
+        return self._profiles
+
+    def names(self) -> List[str]:
+        return list(self._list())
+
+    def __contains__(self, city: str) -> bool:
+        return city_key(city) in self._list()
+
+    def get(self, city: str) -> CityProfile:
+        profile = self._list().get(city_key(city))
+        if profile is None:
+            supported = ", ".join(name.title() for name in self.names())
+            raise ValueError(f"Unsupported city: {city}. Supported cities: {supported}.")
+        return profile.get()
+
+    def reset(self):
+        with self._lock:
+            self._profiles.clear()
+            self._listed = False
+
+
+city_registry = CityRegistry()
+
+
+def get_city(city: str) -> CityProfile:
+    return city_registry.get(city)
@@ -18,6 +18,70 @@ class Config:
     
     # API Keys
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+    # POI Store Configuration
+    OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+    OVERPASS_TIMEOUT = int(os.getenv("OVERPASS_TIMEOUT", "25"))
+    POI_STORE_PATH = os.getenv("POI_STORE_PATH", "data/poi_store.sqlite3")
+    POI_SNAPSHOT_PATH = os.getenv("POI_SNAPSHOT_PATH")  # DEFAULT_CITY only; other cities set poi_snapshot_path
+    POI_STORE_REFRESH_SECONDS = int(os.getenv("POI_STORE_REFRESH_SECONDS", "86400"))
+    POI_STORE_REFRESH_LIMIT = int(os.getenv("POI_STORE_REFRESH_LIMIT", "500"))  # per interest
+    POI_STORE_RETRY_SECONDS = int(os.getenv("POI_STORE_RETRY_SECONDS", "300"))  # after a failed refresh
+    POI_CACHE_MAX_ENTRIES = int(os.getenv("POI_CACHE_MAX_ENTRIES", "256"))
+    POI_CACHE_TTL_SECONDS = int(os.getenv("POI_CACHE_TTL_SECONDS", "900"))
+    POI_CACHE_STALE_SECONDS = int(os.getenv("POI_CACHE_STALE_SECONDS", "3600"))
+    POI_RANKING_CANDIDATE_FACTOR = int(os.getenv("POI_RANKING_CANDIDATE_FACTOR", "4"))  # candidates searched per POI kept
+    POI_DIVERSITY_PENALTY = float(os.getenv("POI_DIVERSITY_PENALTY", "0.5"))  # per POI already picked from a category
+    
+    # Itinerary Builder Configuration
+    ITINERARY_BUILDER_MODE = os.getenv("ITINERARY_BUILDER_MODE", "greedy")  # greedy | optimized
+    OPTIMIZER_TIME_BUDGET_MS = float(os.getenv("OPTIMIZER_TIME_BUDGET_MS", "50"))
+    SPATIAL_INDEX_CELL_KM = float(os.getenv("SPATIAL_INDEX_CELL_KM", "1"))  # grid cell edge for POI lookups
+    DURATION_MODEL_PATH = os.getenv("DURATION_MODEL_PATH", "data/duration_model.json")  # built-in defaults if missing
+    
+    # Intent Cache Configuration
+    INTENT_CACHE_MAX_ENTRIES = int(os.getenv("INTENT_CACHE_MAX_ENTRIES", "1024"))
+    INTENT_CACHE_TTL_SECONDS = int(os.getenv("INTENT_CACHE_TTL_SECONDS", "3600"))
+    INTENT_NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv("INTENT_NEGATIVE_CACHE_TTL_SECONDS", "30"))
+    
+    # City Registry Configuration
+    CITIES_DIR = os.getenv("CITIES_DIR", "data/cities")
+    DEFAULT_CITY = os.getenv("DEFAULT_CITY", "Delhi")
+    
+    # Weather Cache Configuration
+    WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "256"))
+    WEATHER_CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL_SECONDS", "1800"))
+    WEATHER_CACHE_STALE_SECONDS = int(os.getenv("WEATHER_CACHE_STALE_SECONDS", "86400"))
+    WEATHER_BUCKET_DECIMALS = int(os.getenv("WEATHER_BUCKET_DECIMALS", "1"))  # 0.1 deg ~ 11 km
+    
+    # RAG Configuration
+    RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", "data/rag_index")
+    
+    # Trip Session Configuration
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # memory | sqlite
+    SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "data/sessions.sqlite3")
+    SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+    
+    # Background Job Configuration
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH", "data/jobs.sqlite3")
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "2"))
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+    EXPORT_BATCH_MAX_RECIPIENTS = int(os.getenv("EXPORT_BATCH_MAX_RECIPIENTS", "200"))
+    
+    # Outbound HTTP Configuration
+    OPEN_METEO_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+    HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+    
+    # Startup Configuration
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
     
     # Backend Configuration
     BACKEND_HOST = os.getenv("BACKEND_HOST", "localhost")
@@ -1,21 +1,33 @@
-from app.state import TripState
-from typing import Dict, Any
+from app.state import DayPlan, TripState
+from typing import Dict, Any, Sequence, Union
 
 
 def evaluate_edit_correctness(
-    before: TripState,
+    before: Union[TripState, Sequence[DayPlan]],
     after: TripState,
     intended_day: int
 ) -> Dict[str, Any]:
+    """
+    Compare a trip (or its snapshot() taken before the edit) with the edited
+    trip. Days are compared by identity, then by fingerprint, so unchanged
+    days shared with the snapshot cost nothing.
+    """
 
-    before_dict = before.dict()
-    after_dict = after.dict()
+    before_days = before.days if isinstance(before, TripState) else before
+    after_days = after.days
 
     changed_days = []
     unexpected_changes = []
 
-    for i in range(len(before_dict["days"])):
-        if before_dict["days"][i] != after_dict["days"][i]:
+    for i in range(max(len(before_days), len(after_days))):
+        if i >= len(before_days) or i >= len(after_days):
+            changed_days.append(i + 1)
+            continue
+
+        before_day = before_days[i]
+        after_day = after_days[i]
+
+        if before_day is not after_day and before_day.fingerprint != after_day.fingerprint:
             changed_days.append(i + 1)
 
     for day in changed_days:
@@ -28,4 +40,4 @@ def evaluate_edit_correctness(
         "changed_days": changed_days,
         "unexpected_changes": unexpected_changes,
         "status": status
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,102 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import config
+from app.jobs import JobQueue
+from app.logging_config import logger, log_webhook_call
+from app.mcp.http_client import http_client
+from app.state import TripState
+
+
+EXPORT_JOB = "export_itinerary"
+
+
+def export_payload(email: str, trip: TripState) -> Dict[str, Any]:
+    return {
+        "email": email,
+        "trip": trip.public_dict()
+    }
+
+
+def enqueue_export(queue: JobQueue, email: str, trip: TripState) -> str:
+    """Queue a webhook export of the trip as it is now."""
+    return queue.enqueue(EXPORT_JOB, export_payload(email, trip))
+
+
+def enqueue_export_batch(queue: JobQueue, emails: List[str], trip: TripState) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Queue one export job per distinct recipient, in one transaction. The
+    trip is serialized and stored once for the batch; each recipient is
+    retried and dead-lettered on its own by the job workers.
+    """
+
+    recipients = list(dict.fromkeys(emails))
+    batch_id, job_ids = queue.enqueue_batch(
+        EXPORT_JOB, {"trip": trip.public_dict()}, [{"email": email} for email in recipients]
+    )
+
+    return batch_id, [{"email": email, "job_id": job_id} for email, job_id in zip(recipients, job_ids)]
+
+
+# Job status as a recipient sees it
+RECIPIENT_STATUS = {"queued": "pending", "running": "pending", "succeeded": "sent", "dead": "failed"}
+
+
+def export_batch_status(queue: JobQueue, batch_id: str) -> Optional[Dict[str, Any]]:
+    """Per-recipient outcome of a batch export, or None for an unknown batch."""
+
+    jobs = queue.batch(batch_id)
+    if jobs is None:
+        return None
+
+    recipients = [
+        {
+            "email": job["payload"]["email"],
+            "job_id": job["job_id"],
+            "status": RECIPIENT_STATUS[job["status"]],
+            "attempts": job["attempts"],
+            "error": job["last_error"] if job["status"] != "succeeded" else None
+        }
+        for job in jobs
+    ]
+
+    counts = dict.fromkeys(("sent", "failed", "pending"), 0)
+    for recipient in recipients:
+        counts[recipient["status"]] += 1
+
+    return {"batch_id": batch_id, **counts, "recipients": recipients}
+
+
+async def send_export(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Job handler: one webhook attempt. Retries are the queue's job, so the
+    HTTP client does not retry here; any non-2xx response fails the attempt.
+    """
+
+    start_time = time.time()
+
+    try:
+        response = await http_client.post(
+            config.N8N_WEBHOOK_URL,
+            json=payload,
+            timeout=config.REQUEST_TIMEOUT,
+            retries=0
+        )
+        response.raise_for_status()
+
+    except httpx.HTTPError:
+        log_webhook_call(logger, config.N8N_WEBHOOK_URL, "error", time.time() - start_time)
+        raise
+
+    log_webhook_call(logger, config.N8N_WEBHOOK_URL, "success", time.time() - start_time)
+
+    return {
+        "email": payload["email"],
+        "status": "sent",
+        "webhook_response": response.text[:200]  # Limit response size
+    }
+
+
+EXPORT_HANDLERS = {EXPORT_JOB: send_export}
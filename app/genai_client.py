@@ -0,0 +1,22 @@
+import os
+from dotenv import load_dotenv
+
+from app.lazy import Lazy
+
+load_dotenv()
+
+
+def _configure():
+    # Imported here: the SDK alone adds seconds to worker startup
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai
+
+
+_genai = Lazy(_configure)
+
+
+def get_genai():
+    """The configured google.generativeai module, imported on first use."""
+    return _genai.get()
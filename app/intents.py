@@ -1,13 +1,22 @@
-import os
+import copy
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
+import re
+import threading
 
-load_dotenv()
+from app.cities import city_registry
+from app.config import config
+from app.genai_client import get_genai
+from app.lazy import Lazy
+from app.mcp.cache import TTLCache
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+MODEL_NAME = "models/gemini-flash-latest"
+
+_model = Lazy(lambda: get_genai().GenerativeModel(MODEL_NAME))
+
+
+def get_model():
+    return _model.get()
 
-model = genai.GenerativeModel("models/gemini-flash-latest")
 
 SYSTEM_PROMPT = """
 You are an intent classifier for a travel planning system.
@@ -54,10 +63,218 @@ def clean_json_response(text: str):
     return text.strip()
 
 
+# Successful classifications, keyed on the normalized utterance
+intent_cache = TTLCache(
+    maxsize=config.INTENT_CACHE_MAX_ENTRIES,
+    ttl=config.INTENT_CACHE_TTL_SECONDS
+)
+
+# Failed classifications, kept briefly so a failing utterance isn't retried in a loop
+intent_failure_cache = TTLCache(
+    maxsize=config.INTENT_CACHE_MAX_ENTRIES,
+    ttl=config.INTENT_NEGATIVE_CACHE_TTL_SECONDS
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_utterance(text: str) -> str:
+    """Fold case, punctuation and whitespace: "Make Day 2 relaxed!" -> "make day 2 relaxed"."""
+    text = _PUNCTUATION.sub(" ", (text or "").casefold())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+# Rule-based fast path -------------------------------------------------------
+
+PACE_WORDS = {
+    "relaxed": "relaxed", "relax": "relaxed", "relaxing": "relaxed", "easy": "relaxed",
+    "slow": "relaxed", "slower": "relaxed", "leisurely": "relaxed", "chill": "relaxed", "lighter": "relaxed",
+    "moderate": "moderate", "normal": "moderate", "balanced": "moderate", "medium": "moderate",
+    "packed": "packed", "busy": "packed", "busier": "packed", "fast": "packed", "faster": "packed",
+    "intense": "packed", "full": "packed", "hectic": "packed",
+}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7,
+    "1st": 1, "2nd": 2, "3rd": 3, "4th": 4, "5th": 5, "6th": 6, "7th": 7,
+}
+
+INTEREST_WORDS = {
+    "history": "history", "historical": "history", "heritage": "history",
+    "museum": "history", "museums": "history", "monuments": "history",
+    "culture": "culture", "cultural": "culture", "temple": "culture", "temples": "culture",
+    "religious": "culture", "mosque": "culture", "mosques": "culture",
+    "food": "food", "foodie": "food", "eat": "food", "eating": "food",
+    "restaurant": "food", "restaurants": "food", "cuisine": "food",
+    "nature": "nature", "park": "nature", "parks": "nature", "garden": "nature", "gardens": "nature",
+}
+
+# Words that follow "to/in/for" without naming a city
+_NOT_CITIES = {"a", "an", "the", "my", "me", "us", "our", "see", "go", "do", "be", "explore", "spend"}
+
+# A target containing these is a question, not a place name
+_QUESTION_WORDS = {"why", "how", "is", "are", "was", "this", "that", "doable", "feasible", "possible", "realistic"}
+
+_NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+_DAY_REF = re.compile(r"\bday " + _NUMBER + r"\b|\b" + _NUMBER + r" day\b")
+_TRIP_LENGTH = re.compile(r"\b" + _NUMBER + r" days?\b|\b" + _NUMBER + r" day (trip|itinerary|plan)\b")
+_CITY = re.compile(r"\b(?:to|in|of|around|visit|visiting|for) ([a-z]+)\b")
+_PLAN_WORDS = re.compile(r"\b(plan|trip|itinerary|visit|visiting|travel)\b")
+_EDIT_WORDS = re.compile(r"\b(make|change|set|switch|update|edit|turn)\b")
+_EXPLAIN_WORDS = re.compile(r"\b(explain|why|doable|feasible|realistic|possible)\b|^tell me about\b")
+_PLAN_TARGET = re.compile(r"\b(plan|itinerary|trip|schedule|it)\b")
+_EXPLAIN_TARGET = re.compile(r"^(?:please )?(?:explain|tell me about|why (?:is|was|did you (?:pick|choose|include|add)))(?: the)? (.+?)(?: (?:chosen|picked|included|added|selected|in the plan|in my plan))?$")
+
+# Below this the utterance goes to the LLM
+RULES_MIN_CONFIDENCE = 0.8
+
+
+def _to_number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _first_group(match) -> str:
+    return next(group for group in match.groups() if group and group not in ("trip", "itinerary", "plan"))
+
+
+def parse_intent_rules(normalized: str):
+    """
+    Deterministic parser for the regular phrasings of PLAN, EDIT_DAY_PACE
+    and EXPLAIN. Takes a normalize_utterance() string and returns
+    (intent_data or None, confidence in [0, 1]).
+    """
+
+    words = normalized.split()
+    paces = {PACE_WORDS[word] for word in words if word in PACE_WORDS}
+    pace = next(iter(paces)) if len(paces) == 1 else None
+
+    # EXPLAIN: questions about the plan or a place in it
+    if _EXPLAIN_WORDS.search(normalized):
+        if _PLAN_TARGET.search(normalized) and not _EXPLAIN_TARGET.match(normalized):
+            return {"intent": "EXPLAIN", "target": "plan"}, 0.9
+
+        target = _EXPLAIN_TARGET.match(normalized)
+        if target:
+            name = target.group(1)
+            if _PLAN_TARGET.fullmatch(name) or name in ("plan", "whole plan", "whole itinerary"):
+                return {"intent": "EXPLAIN", "target": "plan"}, 0.9
+            if _QUESTION_WORDS.intersection(name.split()):
+                return None, 0.5
+            return {"intent": "EXPLAIN", "target": name}, 0.85
+
+        return None, 0.3
+
+    day_ref = _DAY_REF.search(normalized)
+    trip_length = _TRIP_LENGTH.search(normalized)
+
+    # EDIT_DAY_PACE: "make day 2 relaxed", "change the second day to packed"
+    if day_ref and not _PLAN_WORDS.search(normalized):
+        day = _to_number(_first_group(day_ref))
+        if pace and (_EDIT_WORDS.search(normalized) or len(words) <= 4):
+            return {"intent": "EDIT_DAY_PACE", "day": day, "pace": pace}, 0.95
+        return None, 0.4
+
+    # PLAN: "plan a 3 day relaxed trip to delhi for history and food"
+    if _PLAN_WORDS.search(normalized):
+        if not trip_length:
+            return None, 0.5
+
+        cities = [
+            c for c in _CITY.findall(normalized)
+            if c not in INTEREST_WORDS and c not in PACE_WORDS and c not in _NOT_CITIES
+        ]
+        known = [c for c in cities if c in city_registry]
+        if cities and not known:
+            # Unknown or unsupported city names are left to the LLM
+            return None, 0.5
+
+        interests = []
+        for word in words:
+            interest = INTEREST_WORDS.get(word)
+            if interest and interest not in interests:
+                interests.append(interest)
+
+        confidence = 0.95
+        if not pace:
+            confidence -= 0.05
+        if not interests:
+            confidence -= 0.05
+
+        return {
+            "intent": "PLAN",
+            "city": city_registry.get(known[0]).name if known else config.DEFAULT_CITY,
+            "interests": interests or ["history", "culture"],
+            "days": _to_number(_first_group(trip_length)),
+            "pace": pace or "moderate"
+        }, round(confidence, 2)
+
+    return None, 0.0
+
+
+def intent_cache_stats():
+    return {
+        "intents": intent_cache.stats(),
+        "intent_failures": intent_failure_cache.stats(),
+        "intent_paths": _path_counts()
+    }
+
+
+# How each classify_intent call was answered: rules | cache | llm.
+# Called from FastAPI's threadpool, so counts are updated under a lock.
+intent_path_counts = {"rules": 0, "cache": 0, "llm": 0}
+_path_counts_lock = threading.Lock()
+
+
+def _count_path(path: str):
+    with _path_counts_lock:
+        intent_path_counts[path] += 1
+
+
+def _path_counts():
+    with _path_counts_lock:
+        return dict(intent_path_counts)
+
+
 def classify_intent(user_text: str):
+    """
+    Classify an utterance. The result carries "path": "rules" when the
+    local parser was confident, "cache" for a repeated utterance and
+    "llm" when Gemini was called.
+    """
+
+    key = normalize_utterance(user_text)
+
+    parsed, confidence = parse_intent_rules(key)
+    if parsed is not None and confidence >= RULES_MIN_CONFIDENCE:
+        _count_path("rules")
+        return {**parsed, "path": "rules", "confidence": confidence}
+
+    cached = intent_cache.get(key)
+    if cached is None:
+        cached = intent_failure_cache.get(key)
+
+    if cached is not None:
+        _count_path("cache")
+        # Callers may mutate the result; the cached one stays untouched
+        return {**copy.deepcopy(cached), "path": "cache"}
+
+    _count_path("llm")
+    result = _classify_with_llm(user_text)
+
+    if "error" in result:
+        intent_failure_cache.set(key, result)
+    else:
+        intent_cache.set(key, result)
+
+    return {**copy.deepcopy(result), "path": "llm"}
+
+
+def _classify_with_llm(user_text: str):
 
     try:
-        response = model.generate_content(
+        response = get_model().generate_content(
             SYSTEM_PROMPT + "\nUser: " + user_text,
             request_options={"timeout": 10}
         )
@@ -0,0 +1,414 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import config
+from app.logging_config import logger, log_error
+
+
+JOB_STATUSES = ("queued", "running", "succeeded", "dead")
+
+
+class JobQueue:
+    """
+    Durable SQLite job queue.
+
+    Jobs survive restarts: a job left "running" by a crashed worker is
+    claimed again once its lease expires, and dead-lettered instead if
+    that was its last attempt. Only the worker holding the current lease
+    can record an outcome. A failed attempt is retried with
+    exponential backoff; after `max_attempts` the job is copied to the
+    dead_letters table and marked "dead". Jobs enqueued as a batch share
+    one stored copy of the payload fields they have in common.
+    """
+
+    def __init__(
+        self,
+        path: str = config.JOB_DB_PATH,
+        max_attempts: int = config.JOB_MAX_ATTEMPTS,
+        retry_backoff: float = config.JOB_RETRY_BACKOFF,
+        lease_seconds: float = config.JOB_LEASE_SECONDS
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                run_at REAL NOT NULL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                batch_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (status, run_at);
+            CREATE TABLE IF NOT EXISTS job_batches (
+                batch_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                shared TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                failed_at REAL NOT NULL
+            );
+            """
+        )
+        # Queues created before batches existed
+        if "batch_id" not in {column["name"] for column in conn.execute("PRAGMA table_info(jobs)")}:
+            conn.execute("ALTER TABLE jobs ADD COLUMN batch_id TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch_id)")
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> str:
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        self._connect().execute(
+            "INSERT INTO jobs (job_id, kind, payload, status, max_attempts, run_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), max_attempts or self.max_attempts, now, now, now)
+        )
+
+        return job_id
+
+    def enqueue_batch(
+        self,
+        kind: str,
+        shared: Dict[str, Any],
+        payloads: List[Dict[str, Any]],
+        max_attempts: Optional[int] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        One job per payload, in one transaction. `shared` is serialized and
+        stored once for the whole batch; each job runs with its own payload
+        merged over it. Returns the batch ID and the job IDs.
+        """
+
+        batch_id = uuid.uuid4().hex
+        job_ids = [uuid.uuid4().hex for _ in payloads]
+        now = time.time()
+        attempts = max_attempts or self.max_attempts
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO job_batches (batch_id, kind, shared, created_at) VALUES (?, ?, ?, ?)",
+                (batch_id, kind, json.dumps(shared), now)
+            )
+            conn.executemany(
+                "INSERT INTO jobs (job_id, kind, payload, status, max_attempts, run_at, created_at, updated_at, batch_id) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                [
+                    (job_id, kind, json.dumps(payload), attempts, now, now, now, batch_id)
+                    for job_id, payload in zip(job_ids, payloads)
+                ]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return batch_id, job_ids
+
+    def claim(self, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        """Lease the oldest due job of one of `kinds`, or None when idle."""
+
+        conn = self._connect()
+        now = time.time()
+        placeholders = ",".join("?" * len(kinds))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = conn.execute(
+                    f"SELECT * FROM jobs WHERE kind IN ({placeholders}) AND run_at <= ? "
+                    "AND (status = 'queued' OR status = 'running') "
+                    "ORDER BY run_at LIMIT 1",
+                    (*kinds, now)
+                ).fetchone()
+
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                # A running job's run_at is its lease expiry; it is only
+                # reclaimed if its worker died without reporting back, and
+                # a job that keeps killing its workers runs out of attempts
+                if row["status"] == "running" and row["attempts"] >= row["max_attempts"]:
+                    self._dead_letter(
+                        conn, dict(row), row["last_error"] or "Lease expired on the last attempt", now
+                    )
+                    continue
+
+                lease = now + self.lease_seconds
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, run_at = ?, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (lease, now, row["job_id"])
+                )
+                conn.execute("COMMIT")
+                break
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        job = dict(row)
+        job["attempts"] += 1
+        job["run_at"] = lease
+        job["payload"] = json.loads(job["payload"])
+
+        if job["batch_id"] is not None:
+            shared = conn.execute(
+                "SELECT shared FROM job_batches WHERE batch_id = ?", (job["batch_id"],)
+            ).fetchone()
+            job["payload"] = {**json.loads(shared["shared"]), **job["payload"]}
+
+        return job
+
+    def _dead_letter(self, conn: sqlite3.Connection, job: Dict[str, Any], error: str, now: float):
+        # Inside the caller's transaction
+        payload = job["payload"] if isinstance(job["payload"], str) else json.dumps(job["payload"])
+        conn.execute(
+            "UPDATE jobs SET status = 'dead', last_error = ?, updated_at = ? WHERE job_id = ?",
+            (error, now, job["job_id"])
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO dead_letters VALUES (?, ?, ?, ?, ?, ?)",
+            (job["job_id"], job["kind"], payload, job["attempts"], error, now)
+        )
+
+    def complete(self, job: Dict[str, Any], result: Any = None) -> bool:
+        """
+        Record a success. False when the caller's lease has expired and
+        the job was reclaimed, in which case the row is left alone.
+        """
+
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, last_error = NULL, updated_at = ? "
+            "WHERE job_id = ? AND status = 'running' AND run_at = ?",
+            (json.dumps(result), now, job["job_id"], job["run_at"])
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job: Dict[str, Any], error: str) -> bool:
+        """
+        Schedule the next attempt, or dead-letter the job once attempts run
+        out. False when the caller no longer holds the lease.
+        """
+
+        conn = self._connect()
+        now = time.time()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            held = conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND status = 'running' AND run_at = ?",
+                (job["job_id"], job["run_at"])
+            ).fetchone()
+
+            if held is None:
+                conn.execute("COMMIT")
+                return False
+
+            if job["attempts"] >= job["max_attempts"]:
+                self._dead_letter(conn, job, error, now)
+            else:
+                delay = self.retry_backoff * (2 ** (job["attempts"] - 1))
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', run_at = ?, last_error = ?, updated_at = ? "
+                    "WHERE job_id = ? AND status = 'running' AND run_at = ?",
+                    (now + delay, error, now, job["job_id"], job["run_at"])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status without its payload."""
+
+        row = self._connect().execute(
+            "SELECT job_id, kind, status, attempts, max_attempts, run_at, last_error, result, created_at, updated_at, batch_id "
+            "FROM jobs WHERE job_id = ?",
+            (job_id,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+
+        # run_at means the next attempt for a queued job and the lease
+        # expiry for a running one; it means nothing once a job is done
+        run_at = job.pop("run_at")
+        job["next_attempt_at"] = run_at if job["status"] == "queued" else None
+        job["lease_expires_at"] = run_at if job["status"] == "running" else None
+        return job
+
+    def batch(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        """A batch's jobs in enqueue order: each one's own payload, status, error and result."""
+
+        conn = self._connect()
+
+        if conn.execute("SELECT 1 FROM job_batches WHERE batch_id = ?", (batch_id,)).fetchone() is None:
+            return None
+
+        rows = conn.execute(
+            "SELECT job_id, payload, status, attempts, last_error, result FROM jobs "
+            "WHERE batch_id = ? ORDER BY rowid",
+            (batch_id,)
+        ).fetchall()
+
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job["payload"] = json.loads(job["payload"])
+            job["result"] = json.loads(job["result"]) if job["result"] else None
+            jobs.append(job)
+        return jobs
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT job_id, kind, attempts, last_error, failed_at FROM dead_letters "
+            "ORDER BY failed_at DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for status, count in self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class JobWorkerPool:
+    """
+    `concurrency` asyncio workers draining a JobQueue on the app's event
+    loop. Handlers are coroutines keyed by job kind; whatever a handler
+    returns is stored as the job result, and any exception counts as a
+    failed attempt. start() and stop() are called from the FastAPI lifespan.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: int = config.JOB_WORKERS,
+        poll_interval: float = config.JOB_POLL_INTERVAL
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """
+        Wake idle workers after an enqueue instead of waiting for the next
+        poll. Safe to call from any thread, e.g. a sync endpoint.
+        """
+        if self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        kinds = list(self.handlers)
+
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, kinds)
+            except sqlite3.Error as e:
+                # e.g. "database is locked"; the worker must outlive it
+                log_error(logger, e, "Claiming a job failed")
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                result = await self.handlers[job["kind"]](job["payload"])
+            except asyncio.CancelledError:
+                # Lease expiry hands the job to the next worker
+                raise
+            except Exception as e:
+                log_error(logger, e, f"Job {job['job_id']} attempt {job['attempts']} failed")
+                await self._record(job, "failed", self.queue.fail, job, str(e) or type(e).__name__)
+            else:
+                await self._record(job, "finished", self.queue.complete, job, result)
+
+    async def _record(self, job: Dict[str, Any], outcome: str, record: Callable[..., bool], *args):
+        try:
+            recorded = await asyncio.to_thread(record, *args)
+        except sqlite3.Error as e:
+            # The lease runs out and the job is claimed again
+            log_error(logger, e, f"Recording job {job['job_id']} as {outcome} failed")
+            return
+        if not recorded:
+            logger.warning(f"Job {job['job_id']} lease expired before it {outcome}; outcome dropped")
@@ -0,0 +1,38 @@
+import threading
+from typing import Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """
+    Thread-safe lazily-initialized singleton.
+
+    The factory runs once, on the first get(), under a lock; later calls
+    return the cached value without locking. A factory that raises leaves
+    the singleton uninitialized so the next call retries.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._value = None
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def get(self) -> T:
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._value = self._factory()
+                    self._initialized = True
+        return self._value
+
+    def reset(self):
+        with self._lock:
+            self._initialized = False
+            self._value = None
@@ -1,14 +1,15 @@
 from fastapi import FastAPI, Body, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import ValidationError
-import requests
-import os
-import time
+from contextlib import asynccontextmanager
+import asyncio
+import json
+from datetime import date
 from dotenv import load_dotenv
 
 # Import our modules
 from app.state import TripState
-from app.mcp.poi_search import search_pois, POISearchInput
+from app.mcp.poi_search import search_pois_async, POISearchInput, poi_cache, poi_flight
 from app.mcp.travel_time import estimate_travel_time, TravelTimeInput
 from app.mcp.itinerary_builder import build_itinerary
 from app.state import TripConstraints
@@ -16,12 +17,15 @@ from app.orchestrator import Orchestrator
 from app.evals.edit_correctness import evaluate_edit_correctness
 from app.evals.feasibility import evaluate_feasibility
 from app.evals.grounding import evaluate_grounding
-from app.intents import classify_intent
-from app.mcp.weather import get_delhi_weather
-from app.models import ExportRequest, ErrorResponse, SuccessResponse, HealthResponse
+from app.intents import classify_intent, get_model, intent_cache_stats
+from app.rag.retriever import get_corpus
+from app.mcp.weather import get_city_weather_async, weather_cache, weather_flight
+from app.mcp.http_client import http_client
+from app.jobs import JobQueue, JobWorkerPool
+from app.exports import EXPORT_HANDLERS, enqueue_export, enqueue_export_batch, export_batch_status
+from app.models import BatchExportRequest, ExportRequest, ErrorResponse, SuccessResponse, HealthResponse
 from app.config import config
-from app.logging_config import logger, log_request, log_webhook_call, log_error
-import copy
+from app.logging_config import logger, log_request, log_error
 
 # Load environment variables
 load_dotenv()
@@ -33,8 +37,31 @@ except ValueError as e:
     logger.error(f"Configuration error: {e}")
     raise
 
-app = FastAPI(title="AI Travel Assistant API", version="1.0.0")
+def warm_up():
+    """Initialize the Gemini client and RAG corpus before a request needs them"""
+    try:
+        get_model()
+        get_corpus()
+        logger.info("Warm-up completed")
+    except Exception as e:
+        log_error(logger, e, "Warm-up failed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared outbound HTTP pool and export job workers for the lifetime of the worker"""
+    await http_client.start()
+    await job_workers.start()
+    if config.WARMUP_ON_STARTUP:
+        # Runs off the event loop so /health is served while it warms
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    yield
+    await job_workers.stop()
+    await http_client.stop()
+
+app = FastAPI(title="AI Travel Assistant API", version="1.0.0", lifespan=lifespan)
 orchestrator = Orchestrator()
+job_queue = JobQueue()
+job_workers = JobWorkerPool(job_queue, EXPORT_HANDLERS)
 
 # Exception handlers
 @app.exception_handler(ValidationError)
@@ -65,6 +92,20 @@ def health_check():
     """Health check endpoint for uptime monitoring"""
     return HealthResponse(status="ok")
 
+@app.get("/metrics")
+def metrics():
+    """Cache counters for the outbound MCP tools and intent classification"""
+    return {
+        "poi_cache": poi_cache.stats(),
+        "weather_cache": {**weather_cache.stats(), "fetches": weather_flight.stats()},
+        "coalescing": {
+            "plan_trip": orchestrator.plan_flight.stats(),
+            "search_pois": poi_flight.stats()
+        },
+        "export_jobs": job_queue.stats(),
+        **intent_cache_stats()
+    }
+
 # Existing endpoints (with improved error handling)
 @app.get("/")
 def health_check():
@@ -84,14 +125,14 @@ def test_state():
     return example
 
 @app.get("/test-itinerary")
-def test_itinerary():
+async def test_itinerary():
     poi_input = POISearchInput(
         city="Delhi",
         interests=["history", "food"],
         max_results=15
     )
 
-    pois = search_pois(poi_input)
+    pois = await search_pois_async(poi_input)
 
     constraints = TripConstraints(
         days=2,
@@ -114,65 +155,173 @@ def test_travel():
     result = estimate_travel_time(input_data)
     return result
 
+def start_date_or_400(value: str | None) -> date | None:
+    """Parse an optional ISO "start_date" from a request payload"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="start_date must be an ISO date (YYYY-MM-DD)")
+
 @app.post("/plan-trip")
 def plan_trip(payload: dict = Body(...)):
     city = payload.get("city")
     interests = payload.get("interests")
     days = payload.get("days")
     pace = payload.get("pace")
+    builder_mode = payload.get("builder")  # greedy | optimized, defaults to config
+    start_date = start_date_or_400(payload.get("start_date"))  # defaults to today
 
-    trip = orchestrator.plan_trip(
-        city=city,
-        interests=interests,
-        days=days,
-        pace=pace
-    )
+    try:
+        trip = orchestrator.plan_trip(
+            city=city,
+            interests=interests,
+            days=days,
+            pace=pace,
+            builder_mode=builder_mode,
+            start_date=start_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return trip.public_dict()
+
+@app.post("/plan-trip/stream")
+def plan_trip_stream(payload: dict = Body(...)):
+    """
+    /plan-trip as NDJSON: one "pois" line with the search result, one "day"
+    line per finalized day, a "trip" line once it is saved, then "evaluations".
+    """
+    # Bad requests fail with a 400 here, before the 200 and headers go out
+    try:
+        events = orchestrator.plan_trip_stream(
+            city=payload.get("city"),
+            interests=payload.get("interests"),
+            days=payload.get("days"),
+            pace=payload.get("pace"),
+            builder_mode=payload.get("builder"),
+            start_date=start_date_or_400(payload.get("start_date"))
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    def ndjson():
+        try:
+            for kind, value in events:
+                if kind == "pois":
+                    line = {"type": "pois", "count": len(value), "pois": [poi.model_dump() for poi in value]}
+                elif kind == "day":
+                    line = {"type": "day", "day": value.model_dump()}
+                else:
+                    trip = value
+                    line = {
+                        "type": "trip",
+                        "trip_id": trip.trip_id,
+                        "city": trip.city,
+                        "interests": trip.interests,
+                        "constraints": trip.constraints.model_dump(mode="json")
+                    }
+                yield json.dumps(line) + "\n"
+
+            yield json.dumps({
+                "type": "evaluations",
+                "feasibility": evaluate_feasibility(trip),
+                "grounding": evaluate_grounding(trip)
+            }) + "\n"
+
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            log_error(logger, e, "Streaming plan failed")
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+def get_trip_or_400(trip_id: str | None, detail: str = "No active trip") -> TripState:
+    """Resolve a trip session or fail the request"""
+    trip = orchestrator.get_trip(trip_id)
+    if not trip:
+        raise HTTPException(status_code=400, detail=detail)
     return trip
 
 @app.post("/edit-day")
 def edit_day(payload: dict = Body(...)):
+    trip_id = payload.get("trip_id")
     day_number = payload.get("day")
     new_pace = payload.get("pace")
 
-    before_state = copy.deepcopy(orchestrator.current_trip)
+    # Days are immutable, so the snapshot shares them instead of copying the trip
+    before_days = get_trip_or_400(trip_id, "No active trip to edit.").snapshot()
 
     updated_trip = orchestrator.edit_day_pace(
+        trip_id=trip_id,
         day_number=day_number,
         new_pace=new_pace
     )
 
     eval_result = evaluate_edit_correctness(
-        before=before_state,
+        before=before_days,
         after=updated_trip,
         intended_day=day_number
     )
 
     return {
-        "trip": updated_trip,
+        "trip": updated_trip.public_dict(),
         "edit_eval": eval_result
     }
 
+@app.post("/record-visit")
+def record_visit(payload: dict = Body(...)):
+    """Record the minutes a visit really took, for duration model calibration"""
+    trip_id = payload.get("trip_id")
+
+    get_trip_or_400(trip_id, "No active trip to update.")
+
+    try:
+        updated_trip = orchestrator.record_visit(
+            trip_id=trip_id,
+            day_number=payload.get("day"),
+            poi_id=payload.get("poi_id"),
+            actual_minutes=payload.get("actual_minutes")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return updated_trip.public_dict()
+
+@app.post("/adjust-weather")
+def adjust_weather(payload: dict = Body(...)):
+    trip_id = payload.get("trip_id")
+    dry_run = bool(payload.get("dry_run", False))
+
+    get_trip_or_400(trip_id)
+
+    result = orchestrator.apply_weather_adjustment(trip_id, dry_run=dry_run)
+
+    if dry_run:
+        return {"dry_run": True, **result}
+
+    return result.public_dict()
+
 @app.get("/run-feasibility")
-def run_feasibility():
-    if not orchestrator.current_trip:
-        raise HTTPException(status_code=400, detail="No active trip")
+def run_feasibility(trip_id: str | None = None):
+    trip = get_trip_or_400(trip_id)
 
-    result = evaluate_feasibility(orchestrator.current_trip)
+    result = evaluate_feasibility(trip)
     return result
 
 @app.get("/run-grounding")
-def run_grounding():
-    if not orchestrator.current_trip:
-        raise HTTPException(status_code=400, detail="No active trip")
+def run_grounding(trip_id: str | None = None):
+    trip = get_trip_or_400(trip_id)
 
-    result = evaluate_grounding(orchestrator.current_trip)
+    result = evaluate_grounding(trip)
     return result
 
 @app.post("/voice-command")
 def voice_command(payload: dict = Body(...)):
 
     user_text = payload.get("text")
+    trip_id = payload.get("trip_id")
 
     intent_data = classify_intent(user_text)
 
@@ -183,41 +332,48 @@ def voice_command(payload: dict = Body(...)):
 
     # PLAN FLOW
     if intent == "PLAN":
-        trip = orchestrator.plan_trip(
-            city=intent_data.get("city"),
-            interests=intent_data.get("interests"),
-            days=intent_data.get("days"),
-            pace=intent_data.get("pace")
-        )
+        try:
+            trip = orchestrator.plan_trip(
+                city=intent_data.get("city"),
+                interests=intent_data.get("interests"),
+                days=intent_data.get("days"),
+                pace=intent_data.get("pace")
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         return {
             "intent": "PLAN",
-            "trip": trip
+            "intent_path": intent_data.get("path"),
+            "trip": trip.public_dict()
         }
 
     # EDIT FLOW
     elif intent == "EDIT_DAY_PACE":
-        if not orchestrator.current_trip:
-            raise HTTPException(status_code=400, detail="No active trip to edit.")
+        get_trip_or_400(trip_id, "No active trip to edit.")
 
         updated_trip = orchestrator.edit_day_pace(
+            trip_id=trip_id,
             day_number=intent_data.get("day"),
             new_pace=intent_data.get("pace")
         )
 
         return {
             "intent": "EDIT_DAY_PACE",
-            "trip": updated_trip
+            "intent_path": intent_data.get("path"),
+            "trip": updated_trip.public_dict()
         }
 
     # EXPLAIN FLOW
     elif intent == "EXPLAIN":
         explanation = orchestrator.explain(
+            trip_id=trip_id,
             target=intent_data.get("target")
         )
 
         return {
             "intent": "EXPLAIN",
+            "intent_path": intent_data.get("path"),
             "explanation": explanation
         }
 
@@ -225,15 +381,16 @@ def voice_command(payload: dict = Body(...)):
         return {"error": "Unsupported intent", "intent_data": intent_data}
 
 # Improved export endpoint with production features
-@app.post("/export-itinerary")
+@app.post("/export-itinerary", status_code=202)
 def export_itinerary(request: ExportRequest):
-    """Export itinerary to n8n webhook with production-grade error handling"""
+    """Queue an itinerary export to the n8n webhook; poll /export-jobs/{job_id} for the outcome"""
     
     # Log the request
     log_request(logger, "/export-itinerary", request.dict())
     
     # Validate active trip
-    if not orchestrator.current_trip:
+    trip = orchestrator.get_trip(request.trip_id)
+    if not trip:
         logger.warning("Export attempt with no active trip")
         raise HTTPException(
             status_code=400,
@@ -254,84 +411,91 @@ def export_itinerary(request: ExportRequest):
             ).dict()
         )
 
-    # Prepare webhook payload
-    webhook_payload = {
-        "email": request.email,
-        "trip": orchestrator.current_trip.dict()
-    }
+    # The webhook call, its retries and backoff run on the job workers
+    job_id = enqueue_export(job_queue, request.email, trip)
+    job_workers.notify()
 
-    # Make webhook call with timeout and retry logic
-    start_time = time.time()
-    max_retries = config.MAX_RETRIES
-    retry_count = 0
-    
-    while retry_count <= max_retries:
-        try:
-            logger.info(f"Calling n8n webhook (attempt {retry_count + 1})")
-            
-            response = requests.post(
-                config.N8N_WEBHOOK_URL,
-                json=webhook_payload,
-                timeout=config.REQUEST_TIMEOUT
-            )
-            
-            duration = time.time() - start_time
-            log_webhook_call(logger, config.N8N_WEBHOOK_URL, "success", duration)
-            
-            # Return success response
-            return SuccessResponse(
-                message="Itinerary exported successfully",
-                data={
-                    "email": request.email,
-                    "status": "sent",
-                    "webhook_response": response.text[:200]  # Limit response size
-                }
-            )
-            
-        except requests.exceptions.Timeout as e:
-            duration = time.time() - start_time
-            log_webhook_call(logger, config.N8N_WEBHOOK_URL, "timeout", duration)
-            
-            retry_count += 1
-            if retry_count <= max_retries:
-                logger.warning(f"Webhook timeout, retrying... ({retry_count}/{max_retries})")
-                time.sleep(1)  # Brief delay before retry
-                continue
-            else:
-                log_error(logger, e, "Webhook timeout after retries")
-                raise HTTPException(
-                    status_code=504,
-                    detail=ErrorResponse(
-                        message="Webhook timeout",
-                        details=f"Request timed out after {config.REQUEST_TIMEOUT} seconds"
-                    ).dict()
-                )
-                
-        except requests.exceptions.RequestException as e:
-            duration = time.time() - start_time
-            log_webhook_call(logger, config.N8N_WEBHOOK_URL, "error", duration)
-            log_error(logger, e, "Webhook request failed")
-            
-            raise HTTPException(
-                status_code=502,
-                detail=ErrorResponse(
-                    message="Webhook service unavailable",
-                    details=str(e)
-                ).dict()
-            )
-        except Exception as e:
-            duration = time.time() - start_time
-            log_webhook_call(logger, config.N8N_WEBHOOK_URL, "error", duration)
-            log_error(logger, e, "Unexpected error in webhook call")
-            
-            raise HTTPException(
-                status_code=500,
-                detail=ErrorResponse(
-                    message="Failed to process export request",
-                    details=str(e)
-                ).dict()
-            )
+    return SuccessResponse(
+        message="Itinerary export queued",
+        data={
+            "job_id": job_id,
+            "email": request.email,
+            "status": "queued"
+        }
+    )
+
+@app.post("/export-itinerary/batch", status_code=202)
+def export_itinerary_batch(request: BatchExportRequest):
+    """Queue one export job per recipient; returns their job IDs"""
+
+    log_request(logger, "/export-itinerary/batch", {"trip_id": request.trip_id, "recipients": len(request.emails)})
+
+    trip = orchestrator.get_trip(request.trip_id)
+    if not trip:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse(
+                message="No active trip to export",
+                details="Generate a trip first before exporting"
+            ).dict()
+        )
+
+    if not request.emails or len(request.emails) > config.EXPORT_BATCH_MAX_RECIPIENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse(
+                message="Invalid recipient list",
+                details=f"Provide between 1 and {config.EXPORT_BATCH_MAX_RECIPIENTS} email addresses"
+            ).dict()
+        )
+
+    if not config.N8N_WEBHOOK_URL:
+        logger.error("N8N webhook URL not configured")
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                message="Service misconfigured",
+                details="N8N webhook URL not configured"
+            ).dict()
+        )
+
+    # One job per recipient, so each is retried and dead-lettered on its own
+    batch_id, jobs = enqueue_export_batch(job_queue, request.emails, trip)
+    job_workers.notify()
+
+    return SuccessResponse(
+        message=f"Itinerary export queued for {len(jobs)} recipients",
+        data={
+            "batch_id": batch_id,
+            "job_ids": [job["job_id"] for job in jobs],
+            "jobs": jobs,
+            "status": "queued"
+        }
+    )
+
+@app.get("/export-jobs/dead-letters")
+def export_dead_letters(limit: int = 100):
+    """Exports that failed every attempt"""
+    return {"dead_letters": job_queue.dead_letters(limit)}
+
+@app.get("/export-jobs/batch/{batch_id}")
+def export_batch_job_status(batch_id: str):
+    """Sent, failed or pending, per recipient of a batch export"""
+    status = export_batch_status(job_queue, batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown export batch")
+    return status
+
+@app.get("/export-jobs/{job_id}")
+def export_job_status(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown export job")
+    return job
 
 @app.get("/test-weather")
-def test_weather():
-    return get_delhi_weather()
\ No newline at end of file
+async def test_weather(city: str = config.DEFAULT_CITY):
+    try:
+        return await get_city_weather_async(city)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
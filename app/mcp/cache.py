@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and stale-while-revalidate.
+
+    Entries younger than `ttl` are served as hits. Entries older than `ttl`
+    but younger than `ttl + stale_ttl` are served immediately while a single
+    background reload refreshes them, so a slow loader never blocks a warm key.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300, stale_ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _store(self, key: Hashable, value: Any):
+        # Caller holds the lock
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() - entry[1] <= self.ttl + self.stale_ttl
+
+    def get(
+        self,
+        key: Hashable,
+        default: Any = None,
+        revalidate: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """
+        Counted lookup that never loads in the caller. Stale entries are
+        returned, and refreshed in the background only if `revalidate` is given.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                value, stored_at = entry
+                age = time.monotonic() - stored_at
+
+                if age <= self.ttl + self.stale_ttl:
+                    if age <= self.ttl:
+                        self.hits += 1
+                    else:
+                        self.stale_hits += 1
+                        if revalidate is not None:
+                            self._revalidate(key, revalidate)
+                    self._entries.move_to_end(key)
+                    return value
+
+                del self._entries[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                value, stored_at = entry
+                age = time.monotonic() - stored_at
+
+                if age <= self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return value
+
+                if age <= self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    self._revalidate(key, loader)
+                    return value
+
+                del self._entries[key]
+
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._store(key, value)
+
+        return value
+
+    def _revalidate(self, key: Hashable, loader: Callable[[], Any]):
+        # Caller holds the lock
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        def run():
+            try:
+                value = loader()
+                with self._lock:
+                    self._store(key, value)
+                    self.refreshes += 1
+            except Exception:
+                with self._lock:
+                    self.refresh_errors += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="cache-revalidate", daemon=True).start()
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,186 @@
+import copy
+import json
+import os
+import statistics
+import numpy as np
+from itertools import repeat
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from app.config import config
+from app.lazy import Lazy
+
+
+PACES = ("relaxed", "moderate", "packed")
+
+# Pace of POISearchOutput.suggested_duration; trips re-look-up their own
+REFERENCE_PACE = "moderate"
+
+# A POI with any of these tags is a major site and gets the "major" entry
+MAJOR_SITE_TAGS = ("wikidata", "wikipedia", "heritage")
+_MAJOR_SITE_KEYS = frozenset(MAJOR_SITE_TAGS)
+TIERS = ("minor", "major")
+
+# Category used for anything the model has no entry for
+DEFAULT_CATEGORY = "default"
+
+# Weight of an entry's current minutes, counted in logged visits, when refitting
+PRIOR_WEIGHT = 5
+
+# Minutes per category, tier and pace until a calibrated model is written
+# to DURATION_MODEL_PATH by calibrate_duration_model.py
+DEFAULT_DURATIONS = {
+    DEFAULT_CATEGORY: {"minor": {"relaxed": 90, "moderate": 75, "packed": 60},
+                       "major": {"relaxed": 120, "moderate": 90, "packed": 75}},
+    "museum": {"minor": {"relaxed": 120, "moderate": 90, "packed": 60},
+               "major": {"relaxed": 180, "moderate": 150, "packed": 120}},
+    "gallery": {"minor": {"relaxed": 90, "moderate": 60, "packed": 45},
+                "major": {"relaxed": 120, "moderate": 90, "packed": 75}},
+    "fort": {"minor": {"relaxed": 120, "moderate": 90, "packed": 60},
+             "major": {"relaxed": 180, "moderate": 150, "packed": 120}},
+    "monument": {"minor": {"relaxed": 45, "moderate": 30, "packed": 20},
+                 "major": {"relaxed": 90, "moderate": 75, "packed": 60}},
+    "memorial": {"minor": {"relaxed": 30, "moderate": 20, "packed": 15},
+                 "major": {"relaxed": 60, "moderate": 45, "packed": 30}},
+    "attraction": {"minor": {"relaxed": 60, "moderate": 45, "packed": 30},
+                   "major": {"relaxed": 120, "moderate": 90, "packed": 75}},
+    "viewpoint": {"minor": {"relaxed": 30, "moderate": 20, "packed": 15},
+                  "major": {"relaxed": 45, "moderate": 30, "packed": 20}},
+    "place_of_worship": {"minor": {"relaxed": 45, "moderate": 30, "packed": 20},
+                         "major": {"relaxed": 90, "moderate": 60, "packed": 45}},
+    "restaurant": {"minor": {"relaxed": 90, "moderate": 75, "packed": 60},
+                   "major": {"relaxed": 105, "moderate": 90, "packed": 75}},
+    "cafe": {"minor": {"relaxed": 60, "moderate": 45, "packed": 30},
+             "major": {"relaxed": 60, "moderate": 45, "packed": 30}},
+    "park": {"minor": {"relaxed": 90, "moderate": 60, "packed": 45},
+             "major": {"relaxed": 150, "moderate": 120, "packed": 90}},
+    "garden": {"minor": {"relaxed": 90, "moderate": 60, "packed": 45},
+               "major": {"relaxed": 150, "moderate": 120, "packed": 90}},
+    "zoo": {"minor": {"relaxed": 180, "moderate": 150, "packed": 120},
+            "major": {"relaxed": 240, "moderate": 180, "packed": 150}},
+    "marketplace": {"minor": {"relaxed": 90, "moderate": 60, "packed": 45},
+                    "major": {"relaxed": 120, "moderate": 90, "packed": 60}}
+}
+
+
+def _pace_column(pace: str) -> int:
+    # Unknown paces plan like the reference pace, as PACE_LIMITS does
+    return PACES.index(pace if pace in PACES else REFERENCE_PACE)
+
+
+def site_tier(tags: Mapping[str, str]) -> str:
+    return "major" if any(key in tags for key in MAJOR_SITE_TAGS) else "minor"
+
+
+class DurationModel:
+    """
+    Visit minutes looked up by category, tier (major site or not, from
+    tags) and pace.
+
+    The nested {category: {tier: {pace: minutes}}} mapping is compiled into
+    one array with a row per category, so a whole candidate list is looked
+    up at once. Unknown categories use the DEFAULT_CATEGORY row and missing
+    tiers or paces fall back to the built-in defaults.
+    """
+
+    def __init__(self, minutes: Mapping[str, Mapping[str, Mapping[str, int]]]):
+
+        categories = list(dict.fromkeys([DEFAULT_CATEGORY, *minutes]))
+        self._rows: Dict[str, int] = {category: row for row, category in enumerate(categories)}
+
+        self.minutes = np.empty((len(categories), len(TIERS), len(PACES)), dtype=np.int32)
+
+        for category, row in self._rows.items():
+            fallback = DEFAULT_DURATIONS.get(category, DEFAULT_DURATIONS[DEFAULT_CATEGORY])
+            entry = minutes.get(category, fallback)
+            for t, tier in enumerate(TIERS):
+                for p, pace in enumerate(PACES):
+                    self.minutes[row, t, p] = entry.get(tier, {}).get(pace, fallback[tier][pace])
+
+    @classmethod
+    def load(cls, path: str) -> "DurationModel":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        return {
+            category: {
+                tier: {pace: int(self.minutes[row, t, p]) for p, pace in enumerate(PACES)}
+                for t, tier in enumerate(TIERS)
+            }
+            for category, row in self._rows.items()
+        }
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def duration(self, category: str, tags: Mapping[str, str], pace: str = REFERENCE_PACE) -> int:
+        row = self._rows.get(category, 0)
+        return int(self.minutes[row, TIERS.index(site_tier(tags)), _pace_column(pace)])
+
+    def durations(
+        self,
+        categories: Iterable[str],
+        tags: Iterable[Mapping[str, str]],
+        pace: str = REFERENCE_PACE,
+        count: int = -1
+    ) -> np.ndarray:
+        """duration() for many POIs in one gather over the lookup array."""
+
+        rows = np.fromiter(map(self._rows.get, categories, repeat(0)), dtype=np.intp, count=count)
+
+        # Tier index per POI: 1 ("major") when it has any major-site tag
+        tiers = np.fromiter((not _MAJOR_SITE_KEYS.isdisjoint(poi_tags) for poi_tags in tags), dtype=np.intp, count=len(rows))
+
+        return self.minutes[rows, tiers, _pace_column(pace)]
+
+
+def fit_duration_model(
+    visits: Iterable[Tuple[str, Mapping[str, str], str, int]],
+    prior: DurationModel,
+    prior_weight: float = PRIOR_WEIGHT
+) -> Tuple[DurationModel, Dict[Tuple[str, str, str], int]]:
+    """
+    Refit from logged (category, tags, pace, minutes) visits.
+
+    Each (category, tier, pace) entry moves from its prior minutes toward
+    the median of its visits, further the more visits it has, and is
+    rounded to 5 minutes. Categories new to the model start from the
+    DEFAULT_CATEGORY entry. Returns the model and the visits per entry.
+    """
+
+    observed: Dict[Tuple[str, str, str], List[int]] = {}
+    for category, tags, pace, minutes in visits:
+        if pace in PACES and minutes > 0:
+            observed.setdefault((category, site_tier(tags), pace), []).append(minutes)
+
+    fitted = prior.to_dict()
+
+    for (category, tier, pace), samples in observed.items():
+        entry = fitted.setdefault(category, copy.deepcopy(fitted[DEFAULT_CATEGORY]))
+        blended = (len(samples) * statistics.median(samples) + prior_weight * entry[tier][pace]) / (len(samples) + prior_weight)
+        entry[tier][pace] = max(5, 5 * round(blended / 5))
+
+    return DurationModel(fitted), {key: len(samples) for key, samples in observed.items()}
+
+
+def _load_duration_model() -> DurationModel:
+    if os.path.exists(config.DURATION_MODEL_PATH):
+        return DurationModel.load(config.DURATION_MODEL_PATH)
+    return DurationModel(DEFAULT_DURATIONS)
+
+
+_duration_model: Lazy[DurationModel] = Lazy(_load_duration_model)
+
+
+def get_duration_model() -> DurationModel:
+    return _duration_model.get()
+
+
+def reset_duration_model():
+    """Reload DURATION_MODEL_PATH on next use, e.g. after recalibrating."""
+    _duration_model.reset()
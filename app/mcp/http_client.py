@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import config
+
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class HTTPClient:
+    """
+    Shared async HTTP client for the outbound MCP tools.
+
+    Wraps one keep-alive httpx.AsyncClient with a per-host connection cap,
+    default timeouts and retries with exponential backoff. start() and
+    stop() are called from the FastAPI lifespan.
+    """
+
+    def __init__(
+        self,
+        timeout: float = config.HTTP_TIMEOUT,
+        max_connections: int = config.HTTP_MAX_CONNECTIONS,
+        max_connections_per_host: int = config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_retries: int = config.HTTP_MAX_RETRIES,
+        retry_backoff: float = config.HTTP_RETRY_BACKOFF
+    ):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._host_limits.clear()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_limits[host] = semaphore
+        return semaphore
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        retries: Optional[int] = None,
+        **kwargs
+    ) -> httpx.Response:
+
+        if self._client is None:
+            # Scripts and tests may call the tools outside the app lifespan
+            await self.start()
+
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+
+        while True:
+            try:
+                async with self._host_limit(url):
+                    response = await self._client.request(method, url, **kwargs)
+
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+
+            attempt += 1
+            await asyncio.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+
+http_client = HTTPClient()
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Pooled keep-alive session for the remaining synchronous call sites."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=config.HTTP_MAX_CONNECTIONS,
+                    pool_maxsize=config.HTTP_MAX_CONNECTIONS_PER_HOST
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
@@ -1,7 +1,15 @@
-from typing import List
-from app.state import DayPlan, POIBlock, TripConstraints
-from app.mcp.travel_time import estimate_travel_time, TravelTimeInput
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from app.config import config
+from app.state import DayPlan, TripConstraints, TripState
+from app.cities import get_city
+from app.mcp.opening_hours import earliest_visit
+from app.mcp.travel_time import AVG_SPEED_KMH, coordinate_travel_matrix, leg_minutes
 from app.mcp.poi_search import POISearchOutput
+from app.mcp.poi_table import POITable
+from app.mcp.route_optimizer import sweep_clusters, nearest_neighbour_route, two_opt
+from app.mcp.spatial_index import SpatialIndex
 
 
 PACE_LIMITS = {
@@ -11,73 +19,368 @@ PACE_LIMITS = {
 }
 
 
+BUILDER_MODES = ("greedy", "optimized")
+
+
+def _as_table(
+    pois: Sequence[POISearchOutput] | POITable,
+    constraints: TripConstraints,
+    limit: Optional[int] = None
+) -> POITable:
+    if isinstance(pois, POITable):
+        return pois if limit is None else pois.head(limit)
+    # Visit lengths come from the duration model at the trip's pace
+    return POITable.from_pois(pois if limit is None else pois[:limit], pace=constraints.pace)
+
+
+def _candidate_limit(constraints: TripConstraints) -> int:
+    # The top pace-limit candidates per day, all a trip can hold
+    return constraints.days * PACE_LIMITS.get(constraints.pace, 3)
+
+
+def iter_itinerary_days(
+    pois: Sequence[POISearchOutput] | POITable,
+    constraints: TripConstraints,
+    mode: Optional[str] = None,
+    speed_kmh: float = AVG_SPEED_KMH
+) -> Iterator[DayPlan]:
+    """
+    Yield each DayPlan as soon as it is final, so callers can stream a trip.
+
+    The mode is checked up front; scheduling work happens as days are pulled.
+    `pois` may already be a POITable, otherwise one is built from the list.
+    """
+
+    mode = mode or config.ITINERARY_BUILDER_MODE
+
+    if mode == "optimized":
+        return _iter_optimized_days(_as_table(pois, constraints, _candidate_limit(constraints)), constraints, None, speed_kmh)
+
+    if mode != "greedy":
+        raise ValueError(f"Unknown itinerary builder mode: {mode}")
+
+    return _iter_greedy_days(pois, constraints, speed_kmh)
+
+
 def build_itinerary(
-    pois: List[POISearchOutput],
-    constraints: TripConstraints
+    pois: Sequence[POISearchOutput] | POITable,
+    constraints: TripConstraints,
+    mode: Optional[str] = None,
+    speed_kmh: float = AVG_SPEED_KMH
 ) -> List[DayPlan]:
+    return list(iter_itinerary_days(pois, constraints, mode=mode, speed_kmh=speed_kmh))
+
+
+def _greedy_columns(
+    pois: Sequence[POISearchOutput] | POITable,
+    constraints: TripConstraints,
+    limit: int,
+    speed_kmh: float
+) -> Tuple[POITable, List[int], list, List[int]]:
+    table = _as_table(pois, constraints, limit)
+    # Legs between neighbouring rows, the usual case when few are skipped
+    return table, table.duration.tolist(), table.hours, leg_minutes(table.lat, table.lon, speed_kmh).tolist()
+
+
+def _iter_greedy_days(
+    pois: Sequence[POISearchOutput] | POITable,
+    constraints: TripConstraints,
+    speed_kmh: float
+) -> Iterator[DayPlan]:
+    """
+    Fill each day in candidate order. A visit starts on arrival, or at
+    opening time if that is later, and must end before closing and by
+    daily_end_hour. A POI closed at that point of the day is passed over
+    and stays in line for the following days; one that runs past
+    daily_end_hour ends the day, as it did before opening hours.
+
+    Only the candidates a trip can hold, plus one deferral per day, are
+    converted up front; the table doubles when deferrals reach its end.
+    """
 
-    days_output = []
     pois_per_day = PACE_LIMITS.get(constraints.pace, 3)
 
-    available_minutes = (constraints.daily_end_hour - constraints.daily_start_hour) * 60
+    day_start = constraints.daily_start_hour * 60
+    day_end = constraints.daily_end_hour * 60
 
-    poi_index = 0
+    table, durations, hours, next_legs = _greedy_columns(
+        pois, constraints, _candidate_limit(constraints) + constraints.days, speed_kmh
+    )
+    converted, total = len(durations), len(pois)
+
+    first_weekday = constraints.date_of(1).weekday()
+
+    # Rows passed over on earlier days, all before `cursor`, come first
+    deferred = []
+    cursor = 0
 
     for day_number in range(1, constraints.days + 1):
 
-        day_blocks = []
-        total_time = 0
-        last_poi = None
-        count = 0
-
-        while (
-            poi_index < len(pois)
-            and count < pois_per_day
-        ):
-            poi = pois[poi_index]
-
-            travel_minutes = 0
-
-            if last_poi:
-                travel = estimate_travel_time(
-                    TravelTimeInput(
-                        lat1=last_poi.lat,
-                        lon1=last_poi.lon,
-                        lat2=poi.lat,
-                        lon2=poi.lon
+        weekday = (first_weekday + day_number - 1) % 7
+
+        rows = []
+        legs = []
+        starts = []
+        skipped = []
+        queued = 0
+        clock = day_start
+
+        while len(rows) < pois_per_day:
+
+            if queued < len(deferred):
+                row = deferred[queued]
+            else:
+                if cursor == converted:
+                    if converted == total:
+                        break
+                    table, durations, hours, next_legs = _greedy_columns(
+                        pois, constraints, 2 * converted, speed_kmh
                     )
-                )
-                travel_minutes = travel.estimated_travel_minutes
-
-            projected_time = total_time + travel_minutes + poi.suggested_duration
-
-            if projected_time > available_minutes:
-                break
-
-            block = POIBlock(
-                poi_id=poi.poi_id,
-                name=poi.name,
-                category=poi.category,
-                lat=poi.lat,
-                lon=poi.lon,
-                duration_minutes=poi.suggested_duration,
-                travel_minutes_from_previous=travel_minutes,
-                indoor=poi.indoor,
-                source=poi.source
-            )
-
-            day_blocks.append(block)
-
-            total_time = projected_time
-            last_poi = poi
-            poi_index += 1
-            count += 1
-
-        days_output.append(
-            DayPlan(
-                day=day_number,
-                blocks=day_blocks
-            )
+                    converted = len(durations)
+                row = cursor
+
+            duration = durations[row]
+            row_hours = hours[row]
+
+            # Arriving later never helps, so a POI closed for the rest of
+            # the day is passed over before any travel is estimated.
+            # Unknown hours count as always open and need no lookup.
+            if (
+                row_hours is not None
+                and clock + duration <= day_end
+                and earliest_visit(row_hours, weekday, clock, duration, day_end) is None
+            ):
+                skipped.append(row)
+            else:
+                if not rows:
+                    travel_minutes = 0
+                elif rows[-1] == row - 1:
+                    travel_minutes = next_legs[row - 1]
+                else:
+                    travel_minutes = table.travel_minutes(rows[-1], row, speed_kmh)
+                arrival = clock + travel_minutes
+
+                # Out of time: the day ends here, as it would without hours
+                if arrival + duration > day_end:
+                    break
+
+                start = arrival if row_hours is None else earliest_visit(row_hours, weekday, arrival, duration, day_end)
+
+                if start is None:
+                    skipped.append(row)
+                else:
+                    rows.append(row)
+                    legs.append(travel_minutes)
+                    starts.append(start)
+                    clock = start + duration
+
+            if queued < len(deferred):
+                queued += 1
+            else:
+                cursor += 1
+
+        deferred = skipped + deferred[queued:]
+
+        yield table.day_plan(day_number, rows, legs, starts)
+
+
+def build_optimized_itinerary(
+    pois: Sequence[POISearchOutput] | POITable,
+    constraints: TripConstraints,
+    time_budget_ms: Optional[float] = None,
+    speed_kmh: float = AVG_SPEED_KMH
+) -> List[DayPlan]:
+    """
+    Route-optimizing builder.
+
+    Takes the same top candidates the greedy builder would, clusters them
+    into one geographic wedge per day, orders each day with nearest-neighbour
+    plus 2-opt over the travel matrix, then applies the pace limit, daily window
+    and opening hours. 2-opt stops improving once the time budget is spent.
+    """
+
+    return list(_iter_optimized_days(
+        _as_table(pois, constraints, _candidate_limit(constraints)), constraints, time_budget_ms, speed_kmh
+    ))
+
+
+def _iter_optimized_days(
+    table: POITable,
+    constraints: TripConstraints,
+    time_budget_ms: Optional[float],
+    speed_kmh: float
+) -> Iterator[DayPlan]:
+
+    budget_ms = config.OPTIMIZER_TIME_BUDGET_MS if time_budget_ms is None else time_budget_ms
+    deadline = time.perf_counter() + budget_ms / 1000
+
+    pois_per_day = PACE_LIMITS.get(constraints.pace, 3)
+    day_start = constraints.daily_start_hour * 60
+    day_end = constraints.daily_end_hour * 60
+
+    travel = coordinate_travel_matrix(table.poi_ids, table.lat, table.lon, speed_kmh)
+    durations = table.duration.tolist()
+    hours = table.hours
+
+    clusters = sweep_clusters(table.lat, table.lon, pois_per_day)
+
+    for day_number in range(1, constraints.days + 1):
+
+        rows = []
+        legs = []
+        starts = []
+
+        if day_number <= len(clusters):
+            route = nearest_neighbour_route(clusters[day_number - 1], travel.minutes)
+            route = two_opt(route, travel.minutes, deadline)
+
+            weekday = constraints.date_of(day_number).weekday()
+            clock = day_start
+            last_index = None
+
+            for index in route:
+                travel_minutes = int(travel.minutes[last_index, index]) if last_index is not None else 0
+                arrival = clock + travel_minutes
+
+                if arrival + durations[index] > day_end:
+                    break
+
+                # Stops closed at that point of the route are dropped
+                start = earliest_visit(hours[index], weekday, arrival, durations[index], day_end)
+                if start is None:
+                    continue
+
+                rows.append(index)
+                legs.append(travel_minutes)
+                starts.append(start)
+                clock = start + durations[index]
+                last_index = index
+
+        yield table.day_plan(day_number, rows, legs, starts)
+
+
+def pool_index(trip: TripState) -> SpatialIndex:
+    """
+    The trip's spatial index over its POI pool.
+
+    Kept on the trip and extended with whatever was appended to the pool
+    since the last call, so only new POIs are indexed.
+    """
+
+    pool, indexed, index = trip._pool_index or (None, 0, None)
+
+    if pool is not trip.poi_pool:
+        indexed, index = 0, SpatialIndex()
+
+    index.extend(trip.poi_pool[indexed:])
+    trip._pool_index = (trip.poi_pool, len(trip.poi_pool), index)
+
+    return index
+
+
+def free_index(trip: TripState) -> SpatialIndex:
+    """
+    The trip's spatial index over the pool POIs no day uses.
+
+    Kept on the trip like pool_index(). mark_used() moves POIs in and out
+    of it as days change, so a nearest query finds free POIs without
+    passing over the ones other days hold.
+    """
+
+    pool, indexed, index = trip._free_index or (None, 0, None)
+
+    if pool is not trip.poi_pool:
+        indexed, index = 0, SpatialIndex()
+
+    used = trip.used_poi_ids
+    index.extend(poi for poi in trip.poi_pool[indexed:] if poi.poi_id not in used)
+    trip._free_index = (trip.poi_pool, len(trip.poi_pool), index)
+
+    return index
+
+
+def mark_used(trip: TripState, released: Iterable[str], taken: Iterable[str]):
+    """
+    Record that a day gave up the `released` POIs and now holds the `taken`
+    ones. Use this rather than editing used_poi_ids, so free_index() stays
+    in step.
+    """
+
+    released, taken = set(released), set(taken)
+    trip.used_poi_ids.difference_update(released)
+    trip.used_poi_ids.update(taken)
+
+    if trip._free_index is None or trip._free_index[0] is not trip.poi_pool:
+        return
+
+    free, pool = trip._free_index[2], pool_index(trip)
+    free.extend(poi for poi in map(pool.get, released - taken) if poi is not None)
+    for poi_id in taken:
+        free.discard(poi_id)
+
+
+def day_anchor(trip: TripState, day_number: int) -> Optional[Tuple[float, float]]:
+    """
+    Where a day takes place: the centroid of its POIs, or the previous
+    day's last stop when it is empty. None when neither exists.
+    """
+
+    blocks = trip.days[day_number - 1].blocks
+
+    if blocks:
+        return (
+            sum(block.lat for block in blocks) / len(blocks),
+            sum(block.lon for block in blocks) / len(blocks)
+        )
+
+    if day_number > 1 and trip.days[day_number - 2].blocks:
+        last_stop = trip.days[day_number - 2].blocks[-1]
+        return last_stop.lat, last_stop.lon
+
+    return None
+
+
+def replan_day(trip: TripState, day_number: int, pace: str) -> DayPlan:
+    """
+    Rebuild one day from the trip's own POI pool, without any network call.
+
+    The day's current POIs are released first, then the day is refilled
+    from pool POIs that no other day uses, nearest to where the day already
+    takes place. Those are looked up in free_index(), which holds only
+    unused POIs, so the lookup does not depend on how many POIs the trip's
+    other days hold.
+    """
+
+    released = [block.poi_id for block in trip.days[day_number - 1].blocks]
+
+    pois_per_day = PACE_LIMITS.get(pace, 3)
+    anchor = day_anchor(trip, day_number)
+
+    free = free_index(trip)
+    mark_used(trip, released, ())
+
+    try:
+        if anchor is None:
+            candidates = list(islice(free, pois_per_day))
+        else:
+            candidates = [poi for poi, _ in free.nearest(*anchor, k=pois_per_day)]
+
+        constraints = TripConstraints(
+            days=1,
+            pace=pace,
+            daily_start_hour=trip.constraints.daily_start_hour,
+            daily_end_hour=trip.constraints.daily_end_hour,
+            start_date=trip.constraints.date_of(day_number)
         )
 
-    return days_output
\ No newline at end of file
+        rebuilt_day = build_itinerary(
+            candidates, constraints, mode="greedy", speed_kmh=get_city(trip.city).avg_speed_kmh
+        )[0].renumbered(day_number)
+    except Exception:
+        # The day keeps its POIs
+        mark_used(trip, (), released)
+        raise
+
+    mark_used(trip, (), (block.poi_id for block in rebuilt_day.blocks))
+
+    return rebuilt_day
@@ -0,0 +1,146 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+# (open, close) minutes after midnight, close <= 1440
+Interval = Tuple[int, int]
+
+# One sorted, non-overlapping interval tuple per weekday, Monday first
+WeeklyHours = Tuple[Tuple[Interval, ...], ...]
+
+WEEKDAYS = ("mo", "tu", "we", "th", "fr", "sa", "su")
+MINUTES_PER_DAY = 24 * 60
+
+_DAY_SELECTOR = re.compile(r"^(?:(?:mo|tu|we|th|fr|sa|su)(?:-(?:mo|tu|we|th|fr|sa|su))?)(?:,(?:mo|tu|we|th|fr|sa|su)(?:-(?:mo|tu|we|th|fr|sa|su))?)*$")
+_TIME_SPAN = re.compile(r"^(\d{1,2}):(\d{2})(?:-(\d{1,2}):(\d{2})|(\+))$")
+
+# Rules for public/school holidays say nothing about a normal week
+_HOLIDAY_RULE = re.compile(r"^(?:ph|sh)\b")
+
+
+def _weekdays(selector: str) -> List[int]:
+
+    days = []
+
+    for part in selector.split(","):
+        first, _, last = part.partition("-")
+        start = WEEKDAYS.index(first)
+        end = WEEKDAYS.index(last) if last else start
+        # Ranges may wrap around the week, e.g. Su-Tu
+        days.extend((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+
+    return days
+
+
+def _merge(intervals: List[Interval]) -> Tuple[Interval, ...]:
+
+    merged: List[Interval] = []
+
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return tuple(merged)
+
+
+@lru_cache(maxsize=4096)
+def parse_opening_hours(value: Optional[str]) -> Optional[WeeklyHours]:
+    """
+    Parse the common subset of the OSM opening_hours syntax.
+
+    Handles "24/7", weekday selectors with ranges and lists ("Mo-Fr",
+    "Sa,Su", "Su-Tu"), several time spans per rule, spans past midnight,
+    open ends ("18:00+") and "off"/"closed". Later rules replace earlier ones
+    for the days they name. Holiday rules are skipped. Anything else (months,
+    dates, sunrise, comments) returns None, meaning "unknown", so the POI is
+    scheduled as if always open rather than dropped.
+
+    Cached per distinct string: POIs sharing hours share one parsed value.
+    """
+
+    if not value or not value.strip():
+        return None
+
+    week: List[List[Interval]] = [[] for _ in WEEKDAYS]
+
+    # "Mo-Fr 09:00-17:00, Sa 10:00-14:00" is two rules, like ";"
+    rules = re.split(r";|(?<=\d),\s*(?=[a-z])", value.strip().lower())
+
+    for rule in rules:
+        rule = rule.strip()
+        if not rule or _HOLIDAY_RULE.match(rule):
+            continue
+
+        if rule == "24/7":
+            week = [[(0, MINUTES_PER_DAY)] for _ in WEEKDAYS]
+            continue
+
+        selector, _, times = rule.partition(" ")
+        if _DAY_SELECTOR.match(selector):
+            days = _weekdays(selector)
+            times = times.strip()
+        else:
+            days, times = list(range(7)), rule
+
+        if times in ("off", "closed"):
+            for day in days:
+                week[day] = []
+            continue
+
+        spans = []
+        for span in times.replace(" ", "").split(","):
+            match = _TIME_SPAN.match(span)
+            if not match:
+                return None
+            start = int(match.group(1)) * 60 + int(match.group(2))
+            end = MINUTES_PER_DAY if match.group(5) else int(match.group(3)) * 60 + int(match.group(4))
+            if start > MINUTES_PER_DAY or end > 48 * 60:
+                return None
+            spans.append((start, end))
+
+        spilled: List[Tuple[int, Interval]] = []
+        for day in days:
+            week[day] = []
+            for start, end in spans:
+                if end > start:
+                    week[day].append((start, min(end, MINUTES_PER_DAY)))
+                    if end > MINUTES_PER_DAY:
+                        spilled.append(((day + 1) % 7, (0, end - MINUTES_PER_DAY)))
+                else:
+                    # Past midnight, e.g. 18:00-02:00
+                    week[day].append((start, MINUTES_PER_DAY))
+                    if end:
+                        spilled.append(((day + 1) % 7, (0, end)))
+
+        for day, interval in spilled:
+            week[day].append(interval)
+
+    return tuple(_merge(intervals) for intervals in week)
+
+
+def earliest_visit(
+    hours: Optional[WeeklyHours],
+    weekday: int,
+    arrival: int,
+    duration: int,
+    day_end: int
+) -> Optional[int]:
+    """
+    Earliest start (minutes after midnight) for a `duration` visit arriving
+    at `arrival` that ends inside opening hours and by `day_end`, waiting
+    for opening if needed. None when the visit does not fit that day.
+    Unknown hours (None) count as always open.
+    """
+
+    if hours is None:
+        return arrival if arrival + duration <= day_end else None
+
+    for open_at, close_at in hours[weekday]:
+        start = arrival if arrival > open_at else open_at
+        if start + duration <= (close_at if close_at < day_end else day_end):
+            return start
+
+    return None
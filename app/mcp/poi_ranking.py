@@ -0,0 +1,210 @@
+import heapq
+import numpy as np
+from itertools import repeat
+from operator import attrgetter, contains, eq
+from typing import Dict, List, Optional, Sequence
+
+from app.config import config
+from app.mcp.cache import TTLCache
+from app.mcp.poi_search import INTEREST_TAG_PAIRS, POISearchInput, POISearchOutput, cached_search
+from app.mcp.poi_table import StringTable
+
+
+# One bit per supported interest in RankingFeatures.interest_mask
+INTEREST_BITS = {interest: 1 << bit for bit, interest in enumerate(INTEREST_TAG_PAIRS)}
+
+# Tags that mark a well-known, well-documented place
+POPULARITY_TAG_WEIGHTS = {
+    "wikidata": 1.0,
+    "wikipedia": 0.75,
+    "heritage": 0.5,
+    "tourism": 0.5,
+    "website": 0.25,
+    "opening_hours": 0.25
+}
+
+# Matching one requested interest outweighs every popularity tag together
+RELEVANCE_WEIGHT = 4.0
+
+
+class RankingFeatures:
+    """
+    Per-POI ranking inputs as arrays, extracted from tags column by column.
+
+    interest_mask has the INTEREST_BITS of every interest a POI's tags
+    match; popularity sums POPULARITY_TAG_WEIGHTS over the tags present;
+    category holds StringTable codes used for the diversity penalty.
+    """
+
+    def __init__(self, interest_mask: np.ndarray, popularity: np.ndarray, category: np.ndarray, strings: StringTable):
+        self.interest_mask = interest_mask
+        self.popularity = popularity
+        self.category = category
+        self.strings = strings
+
+    @classmethod
+    def from_pois(cls, pois: Sequence[POISearchOutput]) -> "RankingFeatures":
+
+        n = len(pois)
+        tags = list(map(attrgetter("tags"), pois))
+
+        interest_mask = np.zeros(n, dtype=np.int32)
+        for interest, pairs in INTEREST_TAG_PAIRS.items():
+            matches = np.ones(n, dtype=np.bool_)
+            for key, value in pairs:
+                matches &= np.fromiter(map(eq, map(dict.get, tags, repeat(key)), repeat(value)), dtype=np.bool_, count=n)
+            interest_mask[matches] |= INTEREST_BITS[interest]
+
+        popularity = np.zeros(n, dtype=np.float64)
+        for key, weight in POPULARITY_TAG_WEIGHTS.items():
+            popularity += weight * np.fromiter(map(contains, tags, repeat(key)), dtype=np.bool_, count=n)
+
+        strings = StringTable()
+
+        return cls(
+            interest_mask,
+            popularity,
+            strings.codes(map(attrgetter("category"), pois), n),
+            strings
+        )
+
+    def __len__(self):
+        return len(self.popularity)
+
+
+# Features per cached search result list, keyed on the list's identity
+_features_cache = TTLCache(
+    maxsize=config.POI_CACHE_MAX_ENTRIES,
+    ttl=config.POI_CACHE_TTL_SECONDS + config.POI_CACHE_STALE_SECONDS
+)
+
+
+def candidate_features(pois: Sequence[POISearchOutput]) -> RankingFeatures:
+    """
+    RankingFeatures for a list that is not modified afterwards (such as
+    cached_search() results), extracted once for as long as it is cached.
+    """
+
+    entry = _features_cache.get(id(pois))
+
+    # The entry holds the list, so its id cannot be reused while cached
+    if entry is None or entry[0] is not pois:
+        entry = (pois, RankingFeatures.from_pois(pois))
+        _features_cache.set(id(pois), entry)
+
+    return entry[1]
+
+
+def score_pois(
+    features: RankingFeatures,
+    interests: Sequence[str],
+    weights: Optional[Dict[str, float]] = None
+) -> np.ndarray:
+    """
+    Relevance plus popularity per POI, vectorized over all candidates.
+
+    Relevance is the summed weight (1 by default) of the requested
+    interests a POI matches. POIs matching none of them score -inf.
+    """
+
+    relevance = np.zeros(len(features), dtype=np.float64)
+
+    for interest in dict.fromkeys(i.strip().lower() for i in interests):
+        bit = INTEREST_BITS.get(interest)
+        if bit is None:
+            continue
+        weight = (weights or {}).get(interest, 1.0)
+        relevance += weight * ((features.interest_mask & bit) != 0)
+
+    scores = RELEVANCE_WEIGHT * relevance + features.popularity
+    scores[relevance <= 0] = -np.inf
+
+    return scores
+
+
+def top_k_diverse(scores: np.ndarray, categories: np.ndarray, k: int, penalty: float) -> List[int]:
+    """
+    Indexes of the k best POIs, best first, where each POI's score drops by
+    `penalty` for every POI already picked from its category.
+
+    The penalty is the same for a whole category, so candidates are sorted
+    once per category and a heap holds only each category's next-best
+    candidate. Ties go to the earlier index.
+    """
+
+    valid = np.flatnonzero(np.isfinite(scores))
+    if k <= 0 or len(valid) == 0:
+        return []
+
+    # Grouped by category, best score first; lexsort is stable, so equal
+    # scores keep their original order
+    order = valid[np.lexsort((-scores[valid], categories[valid]))]
+    grouped_categories = categories[order]
+    starts = np.flatnonzero(np.r_[True, grouped_categories[1:] != grouped_categories[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+
+    # Each category yields at most k picks, so deeper candidates never matter
+    order = order[np.arange(len(order)) - np.repeat(starts, sizes) < k]
+    sizes = np.minimum(sizes, k)
+    ends = np.cumsum(sizes)
+
+    ordered_scores = scores[order].tolist()
+    order = order.tolist()
+    next_position = (ends - sizes).tolist()
+    ends = ends.tolist()
+    picked = [0] * len(next_position)
+
+    heap = [(-ordered_scores[start], order[start], group) for group, start in enumerate(next_position)]
+    heapq.heapify(heap)
+
+    selected = []
+
+    while heap and len(selected) < k:
+        _, index, group = heapq.heappop(heap)
+        selected.append(index)
+
+        picked[group] += 1
+        next_position[group] += 1
+
+        position = next_position[group]
+        if position < ends[group]:
+            heapq.heappush(heap, (-(ordered_scores[position] - penalty * picked[group]), order[position], group))
+
+    return selected
+
+
+def rank_pois(
+    pois: Sequence[POISearchOutput],
+    interests: Sequence[str],
+    k: int,
+    penalty: float = config.POI_DIVERSITY_PENALTY,
+    weights: Optional[Dict[str, float]] = None,
+    features: Optional[RankingFeatures] = None
+) -> List[POISearchOutput]:
+    """The k most relevant, popular and varied POIs for `interests`, best first."""
+
+    if features is None:
+        features = RankingFeatures.from_pois(pois)
+    scores = score_pois(features, interests, weights)
+
+    return [pois[i] for i in top_k_diverse(scores, features.category, k, penalty)]
+
+
+def search_ranked_pois(input_data: POISearchInput) -> List[POISearchOutput]:
+    """
+    Search POI_RANKING_CANDIDATE_FACTOR times max_results candidates (search
+    order says nothing about relevance) and rank them down to max_results.
+    """
+
+    candidates = cached_search(
+        input_data.model_copy(
+            update={"max_results": input_data.max_results * config.POI_RANKING_CANDIDATE_FACTOR}
+        )
+    )
+
+    return rank_pois(
+        candidates,
+        input_data.interests,
+        input_data.max_results,
+        features=candidate_features(candidates)
+    )
@@ -1,9 +1,21 @@
-import requests
-from typing import List
-from pydantic import BaseModel
+import asyncio
+import json
+import re
+import weakref
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
 
+from app.cities import CityProfile, get_city
+from app.config import config
+from app.mcp.cache import TTLCache
+from app.mcp.duration_model import get_duration_model
+from app.mcp.http_client import get_session, http_client
+from app.mcp.poi_store import StoredPOI, get_poi_store
+from app.mcp.singleflight import SingleFlight
 
-OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+OVERPASS_URL = config.OVERPASS_URL
 
 
 class POISearchInput(BaseModel):
@@ -18,9 +30,10 @@ class POISearchOutput(BaseModel):
     category: str
     lat: float
     lon: float
-    suggested_duration: int
+    suggested_duration: int  # minutes at the duration model's reference pace
     indoor: bool
     source: str
+    tags: Dict[str, str] = Field(default_factory=dict)
 
 
 INTEREST_TO_OSM_TAG = {
@@ -30,52 +43,281 @@ INTEREST_TO_OSM_TAG = {
     "nature": '["leisure"="park"]'
 }
 
+# (key, value) pairs parsed once from the Overpass filters above
+INTEREST_TAG_PAIRS = {
+    interest: re.findall(r'\["([^"]+)"="([^"]+)"\]', osm_filter)
+    for interest, osm_filter in INTEREST_TO_OSM_TAG.items()
+}
 
-def search_pois(input_data: POISearchInput) -> List[POISearchOutput]:
+poi_cache = TTLCache(
+    maxsize=config.POI_CACHE_MAX_ENTRIES,
+    ttl=config.POI_CACHE_TTL_SECONDS,
+    stale_ttl=config.POI_CACHE_STALE_SECONDS
+)
 
-    if input_data.city.lower() != "delhi":
-        raise ValueError("Currently only Delhi is supported.")
+# Concurrent cache misses for the same search share one store/Overpass lookup
+poi_flight = SingleFlight()
 
-    tag_queries = []
-    for interest in input_data.interests:
-        if interest in INTEREST_TO_OSM_TAG:
-            tag_queries.append(f'node{INTEREST_TO_OSM_TAG[interest]}(area.searchArea);')
+# Requests arriving at a cold store share the one refresh that seeds it
+seed_flight = SingleFlight()
 
-    if not tag_queries:
-        return []
 
-    overpass_query = f"""
+def _search_area(city: CityProfile):
+    """(area statement, node filter) for the city's most specific search area."""
+
+    if city.overpass_area_id is not None:
+        return f"area({city.overpass_area_id})->.searchArea;", "(area.searchArea)"
+
+    if city.bbox is not None:
+        # A bounding box needs no area lookup on the Overpass side
+        return "", "({},{},{},{})".format(*city.bbox)
+
+    return f'area["name"="{city.overpass_area_name or city.name}"]->.searchArea;', "(area.searchArea)"
+
+
+def _build_refresh_query(limit: int, city: CityProfile) -> str:
+    """
+    Every supported interest in one request, each capped at `limit` on its
+    own so a common tag cannot crowd the others out of the snapshot.
+    """
+
+    area_statement, area_filter = _search_area(city)
+
+    tag_queries = [
+        f'node{osm_filter}{area_filter}; out center {limit};'
+        for osm_filter in INTEREST_TO_OSM_TAG.values()
+    ]
+
+    return f"""
     [out:json];
-    area["name"="Delhi"]->.searchArea;
-    (
-        {"".join(tag_queries)}
-    );
-    out center {input_data.max_results};
+    {area_statement}
+    {"".join(tag_queries)}
     """
 
-    response = requests.post(OVERPASS_URL, data={"data": overpass_query})
-    data = response.json()
 
-    results = []
+def _refresh_elements(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # A POI matching several interests comes back once per interest;
+    # keep one copy, in the id order Overpass gives a single union
+    unique = {element["id"]: element for element in data.get("elements", [])}
+    return sorted(unique.values(), key=itemgetter("id"))
+
+
+def _matching_interests(tags: Dict[str, str]) -> List[str]:
+    return [
+        interest
+        for interest, pairs in INTEREST_TAG_PAIRS.items()
+        if all(tags.get(key) == value for key, value in pairs)
+    ]
+
+
+# Tags whose value names what a POI is, most specific first
+CATEGORY_TAG_KEYS = ("tourism", "historic", "amenity", "leisure", "shop")
+
+
+def _category(tags: Dict[str, str]) -> str:
+
+    for pairs in INTEREST_TAG_PAIRS.values():
+        if all(tags.get(key) == value for key, value in pairs):
+            return pairs[-1][1]
 
-    for element in data.get("elements", [])[: input_data.max_results]:
-        name = element.get("tags", {}).get("name")
-        if not name:
+    for key in CATEGORY_TAG_KEYS:
+        if key in tags:
+            return tags[key]
+
+    return next(iter(tags.values()))
+
+
+def _element_to_output(element: Dict[str, Any], category: str, suggested_duration: int) -> POISearchOutput:
+    return POISearchOutput(
+        poi_id=f"osm_{element['id']}",
+        name=element["tags"]["name"],
+        category=category,
+        lat=element.get("lat"),
+        lon=element.get("lon"),
+        suggested_duration=suggested_duration,
+        indoor=False,
+        source="OpenStreetMap",
+        tags=element["tags"]
+    )
+
+
+def _stored_to_element(poi: StoredPOI) -> Dict[str, Any]:
+    return {
+        "id": poi.osm_id,
+        "lat": poi.lat,
+        "lon": poi.lon,
+        "tags": poi.tags
+    }
+
+
+def load_overpass_elements(city: str, elements: List[Dict[str, Any]]) -> int:
+    """Replace the stored POIs for a city with an Overpass element list."""
+
+    stored = []
+    for element in elements:
+        tags = element.get("tags", {})
+        lat = element.get("lat", element.get("center", {}).get("lat"))
+        lon = element.get("lon", element.get("center", {}).get("lon"))
+
+        if not tags.get("name") or lat is None or lon is None:
             continue
 
-        category = list(element.get("tags", {}).values())[0]
-
-        results.append(
-            POISearchOutput(
-                poi_id=f"osm_{element['id']}",
-                name=name,
-                category=category,
-                lat=element.get("lat"),
-                lon=element.get("lon"),
-                suggested_duration=90,
-                indoor=False,
-                source="OpenStreetMap"
+        for interest in _matching_interests(tags):
+            stored.append(
+                StoredPOI(element["id"], interest, tags["name"], lat, lon, tags)
             )
-        )
 
-    return results
\ No newline at end of file
+    return get_poi_store().replace_city(get_city(city).name, stored)
+
+
+def import_overpass_snapshot(path: str, city: str = "Delhi") -> int:
+    """Load an Overpass JSON response saved to disk into the POI store."""
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    return load_overpass_elements(city, data.get("elements", []))
+
+
+def refresh_poi_store(city: str) -> int:
+    """Re-download every supported interest for a city from Overpass."""
+
+    response = get_session().post(
+        OVERPASS_URL,
+        data={"data": _build_refresh_query(config.POI_STORE_REFRESH_LIMIT, get_city(city))},
+        timeout=config.OVERPASS_TIMEOUT
+    )
+    response.raise_for_status()
+
+    return load_overpass_elements(city, _refresh_elements(response.json()))
+
+
+async def refresh_poi_store_async(city: str) -> int:
+    """refresh_poi_store() over the shared async client."""
+
+    response = await http_client.post(
+        OVERPASS_URL,
+        data={"data": _build_refresh_query(config.POI_STORE_REFRESH_LIMIT, get_city(city))},
+        timeout=config.OVERPASS_TIMEOUT
+    )
+    response.raise_for_status()
+
+    return load_overpass_elements(city, _refresh_elements(response.json()))
+
+
+def _elements_to_outputs(elements: List[Dict[str, Any]], max_results: int) -> List[POISearchOutput]:
+
+    named = [element for element in elements[:max_results] if element.get("tags", {}).get("name")]
+    categories = [_category(element["tags"]) for element in named]
+
+    # Durations for the whole result in one lookup, at the reference pace
+    durations = get_duration_model().durations(
+        categories, (element["tags"] for element in named), count=len(named)
+    ).tolist()
+
+    return list(map(_element_to_output, named, categories, durations))
+
+
+def _cache_key(input_data: POISearchInput):
+    # Interest order and case never change the Overpass result
+    return (
+        get_city(input_data.city).key,
+        frozenset(i.strip().lower() for i in input_data.interests),
+        input_data.max_results
+    )
+
+
+def _supported_interests(input_data: POISearchInput) -> List[str]:
+    return [
+        interest for interest in (i.strip().lower() for i in input_data.interests)
+        if interest in INTEREST_TO_OSM_TAG
+    ]
+
+
+def _search_pois_uncached(input_data: POISearchInput) -> List[POISearchOutput]:
+
+    interests = _supported_interests(input_data)
+
+    if not interests:
+        return []
+
+    city = get_city(input_data.city)
+    store = get_poi_store()
+    snapshot_path = _snapshot_path(city)
+
+    if not store.has_city(city.name):
+        if snapshot_path:
+            import_overpass_snapshot(snapshot_path, city.name)
+        else:
+            # Cold store: one Overpass refresh seeds it, and every request
+            # waiting on the city is answered from the result
+            seed_flight.do(city.key, lambda: refresh_poi_store(city.name))
+
+    # Overpass only ever refreshes the store, never a request
+    elif store.is_stale(city.name, config.POI_STORE_REFRESH_SECONDS):
+        store.refresh_in_background(city.name, refresh_poi_store)
+
+    return _elements_to_outputs(
+        [_stored_to_element(poi) for poi in store.query(city.name, interests, input_data.max_results)],
+        input_data.max_results
+    )
+
+
+def _snapshot_path(city: CityProfile) -> Optional[str]:
+    if city.poi_snapshot_path:
+        return city.poi_snapshot_path
+    if city.key == config.DEFAULT_CITY.lower():
+        return config.POI_SNAPSHOT_PATH
+    return None
+
+
+def cached_search(input_data: POISearchInput) -> List[POISearchOutput]:
+    """
+    The cached result list itself, shared by every caller with the same
+    search: read it, never modify it. A new list object means new results.
+    """
+
+    # Unsupported cities raise ValueError from the registry lookup in the key
+    key = _cache_key(input_data)
+
+    return poi_cache.get_or_load(
+        key,
+        lambda: poi_flight.do(key, lambda: _search_pois_uncached(input_data))
+    )
+
+
+def search_pois(input_data: POISearchInput) -> List[POISearchOutput]:
+    # Callers own the returned list; the cached one stays untouched
+    return list(cached_search(input_data))
+
+
+# Cold-store seeds in flight, per event loop and city; the async
+# counterpart of seed_flight
+_async_seeds: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def search_pois_async(input_data: POISearchInput) -> List[POISearchOutput]:
+
+    city = get_city(input_data.city)
+    interests = _supported_interests(input_data)
+    store = get_poi_store()
+
+    # Warm store or a snapshot on disk: no network on the request path
+    if not interests or store.has_city(city.name) or _snapshot_path(city):
+        return search_pois(input_data)
+
+    # Cold store: seed it over the async client, one refresh per city
+    in_flight = _async_seeds.setdefault(asyncio.get_running_loop(), {})
+    task = in_flight.get(city.key)
+
+    if task is None:
+        task = asyncio.ensure_future(refresh_poi_store_async(city.name))
+        in_flight[city.key] = task
+        task.add_done_callback(lambda _: in_flight.pop(city.key, None))
+
+    # One cancelled caller must not cancel the refresh the others share
+    await asyncio.shield(task)
+
+    return search_pois(input_data)
@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from app.config import config
+from app.logging_config import logger, log_error
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pois (
+    city TEXT NOT NULL,
+    interest TEXT NOT NULL,
+    osm_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    tags TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (city, interest, osm_id)
+);
+CREATE INDEX IF NOT EXISTS idx_pois_city_position ON pois (city, position);
+CREATE TABLE IF NOT EXISTS refreshes (
+    city TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL,
+    poi_count INTEGER NOT NULL
+);
+"""
+
+
+class StoredPOI(NamedTuple):
+    osm_id: int
+    interest: str
+    name: str
+    lat: float
+    lon: float
+    tags: Dict[str, str]
+    position: int = 0  # row order in the city's snapshot, set when loaded
+
+
+class POIStore:
+    """
+    SQLite-backed POI store.
+
+    Rows are persisted per city and mirrored in memory on first read, so
+    lookups never touch the network and rarely touch the disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cities: Dict[str, Dict[str, List[StoredPOI]]] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._refreshing: set = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def replace_city(self, city: str, pois: Iterable[StoredPOI]) -> int:
+        city_key = city.lower()
+        rows = [
+            (city_key, poi.interest, poi.osm_id, poi.name, poi.lat, poi.lon, json.dumps(poi.tags), position)
+            for position, poi in enumerate(pois)
+        ]
+        refreshed_at = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM pois WHERE city = ?", (city_key,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO pois VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO refreshes VALUES (?, ?, ?)",
+                    (city_key, refreshed_at, len(rows))
+                )
+            self._cities.pop(city_key, None)
+            self._refreshed_at[city_key] = refreshed_at
+
+        return len(rows)
+
+    def _load_city(self, city_key: str) -> Dict[str, List[StoredPOI]]:
+        by_interest = self._cities.get(city_key)
+        if by_interest is not None:
+            return by_interest
+
+        with self._lock:
+            by_interest = self._cities.get(city_key)
+            if by_interest is not None:
+                return by_interest
+
+            conn = self._connect()
+            by_interest = {}
+            for interest, osm_id, name, lat, lon, tags, position in conn.execute(
+                "SELECT interest, osm_id, name, lat, lon, tags, position FROM pois "
+                "WHERE city = ? ORDER BY position",
+                (city_key,)
+            ):
+                by_interest.setdefault(interest, []).append(
+                    StoredPOI(osm_id, interest, name, lat, lon, json.loads(tags), position)
+                )
+
+            row = conn.execute(
+                "SELECT refreshed_at FROM refreshes WHERE city = ?", (city_key,)
+            ).fetchone()
+            if row:
+                self._refreshed_at[city_key] = row[0]
+
+            self._cities[city_key] = by_interest
+            return by_interest
+
+    def has_city(self, city: str) -> bool:
+        """True once the city has a snapshot, even one with no POIs in it."""
+        city_key = city.lower()
+        return bool(self._load_city(city_key)) or city_key in self._refreshed_at
+
+    def query(self, city: str, interests: List[str], limit: int) -> List[StoredPOI]:
+        by_interest = self._load_city(city.lower())
+
+        if len(interests) == 1:
+            return by_interest.get(interests[0], [])[:limit]
+
+        # Merge the per-interest lists back into snapshot order
+        candidates = []
+        for interest in interests:
+            candidates.extend(by_interest.get(interest, []))
+        candidates.sort(key=lambda poi: poi.position)
+
+        results = []
+        seen = set()
+        for poi in candidates:
+            if poi.osm_id in seen:
+                continue
+            seen.add(poi.osm_id)
+            results.append(poi)
+            if len(results) >= limit:
+                break
+
+        return results
+
+    def is_stale(self, city: str, max_age_seconds: float) -> bool:
+        city_key = city.lower()
+        self._load_city(city_key)
+        refreshed_at = self._refreshed_at.get(city_key)
+        return refreshed_at is None or time.time() - refreshed_at > max_age_seconds
+
+    def refresh_in_background(
+        self,
+        city: str,
+        refresh: Callable[[str], int],
+        retry_seconds: float = config.POI_STORE_RETRY_SECONDS
+    ) -> bool:
+        """
+        Run refresh(city) on a daemon thread unless one is already running,
+        or the last one failed less than `retry_seconds` ago.
+        """
+        city_key = city.lower()
+
+        with self._lock:
+            if city_key in self._refreshing:
+                return False
+            failed_at = self._failed_at.get(city_key)
+            if failed_at is not None and time.time() - failed_at < retry_seconds:
+                return False
+            self._refreshing.add(city_key)
+
+        def run():
+            try:
+                refresh(city)
+            except Exception as e:
+                # A failed refresh keeps serving the previous snapshot, and
+                # the stale store does not retry until retry_seconds pass
+                with self._lock:
+                    self._failed_at[city_key] = time.time()
+                log_error(logger, e, f"POI store refresh failed for {city}")
+            else:
+                with self._lock:
+                    self._failed_at.pop(city_key, None)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(city_key)
+
+        threading.Thread(target=run, name=f"poi-refresh-{city_key}", daemon=True).start()
+        return True
+
+
+_store: Optional[POIStore] = None
+_store_lock = threading.Lock()
+
+
+def get_poi_store() -> POIStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = POIStore(config.POI_STORE_PATH)
+    return _store
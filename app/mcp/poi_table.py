@@ -0,0 +1,182 @@
+import sys
+import numpy as np
+from functools import cached_property
+from itertools import repeat
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.mcp.duration_model import get_duration_model
+from app.mcp.opening_hours import WeeklyHours, parse_opening_hours
+from app.mcp.poi_search import POISearchOutput
+from app.mcp.travel_time import AVG_SPEED_KMH, TRAFFIC_BUFFER_MINUTES, haversine_distance
+from app.state import DayPlan, POIBlock
+
+
+# "HH:MM" for every start minute, so day_plan() formats by list lookup;
+# two days' worth covers daily windows that run past midnight
+_CLOCK_TIMES = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(48 * 60)]
+
+
+class StringTable:
+    """Interned strings addressed by integer code."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def codes(self, values: Iterable[str], count: int = -1) -> np.ndarray:
+        known = self._codes
+        return np.fromiter(
+            (known[value] if value in known else self.code(value) for value in values),
+            dtype=np.int32,
+            count=count
+        )
+
+
+class POITable:
+    """
+    Columnar POIs for the scheduler.
+
+    Numeric fields are NumPy arrays, one row per POI in search order.
+    Categories and sources repeat across POIs and are stored as codes into
+    a shared StringTable; ids and names are unique and kept as plain lists.
+    Opening hours are parsed once per distinct tag value (None when a POI
+    has none or they cannot be parsed). The scheduler works on row numbers
+    only, and POIBlocks are made just for the rows that end up on a day.
+    """
+
+    def __init__(
+        self,
+        strings: StringTable,
+        poi_ids: List[str],
+        names: List[str],
+        category: np.ndarray,
+        source: np.ndarray,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        duration: np.ndarray,
+        indoor: np.ndarray,
+        hours: List[Optional[WeeklyHours]]
+    ):
+        self.strings = strings
+        self.poi_ids = poi_ids
+        self.names = names
+        self.category = category
+        self.source = source
+        self.lat = lat
+        self.lon = lon
+        self.duration = duration
+        self.indoor = indoor
+        self.hours = hours
+
+    @classmethod
+    def from_pois(
+        cls,
+        pois: Sequence[POISearchOutput],
+        strings: Optional[StringTable] = None,
+        pace: Optional[str] = None
+    ) -> "POITable":
+        """
+        Columns for `pois`. Durations are each POI's suggested_duration, or
+        the duration model's minutes for `pace` when one is given.
+        """
+
+        strings = strings if strings is not None else StringTable()
+        n = len(pois)
+        categories = list(map(attrgetter("category"), pois))
+        tags = list(map(attrgetter("tags"), pois))
+
+        if pace is None:
+            duration = np.fromiter(map(attrgetter("suggested_duration"), pois), dtype=np.int32, count=n)
+        else:
+            duration = get_duration_model().durations(categories, tags, pace, n)
+
+        return cls(
+            strings,
+            poi_ids=list(map(attrgetter("poi_id"), pois)),
+            names=list(map(attrgetter("name"), pois)),
+            category=strings.codes(categories, n),
+            source=strings.codes(map(attrgetter("source"), pois), n),
+            lat=np.fromiter(map(attrgetter("lat"), pois), dtype=np.float64, count=n),
+            lon=np.fromiter(map(attrgetter("lon"), pois), dtype=np.float64, count=n),
+            duration=duration,
+            indoor=np.fromiter(map(attrgetter("indoor"), pois), dtype=np.bool_, count=n),
+            hours=list(map(parse_opening_hours, map(dict.get, tags, repeat("opening_hours"))))
+        )
+
+    def __len__(self):
+        return len(self.poi_ids)
+
+    def head(self, n: int) -> "POITable":
+        """The first `n` rows, sharing this table's arrays and strings."""
+        return POITable(
+            self.strings,
+            self.poi_ids[:n], self.names[:n], self.category[:n], self.source[:n],
+            self.lat[:n], self.lon[:n], self.duration[:n], self.indoor[:n], self.hours[:n]
+        )
+
+    def travel_minutes(self, from_row: int, to_row: int, speed_kmh: float = AVG_SPEED_KMH) -> int:
+        """Travel minutes between two rows, as estimate_travel_time() would give."""
+        rows = self._rows
+        distance = haversine_distance(rows[from_row][3], rows[from_row][4], rows[to_row][3], rows[to_row][4])
+        return int(distance / speed_kmh * 60) + TRAFFIC_BUFFER_MINUTES
+
+    @cached_property
+    def _rows(self) -> List[tuple]:
+        # Python-native row values, converted once for every day_plan() call
+        values = self.strings.values
+        return list(zip(
+            self.poi_ids,
+            self.names,
+            [values[code] for code in self.category.tolist()],
+            self.lat.tolist(),
+            self.lon.tolist(),
+            self.duration.tolist(),
+            self.indoor.tolist(),
+            [values[code] for code in self.source.tolist()]
+        ))
+
+    def day_plan(
+        self,
+        day: int,
+        rows: List[int],
+        travel_minutes: List[int],
+        start_minutes: Optional[List[int]] = None
+    ) -> DayPlan:
+        """
+        Materialize one scheduled day. travel_minutes[i] is the leg into
+        rows[i] and start_minutes[i] its visit start after midnight.
+        """
+
+        table_rows = self._rows
+        blocks = []
+
+        for row, minutes, start in zip(rows, travel_minutes, start_minutes or repeat(None)):
+            poi_id, name, category, lat, lon, duration, indoor, source = table_rows[row]
+            blocks.append(POIBlock(
+                poi_id=poi_id,
+                name=name,
+                category=category,
+                lat=lat,
+                lon=lon,
+                duration_minutes=duration,
+                travel_minutes_from_previous=minutes,
+                indoor=indoor,
+                source=source,
+                start_time=None if start is None else _CLOCK_TIMES[start]
+            ))
+
+        return DayPlan(day=day, blocks=blocks)
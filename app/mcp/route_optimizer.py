@@ -0,0 +1,84 @@
+import time
+import numpy as np
+from typing import List, Optional
+
+
+def sweep_clusters(lats: np.ndarray, lons: np.ndarray, cluster_size: int) -> List[List[int]]:
+    """
+    Split points into geographic clusters of at most `cluster_size`.
+
+    Points are swept by bearing around their centroid, starting after the
+    widest angular gap, so each cluster is a compact wedge of the city.
+    """
+
+    n = len(lats)
+    if n == 0:
+        return []
+
+    angles = np.arctan2(lats - lats.mean(), (lons - lons.mean()) * np.cos(np.radians(lats.mean())))
+    order = np.argsort(angles)
+
+    if n > 1:
+        sorted_angles = angles[order]
+        gaps = np.diff(np.append(sorted_angles, sorted_angles[0] + 2 * np.pi))
+        order = np.roll(order, -(int(np.argmax(gaps)) + 1))
+
+    return [order[i:i + cluster_size].tolist() for i in range(0, n, cluster_size)]
+
+
+def route_minutes(route: List[int], minutes: np.ndarray) -> int:
+    return int(sum(minutes[a, b] for a, b in zip(route, route[1:])))
+
+
+def nearest_neighbour_route(nodes: List[int], minutes: np.ndarray) -> List[int]:
+    """Best open nearest-neighbour path over every possible start node."""
+
+    best_route, best_cost = list(nodes), None
+
+    for start in nodes:
+        route = [start]
+        remaining = set(nodes)
+        remaining.discard(start)
+
+        while remaining:
+            last = route[-1]
+            nxt = min(remaining, key=lambda node: minutes[last, node])
+            route.append(nxt)
+            remaining.discard(nxt)
+
+        cost = route_minutes(route, minutes)
+        if best_cost is None or cost < best_cost:
+            best_route, best_cost = route, cost
+
+    return best_route
+
+
+def two_opt(route: List[int], minutes: np.ndarray, deadline: Optional[float] = None) -> List[int]:
+    """Improve an open path with 2-opt segment reversals until no gain or deadline."""
+
+    route = list(route)
+    improved = True
+
+    while improved:
+        improved = False
+
+        for i in range(len(route) - 1):
+            if deadline is not None and time.perf_counter() > deadline:
+                return route
+
+            for j in range(i + 1, len(route)):
+                # Open path: edge (i-1, i) may be missing at the start,
+                # edge (j, j+1) may be missing at the end
+                a_prev = route[i - 1] if i > 0 else None
+                b_next = route[j + 1] if j + 1 < len(route) else None
+
+                old = (minutes[a_prev, route[i]] if a_prev is not None else 0) + \
+                    (minutes[route[j], b_next] if b_next is not None else 0)
+                new = (minutes[a_prev, route[j]] if a_prev is not None else 0) + \
+                    (minutes[route[i], b_next] if b_next is not None else 0)
+
+                if new < old:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    improved = True
+
+    return route
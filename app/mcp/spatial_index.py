@@ -0,0 +1,302 @@
+import math
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import config
+from app.mcp.travel_time import EARTH_RADIUS_KM, haversine_to_many
+
+
+KM_PER_DEGREE = 2 * math.pi * EARTH_RADIUS_KM / 360
+
+Cell = Tuple[int, int]
+Predicate = Callable[[object], bool]
+
+
+class SpatialIndex:
+    """
+    Uniform lat/lon grid over POIs for radius, k-nearest and bounding-box
+    queries.
+
+    Cells are roughly `cell_km` square at the latitude of the first POI
+    added. Accepts anything with poi_id/lat/lon attributes; a POI whose
+    poi_id is already indexed is ignored. Adding POIs only touches their
+    own cells, so an index can grow with a trip's pool, and so does
+    discarding them.
+    """
+
+    def __init__(self, pois: Iterable = (), cell_km: float = config.SPATIAL_INDEX_CELL_KM):
+        self.cell_km = cell_km
+        self._cell_lat = cell_km / KM_PER_DEGREE
+        self._cell_lon: Optional[float] = None
+
+        self._items: List = []
+        self._ids: Dict[str, int] = {}
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lons = np.empty(0, dtype=np.float64)
+        self._cells: Dict[Cell, List[int]] = {}
+
+        # Occupied cell range, so scans never walk empty grid
+        self._rows = (0, -1)
+        self._cols = (0, -1)
+
+        self.extend(pois)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, poi_id: str):
+        return poi_id in self._ids
+
+    def __iter__(self):
+        """Indexed POIs in the order they were added."""
+        return (item for item in self._items if item is not None)
+
+    def get(self, poi_id: str):
+        """The indexed POI with this id, or None."""
+        i = self._ids.get(poi_id)
+        return None if i is None else self._items[i]
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        return math.floor(lat / self._cell_lat), math.floor(lon / self._cell_lon)
+
+    def _reserve(self, size: int):
+        if size <= len(self._lats):
+            return
+        capacity = max(size, 2 * len(self._lats), 64)
+        lats = np.empty(capacity, dtype=np.float64)
+        lons = np.empty(capacity, dtype=np.float64)
+        lats[:len(self._items)] = self._lats[:len(self._items)]
+        lons[:len(self._items)] = self._lons[:len(self._items)]
+        self._lats, self._lons = lats, lons
+
+    def add(self, poi) -> bool:
+        return self.extend([poi]) == 1
+
+    def extend(self, pois: Iterable) -> int:
+        """Index `pois`, skipping ids already present. Returns how many were added."""
+
+        new = []
+        for poi in pois:
+            if poi.poi_id not in self._ids:
+                self._ids[poi.poi_id] = len(self._items) + len(new)
+                new.append(poi)
+
+        if not new:
+            return 0
+
+        if self._cell_lon is None:
+            self._cell_lon = self._cell_lat / max(math.cos(math.radians(new[0].lat)), 0.01)
+
+        start = len(self._items)
+        self._reserve(start + len(new))
+        self._items.extend(new)
+
+        lats = self._lats[start:start + len(new)]
+        lons = self._lons[start:start + len(new)]
+        lats[:] = [poi.lat for poi in new]
+        lons[:] = [poi.lon for poi in new]
+
+        rows = np.floor(lats / self._cell_lat).astype(np.int64)
+        cols = np.floor(lons / self._cell_lon).astype(np.int64)
+
+        cells = self._cells
+        for i, cell in enumerate(zip(rows.tolist(), cols.tolist()), start):
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = [i]
+            else:
+                bucket.append(i)
+
+        if start == 0:
+            self._rows = (int(rows.min()), int(rows.max()))
+            self._cols = (int(cols.min()), int(cols.max()))
+        else:
+            self._rows = (min(self._rows[0], int(rows.min())), max(self._rows[1], int(rows.max())))
+            self._cols = (min(self._cols[0], int(cols.min())), max(self._cols[1], int(cols.max())))
+
+        return len(new)
+
+    def discard(self, poi_id: str) -> bool:
+        """
+        Drop a POI from its cell. Its slot stays empty and adding it again
+        takes a new one. Returns whether it was indexed.
+        """
+
+        i = self._ids.pop(poi_id, None)
+        if i is None:
+            return False
+
+        cell = self._cell(float(self._lats[i]), float(self._lons[i]))
+        bucket = self._cells[cell]
+        bucket.remove(i)
+        if not bucket:
+            del self._cells[cell]
+        self._items[i] = None
+
+        return True
+
+    def _indexes_in(self, row_lo: int, row_hi: int, col_lo: int, col_hi: int) -> List[int]:
+
+        row_lo, row_hi = max(row_lo, self._rows[0]), min(row_hi, self._rows[1])
+        col_lo, col_hi = max(col_lo, self._cols[0]), min(col_hi, self._cols[1])
+
+        if row_lo > row_hi or col_lo > col_hi:
+            return []
+
+        found = []
+
+        if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > len(self._cells):
+            # Window wider than the occupied cells: walk those instead
+            for (row, col), bucket in self._cells.items():
+                if row_lo <= row <= row_hi and col_lo <= col <= col_hi:
+                    found.extend(bucket)
+            return found
+
+        cells = self._cells
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                bucket = cells.get((row, col))
+                if bucket:
+                    found.extend(bucket)
+
+        return found
+
+    def _filter(self, indexes: List[int], where: Optional[Predicate]) -> List[int]:
+        if where is None:
+            return indexes
+        items = self._items
+        return [i for i in indexes if where(items[i])]
+
+    def _lon_span(self, lat: float, km: float) -> float:
+        """Degrees of longitude covering `km` anywhere within `km` of `lat`."""
+        widest = min(abs(lat) + km / KM_PER_DEGREE, 90.0)
+        cos_lat = math.cos(math.radians(widest))
+        return 360.0 if cos_lat < 1e-6 else km / (KM_PER_DEGREE * cos_lat)
+
+    def _min_cell_km(self, lat: float, ring: int) -> float:
+        """Narrowest cell edge, in km, within `ring` cells of `lat`."""
+        widest = min(abs(lat) + (ring + 1) * self._cell_lat, 90.0)
+        return min(self.cell_km, self._cell_lon * KM_PER_DEGREE * math.cos(math.radians(widest)))
+
+    def within_radius(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        where: Optional[Predicate] = None
+    ) -> List[Tuple[object, float]]:
+        """(poi, distance_km) for every POI within `radius_km`, nearest first."""
+
+        if not self._ids:
+            return []
+
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = self._lon_span(lat, radius_km)
+        row_lo, col_lo = self._cell(lat - dlat, lon - dlon)
+        row_hi, col_hi = self._cell(lat + dlat, lon + dlon)
+
+        indexes = np.array(
+            self._filter(self._indexes_in(row_lo, row_hi, col_lo, col_hi), where), dtype=np.int64
+        )
+        distances = haversine_to_many(lat, lon, self._lats[indexes], self._lons[indexes])
+
+        inside = distances <= radius_km
+        indexes, distances = indexes[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+
+        return [(self._items[i], float(d)) for i, d in zip(indexes[order].tolist(), distances[order].tolist())]
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 1,
+        where: Optional[Predicate] = None,
+        max_km: Optional[float] = None
+    ) -> List[Tuple[object, float]]:
+        """
+        Up to `k` (poi, distance_km) pairs closest to (lat, lon), nearest first.
+
+        Scans rings of cells outward from the query cell and stops once the
+        k-th best distance is closer than any cell not yet scanned.
+        """
+
+        if k <= 0 or not self._ids:
+            return []
+
+        row, col = self._cell(lat, lon)
+        rows, cols = self._rows, self._cols
+
+        # Rings closer than the occupied range are empty
+        ring = max(0, rows[0] - row, row - rows[1], cols[0] - col, col - cols[1])
+        last_ring = max(row - rows[0], rows[1] - row, col - cols[0], cols[1] - col)
+
+        best_indexes = np.empty(0, dtype=np.int64)
+        best_distances = np.empty(0, dtype=np.float64)
+
+        while ring <= last_ring:
+
+            if ring == 0:
+                indexes = self._indexes_in(row, row, col, col)
+            else:
+                indexes = self._indexes_in(row - ring, row - ring, col - ring, col + ring)
+                indexes += self._indexes_in(row + ring, row + ring, col - ring, col + ring)
+                indexes += self._indexes_in(row - ring + 1, row + ring - 1, col - ring, col - ring)
+                indexes += self._indexes_in(row - ring + 1, row + ring - 1, col + ring, col + ring)
+
+            indexes = self._filter(indexes, where)
+
+            if indexes:
+                indexes = np.array(indexes, dtype=np.int64)
+                distances = haversine_to_many(lat, lon, self._lats[indexes], self._lons[indexes])
+
+                best_indexes = np.concatenate([best_indexes, indexes])
+                best_distances = np.concatenate([best_distances, distances])
+
+                if len(best_distances) > k:
+                    keep = np.argpartition(best_distances, k - 1)[:k]
+                    best_indexes, best_distances = best_indexes[keep], best_distances[keep]
+
+            # Every unscanned POI lies at least `ring` whole cells away
+            cleared_km = ring * self._min_cell_km(lat, ring)
+
+            if len(best_distances) == k and best_distances.max() <= cleared_km:
+                break
+            if max_km is not None and cleared_km >= max_km:
+                break
+
+            ring += 1
+
+        if max_km is not None:
+            inside = best_distances <= max_km
+            best_indexes, best_distances = best_indexes[inside], best_distances[inside]
+
+        order = np.argsort(best_distances, kind="stable")
+
+        return [
+            (self._items[i], float(d))
+            for i, d in zip(best_indexes[order].tolist(), best_distances[order].tolist())
+        ]
+
+    def in_bbox(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        where: Optional[Predicate] = None
+    ) -> List:
+        """POIs inside the box, in the order they were added."""
+
+        if not self._ids:
+            return []
+
+        row_lo, col_lo = self._cell(south, west)
+        row_hi, col_hi = self._cell(north, east)
+
+        indexes = np.array(sorted(self._indexes_in(row_lo, row_hi, col_lo, col_hi)), dtype=np.int64)
+        lats, lons = self._lats[indexes], self._lons[indexes]
+        inside = (lats >= south) & (lats <= north) & (lons >= west) & (lons <= east)
+
+        items = [self._items[i] for i in indexes[inside].tolist()]
+        return items if where is None else [poi for poi in items if where(poi)]
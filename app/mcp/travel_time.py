@@ -1,7 +1,22 @@
 import math
+import numpy as np
+from typing import Dict, List, Sequence
 from pydantic import BaseModel
 
 
+EARTH_RADIUS_KM = 6371
+
+# Default city heuristic (Delhi): average effective city speed ≈ 25 km/h.
+# Each city profile carries its own avg_speed_kmh.
+AVG_SPEED_KMH = 25
+
+# Added to every leg for traffic variability
+TRAFFIC_BUFFER_MINUTES = 10
+
+# Rows computed per vectorized block, bounds temporary memory for large N
+MATRIX_BLOCK_ROWS = 512
+
+
 class TravelTimeInput(BaseModel):
     lat1: float
     lon1: float
@@ -15,7 +30,7 @@ class TravelTimeOutput(BaseModel):
 
 
 def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # Earth radius in km
+    R = EARTH_RADIUS_KM
 
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
@@ -30,7 +45,7 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     return R * c
 
 
-def estimate_travel_time(input_data: TravelTimeInput) -> TravelTimeOutput:
+def estimate_travel_time(input_data: TravelTimeInput, speed_kmh: float = AVG_SPEED_KMH) -> TravelTimeOutput:
     distance = haversine_distance(
         input_data.lat1,
         input_data.lon1,
@@ -38,17 +53,123 @@ def estimate_travel_time(input_data: TravelTimeInput) -> TravelTimeOutput:
         input_data.lon2
     )
 
-    # Delhi city heuristic:
-    # Average effective city speed ≈ 25 km/h
-    avg_speed_kmh = 25
-
-    travel_time_hours = distance / avg_speed_kmh
+    travel_time_hours = distance / speed_kmh
     travel_time_minutes = int(travel_time_hours * 60)
 
     # Add 10 minute buffer for traffic variability
-    travel_time_minutes += 10
+    travel_time_minutes += TRAFFIC_BUFFER_MINUTES
 
     return TravelTimeOutput(
         distance_km=round(distance, 2),
         estimated_travel_minutes=travel_time_minutes
-    )
\ No newline at end of file
+    )
+
+
+class TravelMatrix:
+    """
+    Pairwise travel estimates for a fixed list of POIs.
+
+    minutes[i, j] equals estimate_travel_time() between POI i and POI j;
+    the diagonal is 0 because staying put needs no travel.
+    """
+
+    def __init__(self, poi_ids: List[str], distance_km: np.ndarray, minutes: np.ndarray):
+        self.poi_ids = poi_ids
+        self.distance_km = distance_km
+        self.minutes = minutes
+        self._index: Dict[str, int] = {poi_id: i for i, poi_id in enumerate(poi_ids)}
+
+    def __len__(self):
+        return len(self.poi_ids)
+
+    def index_of(self, poi_id: str) -> int:
+        return self._index[poi_id]
+
+    def travel_minutes(self, from_poi_id: str, to_poi_id: str) -> int:
+        return int(self.minutes[self._index[from_poi_id], self._index[to_poi_id]])
+
+    def distance(self, from_poi_id: str, to_poi_id: str) -> float:
+        return float(self.distance_km[self._index[from_poi_id], self._index[to_poi_id]])
+
+
+def haversine_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """N×N great-circle distances in km, same formula as haversine_distance."""
+
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_phi = np.cos(phi)
+
+    n = len(phi)
+    distances = np.empty((n, n), dtype=np.float64)
+
+    for start in range(0, n, MATRIX_BLOCK_ROWS):
+        rows = slice(start, start + MATRIX_BLOCK_ROWS)
+
+        delta_phi = phi[None, :] - phi[rows, None]
+        delta_lambda = lam[None, :] - lam[rows, None]
+
+        a = np.sin(delta_phi / 2) ** 2 + \
+            cos_phi[rows, None] * cos_phi[None, :] * np.sin(delta_lambda / 2) ** 2
+
+        distances[rows] = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return distances
+
+
+def haversine_to_many(lat, lon, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Distances in km from (lat, lon) to each of `lats`/`lons`. Broadcasts,
+    so `lat`/`lon` may also be arrays of the same length (pairwise legs).
+    """
+
+    phi1 = np.radians(lat)
+    phi2 = np.radians(lats)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(lons) - np.radians(lon)
+
+    a = np.sin(delta_phi / 2) ** 2 + \
+        np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def minutes_for_distance(distance_km: np.ndarray, speed_kmh: float = AVG_SPEED_KMH) -> np.ndarray:
+    """Vectorized estimate_travel_time() minutes for distances in km."""
+    return (distance_km / speed_kmh * 60).astype(np.int32) + TRAFFIC_BUFFER_MINUTES
+
+
+def leg_minutes(lats: np.ndarray, lons: np.ndarray, speed_kmh: float = AVG_SPEED_KMH) -> np.ndarray:
+    """
+    Travel minutes between consecutive points: entry i is the leg from
+    point i to point i + 1, equal to the matching travel matrix entry.
+    """
+    return minutes_for_distance(haversine_to_many(lats[:-1], lons[:-1], lats[1:], lons[1:]), speed_kmh)
+
+
+def coordinate_travel_matrix(
+    poi_ids: List[str],
+    lats: np.ndarray,
+    lons: np.ndarray,
+    speed_kmh: float = AVG_SPEED_KMH
+) -> TravelMatrix:
+
+    distance_km = haversine_matrix(lats, lons)
+
+    minutes = minutes_for_distance(distance_km, speed_kmh)
+    np.fill_diagonal(minutes, 0)
+
+    return TravelMatrix(poi_ids, distance_km, minutes)
+
+
+def travel_time_matrix(pois: Sequence, speed_kmh: float = AVG_SPEED_KMH) -> TravelMatrix:
+    """
+    Compute every pairwise leg between `pois` in one vectorized pass.
+
+    Accepts anything with poi_id/lat/lon attributes (POISearchOutput,
+    POIBlock). `speed_kmh` is the city's average effective speed.
+    """
+
+    lats = np.fromiter((poi.lat for poi in pois), dtype=np.float64, count=len(pois))
+    lons = np.fromiter((poi.lon for poi in pois), dtype=np.float64, count=len(pois))
+
+    return coordinate_travel_matrix([poi.poi_id for poi in pois], lats, lons, speed_kmh)
@@ -1,6 +1,14 @@
-import requests
+import asyncio
+import weakref
+from datetime import date, timedelta
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.cities import get_city
+from app.config import config
+from app.mcp.cache import TTLCache
+from app.mcp.http_client import get_session, http_client
+from app.mcp.singleflight import SingleFlight
 
 
 class WeatherDay(BaseModel):
@@ -14,21 +22,21 @@ class WeatherOutput(BaseModel):
     forecast: List[WeatherDay]
 
 
-def get_delhi_weather() -> WeatherOutput:
+# Delhi coordinates
+DELHI_LAT = 28.6139
+DELHI_LON = 77.2090
 
-    # Delhi coordinates
-    lat = 28.6139
-    lon = 77.2090
 
-    url = (
-        "https://api.open-meteo.com/v1/forecast"
-        f"?latitude={lat}&longitude={lon}"
-        "&daily=temperature_2m_max,temperature_2m_min,precipitation_sum"
-        "&timezone=auto"
-    )
+def _forecast_params(lat: float, lon: float) -> Dict[str, Any]:
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
+        "timezone": "auto"
+    }
+
 
-    response = requests.get(url)
-    data = response.json()
+def _parse_forecast(data: Dict[str, Any]) -> WeatherOutput:
 
     forecast = []
 
@@ -42,4 +50,152 @@ def get_delhi_weather() -> WeatherOutput:
             )
         )
 
-    return WeatherOutput(forecast=forecast)
\ No newline at end of file
+    return WeatherOutput(forecast=forecast)
+
+
+# Forecasts keyed on (lat bucket, lon bucket, date). Stale entries are served
+# while one background refresh runs, so a slow open-meteo never blocks a warm bucket.
+weather_cache = TTLCache(
+    maxsize=config.WEATHER_CACHE_MAX_ENTRIES,
+    ttl=config.WEATHER_CACHE_TTL_SECONDS,
+    stale_ttl=config.WEATHER_CACHE_STALE_SECONDS
+)
+
+# Concurrent misses on one bucket share a single upstream fetch
+weather_flight = SingleFlight()
+
+WeatherKey = Tuple[float, float, str]
+
+
+def _cache_key(lat: float, lon: float, day: Optional[date] = None) -> WeatherKey:
+    decimals = config.WEATHER_BUCKET_DECIMALS
+    return (
+        round(lat, decimals),
+        round(lon, decimals),
+        (day or date.today()).isoformat()
+    )
+
+
+def _fetch_forecast(key: WeatherKey) -> WeatherOutput:
+
+    lat, lon, _ = key
+
+    response = get_session().get(
+        config.OPEN_METEO_URL,
+        params=_forecast_params(lat, lon),
+        timeout=config.HTTP_TIMEOUT
+    )
+    response.raise_for_status()
+
+    return _parse_forecast(response.json())
+
+
+def _stale_forecast(key: WeatherKey) -> Optional[WeatherOutput]:
+    """Yesterday's forecast for the bucket, minus the days already past."""
+
+    lat, lon, today = key
+    yesterday = date.fromisoformat(today) - timedelta(days=1)
+
+    previous = weather_cache.get(_cache_key(lat, lon, yesterday))
+    if previous is None:
+        return None
+
+    forecast = [day for day in previous.forecast if day.date >= today]
+    return WeatherOutput(forecast=forecast) if forecast else None
+
+
+def get_weather(lat: float, lon: float) -> WeatherOutput:
+    """
+    Cached 3-day forecast for the coordinate bucket containing (lat, lon).
+
+    Falls back to the previous day's cached forecast when open-meteo fails
+    and there is no entry for today yet.
+    """
+
+    key = _cache_key(lat, lon)
+
+    try:
+        return weather_cache.get_or_load(
+            key,
+            lambda: weather_flight.do(key, lambda: _fetch_forecast(key))
+        )
+    except Exception:
+        fallback = _stale_forecast(key)
+        if fallback is None:
+            raise
+        return fallback
+
+
+async def _fetch_forecast_async(key: WeatherKey) -> WeatherOutput:
+
+    lat, lon, _ = key
+
+    response = await http_client.get(
+        config.OPEN_METEO_URL,
+        params=_forecast_params(lat, lon)
+    )
+    response.raise_for_status()
+
+    value = _parse_forecast(response.json())
+    weather_cache.set(key, value)
+    return value
+
+
+# Async misses in flight, per event loop and bucket; the async
+# counterpart of weather_flight
+_async_fetches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[WeatherKey, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_weather_async(lat: float, lon: float) -> WeatherOutput:
+    """
+    get_weather() without a worker thread. Cache hits return at once (stale
+    ones revalidate in the background as usual); misses fetch over the
+    shared async client, and concurrent misses for a bucket await one fetch.
+    """
+
+    key = _cache_key(lat, lon)
+
+    # One lookup: a hit is served from it, and it never fetches in this thread
+    cached = weather_cache.get(
+        key,
+        revalidate=lambda: weather_flight.do(key, lambda: _fetch_forecast(key))
+    )
+    if cached is not None:
+        return cached
+
+    in_flight = _async_fetches.setdefault(asyncio.get_running_loop(), {})
+    task = in_flight.get(key)
+
+    if task is None:
+        task = asyncio.ensure_future(_fetch_forecast_async(key))
+        in_flight[key] = task
+        task.add_done_callback(lambda _: in_flight.pop(key, None))
+
+    try:
+        # One cancelled caller must not cancel the fetch the others share
+        return await asyncio.shield(task)
+    except Exception:
+        fallback = _stale_forecast(key)
+        if fallback is None:
+            raise
+        return fallback
+
+
+def get_city_weather(city: str) -> WeatherOutput:
+    profile = get_city(city)
+    return get_weather(profile.lat, profile.lon)
+
+
+async def get_city_weather_async(city: str) -> WeatherOutput:
+    profile = get_city(city)
+    return await get_weather_async(profile.lat, profile.lon)
+
+
+def get_delhi_weather() -> WeatherOutput:
+    return get_weather(DELHI_LAT, DELHI_LON)
+
+
+async def get_delhi_weather_async() -> WeatherOutput:
+    return await get_weather_async(DELHI_LAT, DELHI_LON)
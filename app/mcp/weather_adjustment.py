@@ -1,37 +1,150 @@
-from ..state import TripState
-from .weather import get_delhi_weather
-from .poi_search import search_pois, POISearchInput
-from .itinerary_builder import build_itinerary
+from typing import Any, Dict, List, Tuple
+
+from ..cities import get_city
+from ..state import DayPlan, TripConstraints, TripState
+from .weather import get_city_weather
+from .poi_search import POISearchInput
+from .poi_ranking import search_ranked_pois
+from .itinerary_builder import build_itinerary, day_anchor, mark_used, PACE_LIMITS
+from .spatial_index import SpatialIndex
 
 
 RAIN_THRESHOLD = 5.0  # mm precipitation
 
+INDOOR_INTERESTS = ["history", "culture"]  # indoor-friendly
+
+
+def rainy_day_indexes(trip: TripState) -> List[int]:
+    """
+    Indexes of trip days whose forecast date has rain. Forecast days are
+    matched to trip days by date; days outside the forecast are left alone.
+    """
+
+    weather = get_city_weather(trip.city)
+
+    precipitation = {forecast_day.date: forecast_day.precipitation for forecast_day in weather.forecast}
+
+    return [
+        i for i, day in enumerate(trip.days)
+        if precipitation.get(trip.constraints.date_of(day.day).isoformat(), 0.0) > RAIN_THRESHOLD
+    ]
+
+
+def plan_rainy_days(trip: TripState, rainy: List[int]) -> Tuple[Dict[int, DayPlan], list]:
+    """
+    Rebuild every rainy day in one pass.
+
+    The indoor candidate pool is fetched once and POIs kept on dry days are
+    excluded. Each rainy day is refilled with the indoor POIs nearest to
+    where it was originally planned, and no two rainy days share a POI.
+    """
+
+    if not rainy:
+        return {}, []
+
+    rainy_set = set(rainy)
+    dry_used = {
+        block.poi_id
+        for i, day in enumerate(trip.days) if i not in rainy_set
+        for block in day.blocks
+    }
+
+    pois_per_day = PACE_LIMITS.get(trip.constraints.pace, 3)
+
+    indoor_pois = search_ranked_pois(
+        POISearchInput(
+            city=trip.city,
+            interests=INDOOR_INTERESTS,
+            max_results=max(20, len(trip.days) * pois_per_day + len(rainy) * pois_per_day)
+        )
+    )
+
+    candidates = [poi for poi in indoor_pois if poi.poi_id not in dry_used]
+    index = SpatialIndex(candidates)
+    taken = set()
+
+    def available(poi) -> bool:
+        return poi.poi_id not in taken
+
+    constraints = TripConstraints(
+        days=1,
+        pace=trip.constraints.pace,
+        daily_start_hour=trip.constraints.daily_start_hour,
+        daily_end_hour=trip.constraints.daily_end_hour
+    )
+    speed_kmh = get_city(trip.city).avg_speed_kmh
+
+    replacements = {}
+    for i in rainy:
+        anchor = day_anchor(trip, i + 1)
+
+        if anchor is None:
+            day_candidates = [poi for poi in candidates if available(poi)][:pois_per_day]
+        else:
+            day_candidates = [poi for poi, _ in index.nearest(*anchor, k=pois_per_day, where=available)]
+
+        # Opening hours depend on the weekday of the day being replaced
+        day_constraints = constraints.model_copy(
+            update={"start_date": trip.constraints.date_of(trip.days[i].day)}
+        )
+
+        rebuilt_day = build_itinerary(day_candidates, day_constraints, speed_kmh=speed_kmh)[0]
+        taken.update(block.poi_id for block in rebuilt_day.blocks)
+
+        replacements[i] = rebuilt_day.renumbered(trip.days[i].day)
+
+    # Keep the new indoor POIs available to later single-day edits
+    pool_ids = {poi.poi_id for poi in trip.poi_pool}
+    trip_pool_additions = [poi for poi in candidates if poi.poi_id not in pool_ids]
+
+    return replacements, trip_pool_additions
+
+
+def weather_adjustment_diff(trip: TripState, replacements: Dict[int, DayPlan]) -> Dict[str, Any]:
+
+    changes = []
+
+    for i, new_day in replacements.items():
+        old_ids = [block.poi_id for block in trip.days[i].blocks]
+        new_ids = [block.poi_id for block in new_day.blocks]
+
+        changes.append({
+            "day": trip.days[i].day,
+            "removed": [block.name for block in trip.days[i].blocks if block.poi_id not in new_ids],
+            "added": [block.name for block in new_day.blocks if block.poi_id not in old_ids],
+            "new_day": new_day
+        })
 
-def adjust_for_weather(trip: TripState) -> TripState:
+    return {
+        "rainy_days": [trip.days[i].day for i in replacements],
+        "changes": changes
+    }
 
-    weather = get_delhi_weather()
 
-    for i, forecast_day in enumerate(weather.forecast):
+def adjust_for_weather(trip: TripState, dry_run: bool = False):
+    """
+    Swap every rainy day for indoor POIs. With dry_run=True the trip is left
+    untouched and the diff that would be applied is returned instead.
+    """
 
-        if i >= len(trip.days):
-            break
+    rainy = rainy_day_indexes(trip)
 
-        if forecast_day.precipitation > RAIN_THRESHOLD:
+    if not rainy:
+        return weather_adjustment_diff(trip, {}) if dry_run else trip
 
-            # Rebuild this day using indoor-focused interests
-            poi_input = POISearchInput(
-                city=trip.city,
-                interests=["history", "culture"],  # indoor-friendly
-                max_results=20
-            )
+    replacements, pool_additions = plan_rainy_days(trip, rainy)
 
-            pois = search_pois(poi_input)
+    if dry_run:
+        return weather_adjustment_diff(trip, replacements)
 
-            rebuilt_day = build_itinerary(
-                pois,
-                trip.constraints
-            )[0]
+    for i, new_day in replacements.items():
+        mark_used(
+            trip,
+            (block.poi_id for block in trip.days[i].blocks),
+            (block.poi_id for block in new_day.blocks)
+        )
+        trip.days[i] = new_day
 
-            trip.days[i] = rebuilt_day
+    trip.poi_pool.extend(pool_additions)
 
-    return trip
\ No newline at end of file
+    return trip
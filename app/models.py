@@ -1,12 +1,19 @@
 from pydantic import BaseModel, EmailStr
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.state import TripState
 
 
 class ExportRequest(BaseModel):
     """Request model for itinerary export endpoint"""
     email: EmailStr
-    trip: Dict[str, Any]  # Using dict for flexibility with TripState
+    trip_id: str
+    trip: Optional[Dict[str, Any]] = None  # Using dict for flexibility with TripState
+
+
+class BatchExportRequest(BaseModel):
+    """Request model for the batch export endpoint"""
+    emails: List[EmailStr]
+    trip_id: str
 
 
 class ErrorResponse(BaseModel):
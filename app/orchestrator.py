@@ -1,112 +1,295 @@
+from datetime import date
+
+from app.cities import city_key, get_city
 from app.state import TripState, TripConstraints
-from app.mcp.poi_search import search_pois, POISearchInput
-from app.mcp.itinerary_builder import build_itinerary
+from app.mcp.poi_search import POISearchInput
+from app.mcp.poi_ranking import search_ranked_pois
+from app.mcp.itinerary_builder import build_itinerary, iter_itinerary_days, replan_day, BUILDER_MODES, PACE_LIMITS
+from app.mcp.singleflight import SingleFlight
 from app.mcp.weather_adjustment import adjust_for_weather
+from app.sessions import SessionStore, create_session_store, new_trip_id
 
 
-class Orchestrator:
+def pool_size(days: int) -> int:
+    """Candidates fetched per trip: enough to re-plan any day at the packed pace."""
+    return max(25, 2 * days * PACE_LIMITS["packed"])
+
+
+def _plan_key(city: str, interests: list[str], days: int, pace: str, builder_mode: str | None, start_date: date):
+    return (
+        city_key(city),
+        frozenset(i.strip().lower() for i in interests or []),
+        days,
+        pace,
+        builder_mode,
+        start_date
+    )
+
+
+def validate_plan_request(city: str, days: int, pace: str, builder_mode: str | None):
+    """
+    Reject a plan request before any search or scheduling. Raises
+    ValueError for an unsupported city, a non-positive day count, or an
+    unknown pace or builder mode.
+    """
 
-    def __init__(self):
-        self.current_trip: TripState | None = None
+    get_city(city)
+
+    if not isinstance(days, int) or isinstance(days, bool) or days < 1:
+        raise ValueError(f"days must be a positive integer, got {days!r}")
+
+    if pace not in PACE_LIMITS:
+        raise ValueError(f"Unknown pace: {pace}. Supported paces: {', '.join(PACE_LIMITS)}.")
+
+    if builder_mode is not None and builder_mode not in BUILDER_MODES:
+        raise ValueError(f"Unknown itinerary builder mode: {builder_mode}")
+
+
+class Orchestrator:
 
-    def plan_trip(self, city: str, interests: list[str], days: int, pace: str):
+    def __init__(self, sessions: SessionStore | None = None):
+        self.sessions = sessions or create_session_store()
+        # Identical concurrent plan requests share one search + build
+        self.plan_flight = SingleFlight()
+
+    def get_trip(self, trip_id: str | None) -> TripState | None:
+        if not trip_id:
+            return None
+        return self.sessions.get(trip_id)
+
+    def _build_plan(
+        self,
+        city: str,
+        interests: list[str],
+        days: int,
+        pace: str,
+        builder_mode: str | None,
+        start_date: date
+    ):
 
         poi_input = POISearchInput(
             city=city,
             interests=interests,
-            max_results=25
+            max_results=pool_size(days)
+        )
+
+        pois = search_ranked_pois(poi_input)
+
+        constraints = TripConstraints(
+            days=days,
+            pace=pace,
+            start_date=start_date
+        )
+
+        itinerary_days = build_itinerary(
+            pois, constraints, mode=builder_mode, speed_kmh=get_city(city).avg_speed_kmh
+        )
+
+        return pois, constraints, itinerary_days
+
+    def plan_trip(
+        self,
+        city: str,
+        interests: list[str],
+        days: int,
+        pace: str,
+        builder_mode: str | None = None,
+        start_date: date | None = None
+    ):
+
+        validate_plan_request(city, days, pace, builder_mode)
+
+        # Opening hours make the plan depend on the weekdays it covers
+        start_date = start_date or date.today()
+
+        pois, constraints, itinerary_days = self.plan_flight.do(
+            _plan_key(city, interests, days, pace, builder_mode, start_date),
+            lambda: self._build_plan(city, interests, days, pace, builder_mode, start_date)
+        )
+
+        # Callers that shared a computation each get their own trip; the
+        # days themselves are immutable and shared
+        trip = TripState(
+            trip_id=new_trip_id(),
+            city=city,
+            interests=interests,
+            constraints=constraints.model_copy(),
+            days=list(itinerary_days),
+            poi_pool=list(pois),
+            used_poi_ids={block.poi_id for day in itinerary_days for block in day.blocks}
+        )
+
+        self.sessions.save(trip)
+
+        return trip
+
+    def plan_trip_stream(
+        self,
+        city: str,
+        interests: list[str],
+        days: int,
+        pace: str,
+        builder_mode: str | None = None,
+        start_date: date | None = None
+    ):
+        """
+        plan_trip as a sequence of events: ("pois", candidates), then
+        ("day", DayPlan) as each day is finalized, then ("trip", TripState)
+        once the trip is saved. Streams are not coalesced.
+
+        The request is validated when this is called, not when the first
+        event is pulled, so callers can reject it before streaming.
+        """
+
+        validate_plan_request(city, days, pace, builder_mode)
+
+        return self._plan_events(city, interests, days, pace, builder_mode, start_date or date.today())
+
+    def _plan_events(
+        self,
+        city: str,
+        interests: list[str],
+        days: int,
+        pace: str,
+        builder_mode: str | None,
+        start_date: date
+    ):
+
+        pois = search_ranked_pois(
+            POISearchInput(
+                city=city,
+                interests=interests,
+                max_results=pool_size(days)
+            )
         )
 
-        pois = search_pois(poi_input)
+        yield "pois", pois
 
         constraints = TripConstraints(
             days=days,
-            pace=pace
+            pace=pace,
+            start_date=start_date
         )
 
-        itinerary_days = build_itinerary(pois, constraints)
+        itinerary_days = []
+
+        for day in iter_itinerary_days(
+            pois, constraints, mode=builder_mode, speed_kmh=get_city(city).avg_speed_kmh
+        ):
+            itinerary_days.append(day)
+            yield "day", day
 
-        self.current_trip = TripState(
+        trip = TripState(
+            trip_id=new_trip_id(),
             city=city,
             interests=interests,
             constraints=constraints,
-            days=itinerary_days
+            days=itinerary_days,
+            poi_pool=pois,
+            used_poi_ids={block.poi_id for day in itinerary_days for block in day.blocks}
         )
 
-        return self.current_trip
+        self.sessions.save(trip)
+
+        yield "trip", trip
 
-    def edit_day_pace(self, day_number: int, new_pace: str):
+    def edit_day_pace(self, trip_id: str, day_number: int, new_pace: str):
 
-        if not self.current_trip:
+        trip = self.get_trip(trip_id)
+
+        if not trip:
             raise ValueError("No active trip to edit.")
 
-        if day_number < 1 or day_number > len(self.current_trip.days):
+        if day_number < 1 or day_number > len(trip.days):
             raise ValueError("Invalid day number.")
 
-        # Extract all original POIs used in that day
-        original_day = self.current_trip.days[day_number - 1]
+        if not trip.poi_pool:
+            # Sessions saved before the pool existed: fetch it once
+            trip.poi_pool = search_ranked_pois(
+                POISearchInput(
+                    city=trip.city,
+                    interests=trip.interests,
+                    max_results=pool_size(len(trip.days))
+                )
+            )
+            trip.used_poi_ids = {block.poi_id for day in trip.days for block in day.blocks}
 
-        # Re-search POIs using same city and interests
-        poi_input = POISearchInput(
-            city=self.current_trip.city,
-            interests=self.current_trip.interests,
-            max_results=25
-        )
+        # Replace only that day, from POIs no other day uses
+        trip.days[day_number - 1] = replan_day(trip, day_number, new_pace)
 
-        pois = search_pois(poi_input)
+        self.sessions.save(trip)
 
-        # Build new itinerary for one day only
-        constraints = TripConstraints(
-            days=1,
-            pace=new_pace,
-            daily_start_hour=self.current_trip.constraints.daily_start_hour,
-            daily_end_hour=self.current_trip.constraints.daily_end_hour
-        )
+        return trip
+
+    def record_visit(self, trip_id: str, day_number: int, poi_id: str, actual_minutes: int):
+        """
+        Record how long a visit really took, when the traveller confirms or
+        corrects it. calibrate_duration_model.py fits on these minutes only.
+        """
+
+        trip = self.get_trip(trip_id)
+
+        if not trip:
+            raise ValueError("No active trip to update.")
+
+        if not isinstance(day_number, int) or day_number < 1 or day_number > len(trip.days):
+            raise ValueError("Invalid day number.")
+
+        if isinstance(actual_minutes, bool) or not isinstance(actual_minutes, int) or actual_minutes <= 0:
+            raise ValueError("actual_minutes must be a positive whole number of minutes.")
+
+        trip.days[day_number - 1] = trip.days[day_number - 1].with_actual_minutes(poi_id, actual_minutes)
 
-        rebuilt_day = build_itinerary(pois, constraints)[0]
+        self.sessions.save(trip)
 
-        # Replace only that day
-        self.current_trip.days[day_number - 1] = rebuilt_day
+        return trip
 
-        return self.current_trip
+    def explain(self, trip_id: str | None, target: str | None = None):
 
-    def explain(self, target: str | None = None):
+        trip = self.get_trip(trip_id)
 
-        if not self.current_trip:
+        if not trip:
             return {"error": "No active trip to explain."}
 
         # If target is None or "plan", explain overall structure
         if not target or target.lower() == "plan":
-            total_pois = sum(len(day.blocks) for day in self.current_trip.days)
+            total_pois = sum(len(day.blocks) for day in trip.days)
 
             return {
                 "type": "PLAN_EXPLANATION",
-                "message": f"This itinerary covers {total_pois} places across {self.current_trip.constraints.days} days at a {self.current_trip.constraints.pace} pace. Travel times were estimated using city distance heuristics and daily time windows were respected."
+                "message": f"This itinerary covers {total_pois} places across {trip.constraints.days} days at a {trip.constraints.pace} pace. Travel times were estimated using city distance heuristics and daily time windows were respected."
             }
 
         # Otherwise explain specific POI
-        for day in self.current_trip.days:
+        for day in trip.days:
             for block in day.blocks:
                 if target.lower() in block.name.lower():
 
                     interest_match = any(
                         interest.lower() in block.category.lower()
-                        for interest in self.current_trip.interests
+                        for interest in trip.interests
                     )
 
                     return {
                         "type": "POI_EXPLANATION",
                         "poi": block.name,
-                        "message": f"{block.name} was selected because it aligns with your interests ({', '.join(self.current_trip.interests)}). It fits within the daily time window and maintains travel efficiency."
+                        "message": f"{block.name} was selected because it aligns with your interests ({', '.join(trip.interests)}). It fits within the daily time window and maintains travel efficiency."
                     }
 
         return {"error": "Target not found in itinerary."}
 
-    def apply_weather_adjustment(self):
+    def apply_weather_adjustment(self, trip_id: str, dry_run: bool = False):
 
-        if not self.current_trip:
+        trip = self.get_trip(trip_id)
+
+        if not trip:
             return {"error": "No active trip"}
 
-        self.current_trip = adjust_for_weather(self.current_trip)
+        if dry_run:
+            return adjust_for_weather(trip, dry_run=True)
+
+        trip = adjust_for_weather(trip)
+
+        self.sessions.save(trip)
 
-        return self.current_trip
\ No newline at end of file
+        return trip
\ No newline at end of file
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+
+
+# Bumped whenever the stored vector layout changes (2: L2-normalized float32)
+INDEX_FORMAT_VERSION = 2
+
+
+def index_key(source: bytes, model: str, chunk_size: int) -> str:
+    """Content hash of the source text plus everything that shapes its embeddings."""
+    digest = hashlib.sha256()
+    digest.update(f"v{INDEX_FORMAT_VERSION}".encode("utf-8"))
+    digest.update(model.encode("utf-8"))
+    digest.update(str(chunk_size).encode("utf-8"))
+    digest.update(source)
+    return digest.hexdigest()[:32]
+
+
+def _paths(index_dir: str, key: str) -> Tuple[str, str]:
+    return (
+        os.path.join(index_dir, f"{key}.npy"),
+        os.path.join(index_dir, f"{key}.json")
+    )
+
+
+def load_index(index_dir: str, key: str) -> Optional[Tuple[List[str], np.ndarray]]:
+    """Memory-map a persisted index, or return None if it was never built."""
+
+    vectors_path, meta_path = _paths(index_dir, key)
+
+    if not (os.path.exists(vectors_path) and os.path.exists(meta_path)):
+        return None
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    embeddings = np.load(vectors_path, mmap_mode="r")
+
+    if embeddings.shape[0] != len(meta["chunks"]):
+        return None
+
+    return meta["chunks"], embeddings
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so cosine similarity becomes a dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def save_index(
+    index_dir: str,
+    key: str,
+    chunks: List[str],
+    embeddings: np.ndarray,
+    **meta
+):
+    """Persist an index atomically so concurrent workers never read a partial file."""
+
+    os.makedirs(index_dir, exist_ok=True)
+    vectors_path, meta_path = _paths(index_dir, key)
+    suffix = f".{os.getpid()}.tmp"
+
+    with open(vectors_path + suffix, "wb") as f:
+        np.save(f, normalize_rows(embeddings))
+
+    with open(meta_path + suffix, "w", encoding="utf-8") as f:
+        json.dump({"chunks": chunks, "created_at": time.time(), **meta}, f)
+
+    os.replace(vectors_path + suffix, vectors_path)
+    os.replace(meta_path + suffix, meta_path)
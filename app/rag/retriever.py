@@ -1,23 +1,28 @@
 import os
+import glob
 import numpy as np
-import google.generativeai as genai
-from dotenv import load_dotenv
 
-load_dotenv()
-
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from app.cities import city_key, get_city
+from app.config import config
+from app.genai_client import get_genai
+from app.lazy import Lazy
+from app.rag.embedding_index import index_key, load_index, normalize_rows, save_index
 
 EMBED_MODEL = "models/embedding-001"
 
 DATA_PATH = "data/rag_sources/delhi.txt"
 
+SOURCES_DIR = "data/rag_sources"
+
+CHUNK_SIZE = 500
+
 
-def load_document():
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
+def load_document(path=DATA_PATH):
+    with open(path, "r", encoding="utf-8") as f:
         return f.read()
 
 
-def chunk_text(text, chunk_size=500):
+def chunk_text(text, chunk_size=CHUNK_SIZE):
     chunks = []
     for i in range(0, len(text), chunk_size):
         chunks.append(text[i:i + chunk_size])
@@ -25,16 +30,24 @@ def chunk_text(text, chunk_size=500):
 
 
 def embed_text(text):
-    response = genai.embed_content(
+    response = get_genai().embed_content(
         model=EMBED_MODEL,
         content=text
     )
     return np.array(response["embedding"])
 
 
-def build_embeddings():
+def embed_batch(texts):
+    response = get_genai().embed_content(
+        model=EMBED_MODEL,
+        content=list(texts)
+    )
+    return np.array(response["embedding"], dtype=np.float32)
+
+
+def build_embeddings(path=DATA_PATH):
 
-    text = load_document()
+    text = load_document(path)
     chunks = chunk_text(text)
 
     embeddings = []
@@ -45,25 +58,135 @@ def build_embeddings():
     return chunks, embeddings
 
 
-# Build once at startup
-CHUNKS, EMBEDDINGS = build_embeddings()
+def load_or_build_index(path=DATA_PATH):
+    """
+    Map the persisted index for one source file, building and saving it
+    only when the source text or embedding model has changed.
+    """
+
+    with open(path, "rb") as f:
+        key = index_key(f.read(), EMBED_MODEL, CHUNK_SIZE)
+
+    index = load_index(config.RAG_INDEX_DIR, key)
+    if index is not None:
+        return index
+
+    chunks, embeddings = build_embeddings(path)
+
+    save_index(
+        config.RAG_INDEX_DIR,
+        key,
+        chunks,
+        np.vstack(embeddings),
+        source=path,
+        model=EMBED_MODEL,
+        chunk_size=CHUNK_SIZE
+    )
+
+    return load_index(config.RAG_INDEX_DIR, key)
+
+
+def load_corpus(sources_dir=SOURCES_DIR, paths=None):
+    """
+    Stack the normalized vectors of every source (each city guide in
+    `sources_dir`, or just `paths`) into one contiguous float32 matrix,
+    with a parallel list of chunk texts.
+    """
+
+    chunks = []
+    matrices = []
+
+    if paths is None:
+        paths = sorted(glob.glob(os.path.join(sources_dir, "*.txt")))
+
+    for path in paths:
+        source_chunks, source_embeddings = load_or_build_index(path)
+        chunks.extend(source_chunks)
+        matrices.append(source_embeddings)
+
+    if len(matrices) == 1:
+        # A single memory-mapped index is already contiguous
+        return chunks, matrices[0]
+
+    if not matrices:
+        return chunks, np.empty((0, 0), dtype=np.float32)
+
+    return chunks, np.ascontiguousarray(np.vstack(matrices), dtype=np.float32)
+
+
+# Mapped on first retrieval (or by the app warm-up), not at import
+_corpus = Lazy(load_corpus)
+
+# Per-city corpora, each mapped on its city's first retrieval
+_city_corpora = {}
+
+
+def get_corpus(city=None):
+
+    if city is None:
+        return _corpus.get()
+
+    key = city_key(city)
+    corpus = _city_corpora.get(key)
+
+    if corpus is None:
+        sources = get_city(city).rag_sources
+        corpus = _city_corpora.setdefault(key, Lazy(lambda: load_corpus(paths=sources)))
+
+    return corpus.get()
 
 
 def cosine_similarity(a, b):
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 
-def retrieve(query, top_k=2):
+def top_k_indices(scores, top_k):
+    """Indices of the top_k scores per row, best first, without a full sort."""
+
+    scores = np.atleast_2d(scores)
+    k = min(top_k, scores.shape[1])
+
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def retrieve_many(queries, top_k=2, city=None):
+    """Embed all queries in one call and score them with a single matmul."""
+
+    chunks, embeddings = get_corpus(city)
+
+    if not queries or len(chunks) == 0:
+        return [[] for _ in queries]
+
+    query_matrix = normalize_rows(embed_batch(queries))
+    scores = query_matrix @ embeddings.T
+
+    return [
+        [chunks[idx] for idx in row]
+        for row in top_k_indices(scores, top_k)
+    ]
+
+
+def retrieve(query, top_k=2, city=None):
 
-    query_vector = embed_text(query)
+    chunks, embeddings = get_corpus(city)
 
-    similarities = []
-    for idx, emb in enumerate(EMBEDDINGS):
-        score = cosine_similarity(query_vector, emb)
-        similarities.append((score, idx))
+    if len(chunks) == 0:
+        return []
 
-    similarities.sort(reverse=True)
+    query_vector = normalize_rows(embed_text(query))
+    scores = embeddings @ query_vector
 
-    top_chunks = [CHUNKS[idx] for (_, idx) in similarities[:top_k]]
+    top_chunks = [chunks[idx] for idx in top_k_indices(scores, top_k)[0]]
 
-    return top_chunks
\ No newline at end of file
+    return top_chunks
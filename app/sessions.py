@@ -0,0 +1,178 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Type
+
+from app.config import config
+from app.state import TripState
+
+
+def new_trip_id() -> str:
+    return uuid.uuid4().hex
+
+
+class SessionStore(ABC):
+    """Trip sessions keyed by trip ID. Idle sessions expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float = config.SESSION_TTL_SECONDS):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, trip_id: str) -> Optional[TripState]:
+        ...
+
+    @abstractmethod
+    def save(self, trip: TripState):
+        ...
+
+    @abstractmethod
+    def delete(self, trip_id: str):
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Per-process LRU of live TripState objects."""
+
+    def __init__(self, ttl: float = config.SESSION_TTL_SECONDS, max_entries: int = config.SESSION_MAX_ENTRIES):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, trip_id: str) -> Optional[TripState]:
+        with self._lock:
+            entry = self._sessions.get(trip_id)
+            if entry is None:
+                return None
+
+            trip, last_access = entry
+            now = time.monotonic()
+            if now - last_access > self.ttl:
+                del self._sessions[trip_id]
+                return None
+
+            self._sessions[trip_id] = (trip, now)
+            self._sessions.move_to_end(trip_id)
+            return trip
+
+    def save(self, trip: TripState):
+        with self._lock:
+            self._sessions[trip.trip_id] = (trip, time.monotonic())
+            self._sessions.move_to_end(trip.trip_id)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def delete(self, trip_id: str):
+        with self._lock:
+            self._sessions.pop(trip_id, None)
+
+    def purge_expired(self) -> int:
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [trip_id for trip_id, (_, last_access) in self._sessions.items() if last_access < cutoff]
+            for trip_id in expired:
+                del self._sessions[trip_id]
+        return len(expired)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Shared backend: trips are stored as JSON in one SQLite file, so every
+    uvicorn worker on the host can serve the same trip.
+    """
+
+    # Expired rows are swept on every Nth save
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str = config.SESSION_DB_PATH, ttl: float = config.SESSION_TTL_SECONDS):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        self._saves = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "trip_id TEXT PRIMARY KEY, trip TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access)")
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, trip_id: str) -> Optional[TripState]:
+        conn = self._connect()
+        now = time.time()
+
+        row = conn.execute(
+            "SELECT trip, last_access FROM sessions WHERE trip_id = ?", (trip_id,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        if now - row[1] > self.ttl:
+            self.delete(trip_id)
+            return None
+
+        with conn:
+            conn.execute("UPDATE sessions SET last_access = ? WHERE trip_id = ?", (now, trip_id))
+
+        return TripState.model_validate_json(row[0])
+
+    def save(self, trip: TripState):
+        conn = self._connect()
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                (trip.trip_id, trip.model_dump_json(), time.time())
+            )
+
+        self._saves += 1
+        if self._saves % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def delete(self, trip_id: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE trip_id = ?", (trip_id,))
+
+    def purge_expired(self) -> int:
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE last_access < ?", (time.time() - self.ttl,))
+        return cursor.rowcount
+
+
+SESSION_BACKENDS: Dict[str, Type[SessionStore]] = {
+    "memory": InMemorySessionStore,
+    "sqlite": SQLiteSessionStore,
+}
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    backend = backend or config.SESSION_BACKEND
+
+    if backend not in SESSION_BACKENDS:
+        raise ValueError(f"Unknown session backend: {backend}")
+
+    return SESSION_BACKENDS[backend]()
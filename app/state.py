@@ -1,8 +1,13 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from datetime import date, timedelta
+from functools import cached_property
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.mcp.poi_search import POISearchOutput
 
 
 class POIBlock(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     poi_id: str
     name: str
     category: str
@@ -12,11 +17,37 @@ class POIBlock(BaseModel):
     travel_minutes_from_previous: int
     indoor: bool
     source: Optional[str] = None
+    start_time: Optional[str] = None  # "HH:MM", within the POI's opening hours
+    actual_minutes: Optional[int] = None  # Minutes the visit really took, once the traveller reports it
 
 
 class DayPlan(BaseModel):
+    """
+    One scheduled day. Days are immutable, so trips and snapshots can share
+    them; an edit replaces the day instead of changing it.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
     day: int
-    blocks: List[POIBlock]
+    blocks: Tuple[POIBlock, ...]
+
+    @cached_property
+    def fingerprint(self) -> int:
+        # Computed once per day object; equal days have equal fingerprints
+        return hash((self.day, self.blocks))
+
+    def renumbered(self, day: int) -> "DayPlan":
+        # Shares the blocks; a fresh object so the fingerprint is recomputed
+        return DayPlan(day=day, blocks=self.blocks)
+
+    def with_actual_minutes(self, poi_id: str, minutes: int) -> "DayPlan":
+        """The day with one visit's observed minutes recorded."""
+        for i, block in enumerate(self.blocks):
+            if block.poi_id == poi_id:
+                blocks = self.blocks[:i] + (block.model_copy(update={"actual_minutes": minutes}),) + self.blocks[i + 1:]
+                return DayPlan(day=self.day, blocks=blocks)
+        raise ValueError("That place is not on this day.")
 
 
 class TripConstraints(BaseModel):
@@ -24,10 +55,35 @@ class TripConstraints(BaseModel):
     pace: str  # relaxed | moderate | packed
     daily_start_hour: int = 9
     daily_end_hour: int = 18
+    start_date: Optional[date] = None  # date of day 1; None means today
+
+    def date_of(self, day_number: int) -> date:
+        return (self.start_date or date.today()) + timedelta(days=day_number - 1)
 
 
 class TripState(BaseModel):
+    trip_id: Optional[str] = None
     city: str
     interests: List[str]
     constraints: TripConstraints
-    days: List[DayPlan]
\ No newline at end of file
+    days: List[DayPlan]
+
+    # Scheduler bookkeeping: the trip's candidate POIs and the ones already
+    # placed on a day. Stored with the session, left out of API responses.
+    poi_pool: List[POISearchOutput] = Field(default_factory=list)
+    used_poi_ids: Set[str] = Field(default_factory=set)
+
+    # Spatial indexes over poi_pool, and over its POIs no day uses, built
+    # on first use; never persisted
+    _pool_index: Any = PrivateAttr(default=None)
+    _free_index: Any = PrivateAttr(default=None)
+
+    def public_dict(self) -> Dict[str, Any]:
+        return self.model_dump(mode="json", exclude=INTERNAL_TRIP_FIELDS)
+
+    def snapshot(self) -> Tuple[DayPlan, ...]:
+        """The trip's days as of now, in O(days) without copying any day."""
+        return tuple(self.days)
+
+
+INTERNAL_TRIP_FIELDS = {"poi_pool", "used_poi_ids"}
\ No newline at end of file
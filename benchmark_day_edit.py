@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Benchmark: single-day edit latency vs trip length.
+
+Edits the middle day of trips from 1 to 30 days with replan_day(), which
+re-plans from the trip's own POI pool. Latency should stay flat as the
+trip grows, and no edited day may reuse a POI from another day.
+
+Usage:
+    python benchmark_day_edit.py
+"""
+
+import sys
+import time
+import statistics
+
+sys.path.append('.')
+
+from app.mcp.itinerary_builder import build_itinerary, replan_day
+from app.orchestrator import pool_size
+from app.state import TripState, TripConstraints
+from benchmark_travel_matrix import make_pois
+
+TRIP_LENGTHS = [1, 3, 7, 14, 30]
+REPEATS = 200
+
+
+def make_trip(days):
+    pois = make_pois(pool_size(days), seed=days)
+    constraints = TripConstraints(days=days, pace="moderate")
+    itinerary = build_itinerary(pois, constraints)
+
+    return TripState(
+        city="Delhi",
+        interests=["history"],
+        constraints=constraints,
+        days=itinerary,
+        poi_pool=pois,
+        used_poi_ids={block.poi_id for day in itinerary for block in day.blocks}
+    )
+
+
+def has_duplicates(trip):
+    ids = [block.poi_id for day in trip.days for block in day.blocks]
+    return len(ids) != len(set(ids))
+
+
+def main():
+    print("=== Single-Day Edit Benchmark (replan_day) ===\n")
+    print(f"{'days':>5} {'pool':>6} {'median us':>10} {'p95 us':>10} {'duplicates':>11}")
+
+    for days in TRIP_LENGTHS:
+        trip = make_trip(days)
+        day_number = (days + 1) // 2
+        samples = []
+
+        for i in range(REPEATS):
+            pace = ("relaxed", "packed")[i % 2]
+            start = time.perf_counter()
+            trip.days[day_number - 1] = replan_day(trip, day_number, pace)
+            samples.append(time.perf_counter() - start)
+
+        samples.sort()
+        print(f"{days:>5} {len(trip.poi_pool):>6} {statistics.median(samples) * 1e6:>10.1f} "
+              f"{samples[int(len(samples) * 0.95)] * 1e6:>10.1f} {str(has_duplicates(trip)):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Benchmark: /edit-day bookkeeping around a single-day edit on 30-day trips.
+
+Before: copy.deepcopy() of the whole trip, then evaluate_edit_correctness
+comparing .dict() of every day. After: TripState.snapshot() shares the
+immutable days, and the evaluation compares day identity/fingerprints.
+The edit itself (replan_day) is the same in both and is not timed.
+
+Usage:
+    python benchmark_edit_eval.py
+"""
+
+import copy
+import sys
+import time
+import statistics
+
+sys.path.append('.')
+
+from app.evals.edit_correctness import evaluate_edit_correctness
+from app.mcp.itinerary_builder import replan_day
+from benchmark_day_edit import make_trip
+
+TRIP_LENGTHS = [7, 30]
+REPEATS = 200
+
+
+def evaluate_by_dict(before, after, intended_day):
+    # The previous implementation (.dict() of both trips)
+    before_dict = before.model_dump()
+    after_dict = after.model_dump()
+
+    changed_days = [
+        i + 1 for i in range(len(before_dict["days"]))
+        if before_dict["days"][i] != after_dict["days"][i]
+    ]
+
+    return {
+        "changed_days": changed_days,
+        "unexpected_changes": [day for day in changed_days if day != intended_day]
+    }
+
+
+def time_edits(trip, day_number, take_snapshot, evaluate):
+    samples = []
+    results = []
+
+    for i in range(REPEATS):
+        pace = ("relaxed", "packed")[i % 2]
+
+        start = time.perf_counter()
+        before = take_snapshot(trip)
+        elapsed = time.perf_counter() - start
+
+        trip.days[day_number - 1] = replan_day(trip, day_number, pace)
+
+        start = time.perf_counter()
+        result = evaluate(before, trip, day_number)
+        elapsed += time.perf_counter() - start
+
+        samples.append(elapsed * 1e6)
+        results.append((result["changed_days"], result["unexpected_changes"]))
+
+    return samples, results
+
+
+def main():
+    print("=== Edit Evaluation Benchmark (snapshot + compare per edit) ===\n")
+    print(f"{'days':>5} {'deepcopy+dict us':>17} {'snapshot+fp us':>15} {'speedup':>8} {'same result':>12}")
+
+    for days in TRIP_LENGTHS:
+        day_number = (days + 1) // 2
+
+        old_samples, old_results = time_edits(
+            make_trip(days), day_number, copy.deepcopy, evaluate_by_dict
+        )
+        new_samples, new_results = time_edits(
+            make_trip(days), day_number, lambda trip: trip.snapshot(), evaluate_edit_correctness
+        )
+
+        old_median = statistics.median(old_samples)
+        new_median = statistics.median(new_samples)
+
+        print(f"{days:>5} {old_median:>17.1f} {new_median:>15.1f} "
+              f"{old_median / new_median:>7.0f}x {str(old_results == new_results):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Benchmark: exporting one itinerary to many recipients.
+
+Compares one webhook call per recipient, each serializing the trip and
+opening a new connection (the old /export-itinerary loop), with the
+/export-itinerary/batch path: enqueue_export_batch() stores the trip once
+and queues one job per recipient in one transaction, and the job workers deliver them over the
+shared keep-alive client, JOB_WORKERS at a time. Reports the time the
+request takes to queue the batch and the time until every job succeeded.
+Runs against the local stub webhook with a fixed per-call latency.
+
+Usage:
+    python benchmark_export_batch.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.append('.')
+
+from stub_remotes import start_stub_server
+
+STUB_LATENCY = 0.02  # seconds per webhook call
+RECIPIENTS = [10, 50, 200]
+
+server, base_url = start_stub_server(delay=STUB_LATENCY)
+os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook"
+os.environ["JOB_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+os.environ["JOB_POLL_INTERVAL"] = "0.01"
+os.environ.setdefault("GEMINI_API_KEY", "stub-key")
+
+from app.config import config
+from app.exports import EXPORT_HANDLERS, enqueue_export_batch
+from app.jobs import JobQueue, JobWorkerPool
+from app.mcp.http_client import http_client
+from benchmark_day_edit import make_trip
+
+
+def export_one_by_one(emails, trip):
+    for email in emails:
+        response = requests.post(
+            config.N8N_WEBHOOK_URL,
+            json={"email": email, "trip": trip.public_dict()},
+            timeout=config.REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+
+
+async def deliver(queue, workers, emails, trip):
+    """Queue the batch, then wait for the workers; returns (queue s, total s, jobs)."""
+
+    start = time.perf_counter()
+    _, jobs = enqueue_export_batch(queue, emails, trip)
+    workers.notify()
+    queued = time.perf_counter() - start
+
+    while queue.stats()["queued"] or queue.stats()["running"]:
+        await asyncio.sleep(0.005)
+
+    return queued, time.perf_counter() - start, [queue.get(job["job_id"]) for job in jobs]
+
+
+async def run():
+    trip = make_trip(7)
+    queue = JobQueue()
+    workers = JobWorkerPool(queue, EXPORT_HANDLERS)
+
+    # The app opens the shared client and the workers once in its lifespan; do the same here
+    await http_client.start()
+    await workers.start()
+    await deliver(queue, workers, ["warmup@example.com"], trip)
+
+    print("=== Batch Export Benchmark (stub webhook, "
+          f"{STUB_LATENCY * 1000:.0f} ms per call, {config.JOB_WORKERS} job workers) ===\n")
+    print(f"{'recipients':>10} {'one-by-one/s':>13} {'queue ms':>9} {'queued/s':>9} {'speedup':>8} {'payloads ok':>12}")
+
+    for n in RECIPIENTS:
+        emails = [f"user{i}@example.com" for i in range(n)]
+
+        start = time.perf_counter()
+        await asyncio.to_thread(export_one_by_one, emails, trip)
+        sequential = time.perf_counter() - start
+
+        server.webhook_calls.clear()
+        queued, delivered, jobs = await deliver(queue, workers, emails, trip)
+
+        expected_trip = trip.public_dict()
+        payloads_ok = (
+            all(job["status"] == "succeeded" for job in jobs)
+            and sorted(call["email"] for call in server.webhook_calls) == sorted(emails)
+            and all(call["trip"]["days"] == [day.model_dump(mode="json") for day in trip.days] for call in server.webhook_calls)
+            and all(call["trip"].keys() == expected_trip.keys() for call in server.webhook_calls)
+        )
+
+        print(f"{n:>10} {n / sequential:>13.1f} {queued * 1000:>9.1f} {n / delivered:>9.1f} "
+              f"{sequential / delivered:>7.1f}x {str(payloads_ok):>12}")
+
+    await workers.stop()
+    await http_client.stop()
+    server.shutdown()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
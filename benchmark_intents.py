@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Benchmark: intent classification accuracy and latency, rules vs LLM.
+
+Runs every labelled utterance in data/intent_benchmark.jsonl through the
+rule-based fast path and reports coverage (share answered locally),
+accuracy on what it answered and per-utterance latency. With --llm, the
+same set is also sent to Gemini (needs GEMINI_API_KEY and network).
+
+Usage:
+    python benchmark_intents.py [--llm]
+"""
+
+import sys
+import json
+import time
+import statistics
+
+sys.path.append('.')
+
+from app.intents import (
+    parse_intent_rules,
+    normalize_utterance,
+    _classify_with_llm,
+    RULES_MIN_CONFIDENCE
+)
+
+BENCHMARK_PATH = "data/intent_benchmark.jsonl"
+
+
+def load_cases():
+    with open(BENCHMARK_PATH, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def matches(predicted, expected):
+    if not predicted or predicted.get("intent") != expected["intent"]:
+        return False
+
+    for key, value in expected.items():
+        got = predicted.get(key)
+        if key == "interests":
+            if {i.lower() for i in got or []} != set(value):
+                return False
+        elif isinstance(value, str):
+            if normalize_utterance(str(got)) != normalize_utterance(value):
+                return False
+        elif got != value:
+            return False
+
+    return True
+
+
+def run_rules(cases):
+    answered, correct, latencies = 0, 0, []
+
+    for case in cases:
+        start = time.perf_counter()
+        parsed, confidence = parse_intent_rules(normalize_utterance(case["text"]))
+        latencies.append(time.perf_counter() - start)
+
+        if parsed is None or confidence < RULES_MIN_CONFIDENCE:
+            continue
+
+        answered += 1
+        if matches(parsed, case["expected"]):
+            correct += 1
+        else:
+            print(f"  rules mismatch: {case['text']!r} -> {parsed}")
+
+    return answered, correct, latencies
+
+
+def run_llm(cases):
+    correct, latencies = 0, []
+
+    for case in cases:
+        start = time.perf_counter()
+        predicted = _classify_with_llm(case["text"])
+        latencies.append(time.perf_counter() - start)
+
+        if matches(predicted, case["expected"]):
+            correct += 1
+
+    return correct, latencies
+
+
+def main():
+    cases = load_cases()
+    print(f"=== Intent Benchmark ({len(cases)} labelled utterances) ===\n")
+
+    answered, correct, latencies = run_rules(cases)
+    print("\nRules fast path:")
+    print(f"  Coverage: {answered}/{len(cases)} ({answered / len(cases):.0%}) at confidence >= {RULES_MIN_CONFIDENCE}")
+    print(f"  Accuracy on covered: {correct}/{answered} ({correct / max(answered, 1):.0%})")
+    print(f"  Latency: median {statistics.median(latencies) * 1e6:.1f} us, max {max(latencies) * 1e6:.1f} us")
+
+    if "--llm" in sys.argv:
+        correct, latencies = run_llm(cases)
+        print("\nLLM path:")
+        print(f"  Accuracy: {correct}/{len(cases)} ({correct / len(cases):.0%})")
+        print(f"  Latency: median {statistics.median(latencies) * 1000:.0f} ms, max {max(latencies) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
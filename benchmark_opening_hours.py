@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark: opening-hours-aware scheduling of 7-day trips from 1,000 candidates.
+
+Candidates carry a mix of OSM opening_hours values: common shapes, per-POI
+variations of them, values past midnight, closed days and unparseable ones
+(scheduled as always open). Reports median wall time per planned trip,
+table build included, with the parse cache cold and warm, for both
+builders. Every scheduled visit must lie inside its POI's hours.
+
+Target: under 50 ms per trip.
+
+Usage:
+    python benchmark_opening_hours.py
+"""
+
+import sys
+import time
+import random
+import statistics
+from datetime import date
+
+sys.path.append('.')
+
+from app.mcp.itinerary_builder import build_itinerary
+from app.mcp.opening_hours import parse_opening_hours
+from app.state import TripConstraints
+from benchmark_travel_matrix import make_pois
+
+N_CANDIDATES = 1_000
+DAYS = 7
+REPEATS = 20
+TARGET_MS = 50
+
+SHAPES = [
+    "24/7",
+    "Mo-Su {a:02d}:00-{b:02d}:00",
+    "Tu-Su {a:02d}:00-{b:02d}:00; Mo off",
+    "Mo-Fr {a:02d}:00-{b:02d}:00; Sa,Su {a:02d}:30-{b:02d}:30",
+    "Mo-Sa {a:02d}:00-13:00,14:00-{b:02d}:00",
+    "Fr-Su {a:02d}:00-02:00",
+    "Mo-Th 10:00-{b:02d}:00, Fr-Su 10:00-{b:02d}:30; PH off",
+    "sunrise-sunset",
+    None
+]
+
+CATEGORIES = ["museum", "place_of_worship", "restaurant", "park", "monument"]
+
+
+def make_candidates(n, seed=24):
+    rng = random.Random(seed)
+    pois = make_pois(n, seed=seed)
+
+    for poi in pois:
+        shape = rng.choice(SHAPES)
+        if shape is not None:
+            poi.tags["opening_hours"] = shape.format(a=rng.randint(6, 11), b=rng.randint(15, 21))
+        # Visit lengths follow the duration model's category and tier
+        poi.category = rng.choice(CATEGORIES)
+        if rng.random() < 0.3:
+            poi.tags["wikidata"] = f"Q{rng.randint(1, 10**6)}"
+
+    return pois
+
+
+def check_hours(pois, days, start):
+    by_id = {poi.poi_id: poi for poi in pois}
+
+    for day in days:
+        weekday = (start.weekday() + day.day - 1) % 7
+        for block in day.blocks:
+            hours = parse_opening_hours(by_id[block.poi_id].tags.get("opening_hours"))
+            if hours is None:
+                continue
+            hh, mm = map(int, block.start_time.split(":"))
+            begin, end = hh * 60 + mm, hh * 60 + mm + block.duration_minutes
+            assert any(o <= begin and end <= c for o, c in hours[weekday]), (block.poi_id, block.start_time)
+
+
+def measure(pois, constraints, mode, cold):
+    samples = []
+    for _ in range(REPEATS):
+        if cold:
+            parse_opening_hours.cache_clear()
+        start = time.perf_counter()
+        days = build_itinerary(pois, constraints, mode=mode)
+        samples.append(time.perf_counter() - start)
+
+    return statistics.median(samples) * 1000, days
+
+
+def main():
+    pois = make_candidates(N_CANDIDATES)
+    start = date(2026, 1, 5)  # a Monday
+    constraints = TripConstraints(days=DAYS, pace="packed", start_date=start)
+
+    distinct = len({poi.tags.get("opening_hours") for poi in pois})
+
+    print(f"=== Opening Hours Scheduling ({N_CANDIDATES} candidates, {distinct} distinct values, {DAYS} days) ===\n")
+    print(f"{'builder':>10} {'cache':>6} {'median ms':>10} {'visits':>7} {'target':>7}")
+
+    for mode in ("greedy", "optimized"):
+        for cold in (True, False):
+            ms, days = measure(pois, constraints, mode, cold)
+            check_hours(pois, days, start)
+            visits = sum(len(day.blocks) for day in days)
+            print(f"{mode:>10} {'cold' if cold else 'warm':>6} {ms:>10.2f} {visits:>7} {'ok' if ms < TARGET_MS else 'MISS':>7}")
+
+    print("\nAll visits start and end within opening hours.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark: ranking 50k candidate POIs, pure Python vs vectorized + heap.
+
+The pure Python ranker scores each POI from its tags in a loop, heapifies
+every candidate and re-scores lazily as category penalties grow. The
+vectorized ranker scores arrays of tag features and keeps one heap entry
+per category (app.mcp.poi_ranking). Features are extracted once per cached
+search result, so the warm timing is what a request pays. Both rankers
+must pick the same POIs.
+
+Usage:
+    python benchmark_poi_ranking.py
+"""
+
+import sys
+import time
+import heapq
+import random
+
+sys.path.append('.')
+
+from app.mcp.poi_ranking import (
+    POPULARITY_TAG_WEIGHTS, RELEVANCE_WEIGHT,
+    RankingFeatures, rank_pois
+)
+from app.mcp.poi_search import INTEREST_TAG_PAIRS, POISearchOutput
+
+N_CANDIDATES = 50_000
+TOP_K = [25, 300]
+INTERESTS = ["history", "culture", "food"]
+PENALTY = 0.5
+REPEATS = 20
+
+KINDS = [
+    ("museum", {"tourism": "museum"}),
+    ("place_of_worship", {"amenity": "place_of_worship"}),
+    ("restaurant", {"amenity": "restaurant"}),
+    ("park", {"leisure": "park"}),
+    ("attraction", {"tourism": "attraction"}),
+    ("cafe", {"amenity": "cafe"}),
+]
+
+
+def make_candidates(n, seed=42):
+    rng = random.Random(seed)
+    pois = []
+
+    for i in range(n):
+        category, tags = rng.choice(KINDS)
+        tags = dict(tags, name=f"POI {i}")
+        for key in POPULARITY_TAG_WEIGHTS:
+            if key not in tags and rng.random() < 0.2:
+                tags[key] = "yes"
+
+        pois.append(POISearchOutput(
+            poi_id=f"osm_{i}",
+            name=tags["name"],
+            category=category,
+            lat=28.40 + rng.random() * 0.48,
+            lon=76.84 + rng.random() * 0.51,
+            suggested_duration=90,
+            indoor=False,
+            source="OpenStreetMap",
+            tags=tags
+        ))
+
+    return pois
+
+
+def python_rank(pois, interests, k, penalty):
+    wanted = [INTEREST_TAG_PAIRS[i] for i in interests]
+    heap = []
+
+    for index, poi in enumerate(pois):
+        relevance = sum(all(poi.tags.get(key) == value for key, value in pairs) for pairs in wanted)
+        if not relevance:
+            continue
+        popularity = sum(weight for key, weight in POPULARITY_TAG_WEIGHTS.items() if key in poi.tags)
+        heap.append((-(RELEVANCE_WEIGHT * relevance + popularity), index, 0))
+
+    heapq.heapify(heap)
+    picked = {}
+    selected = []
+
+    while heap and len(selected) < k:
+        score, index, seen = heapq.heappop(heap)
+        count = picked.get(pois[index].category, 0)
+        if seen != count:
+            # Penalty grew since this entry was pushed: re-score and retry
+            heapq.heappush(heap, (score + penalty * (count - seen), index, count))
+            continue
+        picked[pois[index].category] = count + 1
+        selected.append(pois[index])
+
+    return selected
+
+
+def timed_ms(fn, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def main():
+    pois = make_candidates(N_CANDIDATES)
+
+    print(f"=== POI Ranking Benchmark ({N_CANDIDATES:,} candidates, interests {INTERESTS}) ===\n")
+
+    extract_ms, features = timed_ms(lambda: RankingFeatures.from_pois(pois), repeats=3)
+    print(f"tag feature extraction (once per cached search): {extract_ms:.1f} ms\n")
+
+    print(f"{'k':>5} {'python ms':>10} {'vectorized ms':>14} {'speedup':>8} {'same picks':>11} {'categories':>11}")
+
+    for k in TOP_K:
+        python_ms, expected = timed_ms(lambda: python_rank(pois, INTERESTS, k, PENALTY), repeats=3)
+        ranked_ms, ranked = timed_ms(lambda: rank_pois(pois, INTERESTS, k, PENALTY, features=features))
+
+        same = [poi.poi_id for poi in ranked] == [poi.poi_id for poi in expected]
+        categories = len({poi.category for poi in ranked})
+        print(f"{k:>5} {python_ms:>10.1f} {ranked_ms:>14.2f} {python_ms / ranked_ms:>7.0f}x {str(same):>11} {categories:>11}")
+
+
+if __name__ == "__main__":
+    main()
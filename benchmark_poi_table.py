@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Benchmark: greedy scheduling over pydantic POIs vs the columnar POITable.
+
+Plans one trip per run from a pool of pool_size(days) candidates and
+reports median wall time and peak traced allocation per planned trip for:
+
+  per-leg models  - TravelTimeInput/estimate_travel_time per leg and a
+                    validated POIBlock per block (the original builder)
+  matrix          - N x N travel matrix plus validated POIBlocks
+  POITable        - build_itinerary(): columnar rows, consecutive legs
+                    only, blocks built from already-validated data
+
+All three must produce the same days.
+
+Usage:
+    python benchmark_poi_table.py
+"""
+
+import sys
+import time
+import statistics
+import tracemalloc
+
+sys.path.append('.')
+
+from app.mcp.itinerary_builder import build_itinerary, PACE_LIMITS
+from app.mcp.travel_time import estimate_travel_time, travel_time_matrix, TravelTimeInput
+from app.orchestrator import pool_size
+from app.state import DayPlan, POIBlock, TripConstraints
+from benchmark_travel_matrix import make_pois
+
+TRIP_LENGTHS = [3, 7, 30]
+REPEATS = 50
+
+
+def _block(poi, travel_minutes):
+    return POIBlock(
+        poi_id=poi.poi_id,
+        name=poi.name,
+        category=poi.category,
+        lat=poi.lat,
+        lon=poi.lon,
+        duration_minutes=poi.suggested_duration,
+        travel_minutes_from_previous=travel_minutes,
+        indoor=poi.indoor,
+        source=poi.source
+    )
+
+
+def build_with_models(pois, constraints, use_matrix):
+    # The builder before POITable, with either per-leg models or the matrix
+    pois_per_day = PACE_LIMITS[constraints.pace]
+    available_minutes = (constraints.daily_end_hour - constraints.daily_start_hour) * 60
+    travel = travel_time_matrix(pois) if use_matrix else None
+
+    days = []
+    poi_index = 0
+
+    for day_number in range(1, constraints.days + 1):
+        blocks, total_time, last_index = [], 0, None
+
+        while poi_index < len(pois) and len(blocks) < pois_per_day:
+            poi = pois[poi_index]
+            travel_minutes = 0
+
+            if last_index is not None:
+                if use_matrix:
+                    travel_minutes = int(travel.minutes[last_index, poi_index])
+                else:
+                    last = pois[last_index]
+                    travel_minutes = estimate_travel_time(
+                        TravelTimeInput(lat1=last.lat, lon1=last.lon, lat2=poi.lat, lon2=poi.lon)
+                    ).estimated_travel_minutes
+
+            projected_time = total_time + travel_minutes + poi.suggested_duration
+            if projected_time > available_minutes:
+                break
+
+            blocks.append(_block(poi, travel_minutes))
+            total_time, last_index = projected_time, poi_index
+            poi_index += 1
+
+        days.append(DayPlan(day=day_number, blocks=blocks))
+
+    return days
+
+
+BUILDERS = [
+    ("per-leg models", lambda pois, constraints: build_with_models(pois, constraints, use_matrix=False)),
+    ("matrix", lambda pois, constraints: build_with_models(pois, constraints, use_matrix=True)),
+    ("POITable", lambda pois, constraints: build_itinerary(pois, constraints, mode="greedy")),
+]
+
+
+def measure(build, pois, constraints):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        days = build(pois, constraints)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    build(pois, constraints)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(samples) * 1e6, peak / 1024, days
+
+
+def main():
+    print("=== Scheduler Benchmark (per planned trip, greedy, moderate pace) ===\n")
+    print(f"{'days':>5} {'pool':>5} {'builder':>15} {'median us':>10} {'peak KiB':>9} {'same days':>10}")
+
+    for days in TRIP_LENGTHS:
+        pois = make_pois(pool_size(days), seed=days)
+        constraints = TripConstraints(days=days, pace="moderate")
+
+        reference = None
+        for name, build in BUILDERS:
+            micros, peak_kib, result = measure(build, pois, constraints)
+            # The models-based builders predate opening hours and start times
+            result = [day.model_dump(exclude={"blocks": {"__all__": {"start_time"}}}) for day in result]
+            reference = reference or result
+
+            print(f"{days:>5} {len(pois):>5} {name:>15} {micros:>10.1f} {peak_kib:>9.1f} {str(result == reference):>10}")
+
+
+if __name__ == "__main__":
+    main()
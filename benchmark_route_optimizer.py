@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Benchmark: greedy vs route-optimized itinerary builder.
+
+Builds trips from synthetic Delhi POIs (random order, like Overpass output)
+and reports total travel minutes, POIs scheduled and build time per mode.
+
+Usage:
+    python benchmark_route_optimizer.py
+"""
+
+import sys
+import time
+
+sys.path.append('.')
+
+from app.mcp.itinerary_builder import build_itinerary
+from app.state import TripConstraints
+from benchmark_travel_matrix import make_pois
+
+SCENARIOS = [
+    (2, "relaxed"),
+    (3, "moderate"),
+    (7, "packed"),
+]
+
+SEEDS = range(20)
+
+
+def summarize(days):
+    travel = sum(block.travel_minutes_from_previous for day in days for block in day.blocks)
+    scheduled = sum(len(day.blocks) for day in days)
+    return travel, scheduled
+
+
+def run(mode, days, pace):
+    travel_total, scheduled_total, elapsed = 0, 0, 0.0
+
+    for seed in SEEDS:
+        pois = make_pois(days * 5, seed=seed)
+        constraints = TripConstraints(days=days, pace=pace)
+
+        start = time.perf_counter()
+        itinerary = build_itinerary(pois, constraints, mode=mode)
+        elapsed += time.perf_counter() - start
+
+        travel, scheduled = summarize(itinerary)
+        travel_total += travel
+        scheduled_total += scheduled
+
+    runs = len(SEEDS)
+    return travel_total / runs, scheduled_total / runs, elapsed / runs * 1000
+
+
+def main():
+    print("=== Itinerary Builder Benchmark (greedy vs optimized) ===")
+    print(f"Averaged over {len(SEEDS)} random POI sets per scenario\n")
+    print(f"{'days':>4} {'pace':>9} {'mode':>10} {'travel min':>11} {'POIs':>6} {'ms':>8}")
+
+    for days, pace in SCENARIOS:
+        for mode in ("greedy", "optimized"):
+            travel, scheduled, ms = run(mode, days, pace)
+            print(f"{days:>4} {pace:>9} {mode:>10} {travel:>11.1f} {scheduled:>6.1f} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
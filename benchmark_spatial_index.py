@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Benchmark: POI spatial index vs linear scan at 100k POIs.
+
+Times building the grid, incremental inserts, and radius / k-nearest /
+bounding-box queries against a full scan of the POI list (what callers of
+search_pois had to do before). The scan uses haversine_distance per POI
+and is timed on a few queries only. Every index answer is checked
+against the scan.
+
+Usage:
+    python benchmark_spatial_index.py
+"""
+
+import sys
+import time
+import random
+
+sys.path.append('.')
+
+from app.mcp.spatial_index import SpatialIndex
+from app.mcp.travel_time import haversine_distance
+from benchmark_travel_matrix import make_pois
+
+N_POIS = 100_000
+N_INSERTS = 1_000
+QUERIES = 200
+SCAN_QUERIES = 5
+
+RADIUS_KM = 2
+K = 10
+BBOX_DEG = 0.02
+
+
+def random_points(n, seed):
+    rng = random.Random(seed)
+    return [(28.40 + rng.random() * 0.48, 76.84 + rng.random() * 0.51) for _ in range(n)]
+
+
+def scan_radius(pois, lat, lon):
+    hits = [(haversine_distance(lat, lon, poi.lat, poi.lon), poi.poi_id) for poi in pois]
+    return sorted(poi_id for distance, poi_id in hits if distance <= RADIUS_KM)
+
+
+def scan_nearest(pois, lat, lon):
+    hits = sorted((haversine_distance(lat, lon, poi.lat, poi.lon), poi.poi_id) for poi in pois)
+    return [poi_id for _, poi_id in hits[:K]]
+
+
+def scan_bbox(pois, lat, lon):
+    return [
+        poi.poi_id for poi in pois
+        if lat <= poi.lat <= lat + BBOX_DEG and lon <= poi.lon <= lon + BBOX_DEG
+    ]
+
+
+def per_query_us(fn, points):
+    start = time.perf_counter()
+    results = [fn(lat, lon) for lat, lon in points]
+    return (time.perf_counter() - start) / len(points) * 1e6, results
+
+
+def main():
+    pois = make_pois(N_POIS + N_INSERTS, seed=7)
+    base, extra = pois[:N_POIS], pois[N_POIS:]
+
+    print(f"=== Spatial Index Benchmark ({N_POIS:,} POIs) ===\n")
+
+    start = time.perf_counter()
+    index = SpatialIndex(base)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for poi in extra:
+        index.add(poi)
+    insert_us = (time.perf_counter() - start) / N_INSERTS * 1e6
+
+    print(f"build: {build_ms:.1f} ms   incremental add: {insert_us:.1f} us/POI   size: {len(index):,}\n")
+
+    points = random_points(QUERIES, seed=1)
+    scan_points = points[:SCAN_QUERIES]
+
+    queries = [
+        (
+            f"radius {RADIUS_KM} km",
+            lambda lat, lon: sorted(poi.poi_id for poi, _ in index.within_radius(lat, lon, RADIUS_KM)),
+            lambda lat, lon: scan_radius(pois, lat, lon)
+        ),
+        (
+            f"{K} nearest",
+            lambda lat, lon: [poi.poi_id for poi, _ in index.nearest(lat, lon, K)],
+            lambda lat, lon: scan_nearest(pois, lat, lon)
+        ),
+        (
+            f"bbox {BBOX_DEG} deg",
+            lambda lat, lon: [poi.poi_id for poi in index.in_bbox(lat, lon, lat + BBOX_DEG, lon + BBOX_DEG)],
+            lambda lat, lon: scan_bbox(pois, lat, lon)
+        ),
+    ]
+
+    print(f"{'query':>14} {'index us':>10} {'scan us':>12} {'speedup':>9} {'matches':>8}")
+
+    for name, indexed, scan in queries:
+        index_us, index_results = per_query_us(indexed, points)
+        scan_us, scan_results = per_query_us(scan, scan_points)
+
+        matches = index_results[:SCAN_QUERIES] == scan_results
+        print(f"{name:>14} {index_us:>10.1f} {scan_us:>12.1f} {scan_us / index_us:>8.0f}x {str(matches):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Benchmark: worker startup time, `import app.main` to the first /health 200.
+
+Each run is a fresh interpreter so nothing is shared between samples.
+Track the median across releases to catch import-time regressions.
+
+Usage:
+    python benchmark_startup.py [runs]
+"""
+
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    assert client.get("/health").status_code == 200
+    ready = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "health_s": ready - start}))
+"""
+
+
+def run_once():
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "benchmark-key")
+    env.setdefault("N8N_WEBHOOK_URL", "http://127.0.0.1:9/webhook")
+    env["WARMUP_ON_STARTUP"] = "false"
+
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    print("=== Startup Benchmark (import app.main -> first /health 200) ===")
+
+    samples = [run_once() for _ in range(RUNS)]
+
+    for name in ("import_s", "health_s"):
+        values = [sample[name] for sample in samples]
+        print(f"{name:>9}: median {statistics.median(values) * 1000:8.1f} ms   "
+              f"min {min(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Benchmark: pairwise travel estimates, scalar loop vs vectorized matrix.
+
+The scalar loop is what build_itinerary used to do per leg
+(TravelTimeInput -> estimate_travel_time -> TravelTimeOutput). For large N
+the scalar timing is measured on a sample of rows and extrapolated.
+
+Usage:
+    python benchmark_travel_matrix.py
+"""
+
+import sys
+import time
+import random
+
+sys.path.append('.')
+
+from app.mcp.travel_time import estimate_travel_time, travel_time_matrix, TravelTimeInput
+from app.mcp.poi_search import POISearchOutput
+
+SIZES = [25, 500, 5000]
+
+# Scalar rows actually timed per size; the rest is extrapolated
+SCALAR_SAMPLE_ROWS = 25
+
+
+def make_pois(n, seed=42):
+    rng = random.Random(seed)
+    return [
+        POISearchOutput(
+            poi_id=f"osm_{i}",
+            name=f"POI {i}",
+            category="museum",
+            lat=28.40 + rng.random() * 0.48,   # Delhi bounding box
+            lon=76.84 + rng.random() * 0.51,
+            suggested_duration=90,
+            indoor=False,
+            source="OpenStreetMap"
+        )
+        for i in range(n)
+    ]
+
+
+def scalar_seconds(pois):
+    rows = min(len(pois), SCALAR_SAMPLE_ROWS)
+
+    start = time.perf_counter()
+    for a in pois[:rows]:
+        for b in pois:
+            if a is b:
+                continue
+            estimate_travel_time(
+                TravelTimeInput(lat1=a.lat, lon1=a.lon, lat2=b.lat, lon2=b.lon)
+            )
+    elapsed = time.perf_counter() - start
+
+    return elapsed * len(pois) / rows, rows < len(pois)
+
+
+def matrix_seconds(pois, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        travel_time_matrix(pois)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_agreement(pois):
+    matrix = travel_time_matrix(pois)
+    mismatches = 0
+    for i, a in enumerate(pois):
+        for j, b in enumerate(pois):
+            if i == j:
+                continue
+            scalar = estimate_travel_time(
+                TravelTimeInput(lat1=a.lat, lon1=a.lon, lat2=b.lat, lon2=b.lon)
+            )
+            if scalar.estimated_travel_minutes != matrix.minutes[i, j]:
+                mismatches += 1
+    return mismatches
+
+
+def main():
+    print("=== Travel Time Matrix Benchmark ===")
+    print(f"Scalar vs matrix agreement on 25 POIs: {check_agreement(make_pois(25))} mismatches\n")
+
+    print(f"{'POIs':>6} {'pairs':>12} {'scalar (s)':>14} {'matrix (s)':>12} {'speedup':>10}")
+    for n in SIZES:
+        pois = make_pois(n)
+        scalar, extrapolated = scalar_seconds(pois)
+        matrix = matrix_seconds(pois)
+        marker = "*" if extrapolated else " "
+        print(f"{n:>6} {n * (n - 1):>12} {scalar:>13.4f}{marker} {matrix:>12.4f} {scalar / matrix:>9.0f}x")
+
+    print("\n* extrapolated from the first "
+          f"{SCALAR_SAMPLE_ROWS} rows")
+
+
+if __name__ == "__main__":
+    main()
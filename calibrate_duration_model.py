@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Refit the visit duration model from logged trips.
+
+Usage:
+    python calibrate_duration_model.py [trips] [output]
+
+`trips` is a trip session database (SESSION_DB_PATH, the default) or a
+JSON lines file with one saved trip per line, in the format the session
+store writes. Only visits with observed minutes are fitted: blocks whose
+actual_minutes was recorded through POST /record-visit. Each gives its
+category, the tags of the matching pool POI, the trip's pace and those
+minutes. Planned duration_minutes come from the model itself and are
+never fitted on.
+
+The fit starts from the current model (DURATION_MODEL_PATH, or the
+built-in defaults) and is written to `output`, DURATION_MODEL_PATH by
+default. The API picks it up on restart.
+"""
+
+import sys
+import sqlite3
+
+sys.path.append('.')
+
+from app.config import config
+from app.mcp.duration_model import DEFAULT_CATEGORY, PACES, TIERS, fit_duration_model, get_duration_model
+from app.state import TripState
+
+
+def load_trips(path):
+    if path.endswith((".sqlite3", ".sqlite", ".db")):
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("SELECT trip FROM sessions").fetchall()
+        finally:
+            conn.close()
+        return [TripState.model_validate_json(row[0]) for row in rows]
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [TripState.model_validate_json(line) for line in f if line.strip()]
+
+
+def logged_visits(trips):
+    for trip in trips:
+        tags = {poi.poi_id: poi.tags for poi in trip.poi_pool}
+        for day in trip.days:
+            for block in day.blocks:
+                if block.actual_minutes is not None:
+                    yield block.category, tags.get(block.poi_id, {}), trip.constraints.pace, block.actual_minutes
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print(__doc__)
+        sys.exit(0)
+
+    source = sys.argv[1] if len(sys.argv) > 1 else config.SESSION_DB_PATH
+    output = sys.argv[2] if len(sys.argv) > 2 else config.DURATION_MODEL_PATH
+
+    trips = load_trips(source)
+    prior = get_duration_model()
+    model, counts = fit_duration_model(logged_visits(trips), prior)
+
+    print(f"Fitted {len(counts)} entries from {sum(counts.values())} visits in {len(trips)} trips\n")
+    print(f"{'category':>18} {'tier':>6} {'pace':>9} {'visits':>7} {'before':>7} {'after':>6}")
+
+    before, after = prior.to_dict(), model.to_dict()
+    for (category, tier, pace), visits in sorted(counts.items()):
+        old = before.get(category, before[DEFAULT_CATEGORY])[tier][pace]
+        print(f"{category:>18} {tier:>6} {pace:>9} {visits:>7} {old:>7} {after[category][tier][pace]:>6}")
+
+    model.save(output)
+    print(f"\nWrote {len(after)} categories x {len(TIERS)} tiers x {len(PACES)} paces to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+"""
+Import an Overpass JSON snapshot into the local POI store.
+
+Usage:
+    python import_poi_snapshot.py delhi_overpass.json [City]
+
+The snapshot is a saved Overpass API response, e.g. from:
+    [out:json];area["name"="Delhi"]->.a;(node["tourism"="museum"](area.a);...);out center;
+"""
+
+import sys
+
+sys.path.append('.')
+
+from app.mcp.poi_search import import_overpass_snapshot
+from app.config import config
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    path = sys.argv[1]
+    city = sys.argv[2] if len(sys.argv) > 2 else "Delhi"
+
+    count = import_overpass_snapshot(path, city)
+    print(f"Imported {count} POIs for {city} into {config.POI_STORE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
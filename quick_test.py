@@ -15,9 +15,11 @@ response = requests.post("http://localhost:8000/plan-trip", json={
     "pace": "relaxed"
 })
 print(f"2. Plan trip: {response.status_code == 200}")
+trip_id = None
 if response.status_code == 200:
     data = response.json()
-    print(f"   City: {data['city']}, Days: {data['constraints']['days']}")
+    trip_id = data.get("trip_id")
+    print(f"   City: {data['city']}, Days: {data['constraints']['days']}, Trip ID: {trip_id}")
 
 # Test 3: Voice command - PLAN
 response = requests.post("http://localhost:8000/voice-command", json={
@@ -30,7 +32,8 @@ if response.status_code == 200:
 
 # Test 4: Voice command - EXPLAIN
 response = requests.post("http://localhost:8000/voice-command", json={
-    "text": "Explain the plan"
+    "text": "Explain the plan",
+    "trip_id": trip_id
 })
 print(f"4. Voice EXPLAIN: {response.status_code == 200}")
 if response.status_code == 200:
@@ -46,7 +49,8 @@ if response.status_code == 200:
 
 # Test 6: Weather adjustment voice command
 response = requests.post("http://localhost:8000/voice-command", json={
-    "text": "What if it rains?"
+    "text": "What if it rains?",
+    "trip_id": trip_id
 })
 print(f"6. Weather adjustment: {response.status_code == 200}")
 if response.status_code == 200:
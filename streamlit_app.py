@@ -3,6 +3,7 @@ import requests
 import json
 from datetime import datetime
 import os
+import time
 
 # Set page config
 st.set_page_config(
@@ -66,7 +67,8 @@ with col1:
                 try:
                     api_url = os.getenv("BACKEND_URL", "http://localhost:8000")
                     response = requests.post(f"{api_url}/voice-command", json={
-                        "text": voice_input
+                        "text": voice_input,
+                        "trip_id": st.session_state.get("trip_data", {}).get("trip_id")
                     })
                     
                     if response.status_code == 200:
@@ -100,7 +102,8 @@ with col2:
                     # Simulate voice command for weather adjustment
                     api_url = os.getenv("BACKEND_URL", "http://localhost:8000")
                     response = requests.post(f"{api_url}/voice-command", json={
-                        "text": "What if it rains?"
+                        "text": "What if it rains?",
+                        "trip_id": st.session_state.trip_data.get("trip_id")
                     })
                     
                     if response.status_code == 200:
@@ -119,6 +122,9 @@ with col2:
         else:
             st.warning("Please generate a trip first before adjusting for weather.")
 
+# Days are drawn here while a streamed plan is being built
+stream_area = st.empty()
+
 # Sidebar for inputs
 with st.sidebar:
     st.header("Trip Configuration")
@@ -139,19 +145,53 @@ with st.sidebar:
         else:
             with st.spinner("Generating your personalized itinerary..."):
                 try:
-                    # Make API call to FastAPI backend
+                    # Stream the plan so each day shows up as soon as it is built
                     api_url = os.getenv("BACKEND_URL", "http://localhost:8000")
-                    response = requests.post(f"{api_url}/plan-trip", json={
+                    response = requests.post(f"{api_url}/plan-trip/stream", json={
                         "city": city,
                         "interests": interests,
                         "days": days,
                         "pace": pace
-                    })
+                    }, stream=True)
                     
                     if response.status_code == 200:
-                        trip_data = response.json()
-                        st.session_state.trip_data = trip_data
-                        st.success("Itinerary generated successfully!")
+                        streamed_days = []
+                        trip_data = None
+                        error = None
+                        progress = stream_area.container()
+                        st.session_state.pop("evaluation_results", None)
+                        
+                        for line in response.iter_lines():
+                            if not line:
+                                continue
+                            event = json.loads(line)
+                            
+                            if event["type"] == "pois":
+                                progress.write(f"Found {event['count']} places, building days...")
+                            elif event["type"] == "day":
+                                day_plan = event["day"]
+                                streamed_days.append(day_plan)
+                                names = ", ".join(block["name"] for block in day_plan["blocks"]) or "No activities"
+                                progress.write(f"**Day {day_plan['day']}:** {names}")
+                            elif event["type"] == "trip":
+                                trip_data = {**event, "days": streamed_days}
+                                trip_data.pop("type")
+                            elif event["type"] == "evaluations":
+                                # Fills the Evaluation Panel without another round trip
+                                st.session_state.evaluation_results = {
+                                    "feasibility": event["feasibility"],
+                                    "grounding": event["grounding"]
+                                }
+                            elif event["type"] == "error":
+                                error = event["message"]
+                        
+                        stream_area.empty()
+                        
+                        if trip_data and not error:
+                            st.session_state.trip_data = trip_data
+                            st.success("Itinerary generated successfully!")
+                        else:
+                            st.error(f"Error: {error or 'Incomplete itinerary stream'}")
                     else:
                         st.error(f"Error: {response.status_code} - {response.text}")
                 except Exception as e:
@@ -230,6 +270,7 @@ if 'trip_data' in st.session_state:
             try:
                 api_url = os.getenv("BACKEND_URL", "http://localhost:8000")
                 response = requests.post(f"{api_url}/edit-day", json={
+                    "trip_id": st.session_state.trip_data.get("trip_id"),
                     "day": int(day_to_edit),
                     "pace": new_pace
                 })
@@ -275,7 +316,8 @@ if 'trip_data' in st.session_state:
                         # Simulate voice command for weather adjustment
                         api_url = os.getenv("BACKEND_URL", "http://localhost:8000")
                         response = requests.post(f"{api_url}/voice-command", json={
-                            "text": "What if it rains?"
+                            "text": "What if it rains?",
+                            "trip_id": st.session_state.trip_data.get("trip_id")
                         })
                         
                         if response.status_code == 200:
@@ -315,11 +357,12 @@ if 'trip_data' in st.session_state:
                 api_url = os.getenv("BACKEND_URL", "http://localhost:8000")
                 
                 # Run Feasibility Evaluation
-                feas_response = requests.get(f"{api_url}/run-feasibility")
+                trip_params = {"trip_id": st.session_state.trip_data.get("trip_id")}
+                feas_response = requests.get(f"{api_url}/run-feasibility", params=trip_params)
                 feasibility_result = feas_response.json() if feas_response.status_code == 200 else {"error": "Failed to fetch"}
                 
                 # Run Grounding Evaluation
-                ground_response = requests.get(f"{api_url}/run-grounding")
+                ground_response = requests.get(f"{api_url}/run-grounding", params=trip_params)
                 grounding_result = ground_response.json() if ground_response.status_code == 200 else {"error": "Failed to fetch"}
                 
                 # Store results in session state
@@ -394,15 +437,26 @@ if 'trip_data' in st.session_state:
                 try:
                     api_url = os.getenv("BACKEND_URL", "http://localhost:8000")
                     response = requests.post(f"{api_url}/export-itinerary", json={
-                        "email": email
+                        "email": email,
+                        "trip_id": st.session_state.trip_data.get("trip_id")
                     })
                     
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get("status") == "sent":
+                    if response.status_code == 202:
+                        # The webhook is called by a background job; poll it briefly
+                        job_id = response.json()["data"]["job_id"]
+                        job = {"status": "queued"}
+                        for _ in range(20):
+                            job = requests.get(f"{api_url}/export-jobs/{job_id}").json()
+                            if job.get("status") in ("succeeded", "dead"):
+                                break
+                            time.sleep(0.5)
+                        
+                        if job.get("status") == "succeeded":
                             st.success("Itinerary sent successfully! Check your email for the PDF.")
+                        elif job.get("status") == "dead":
+                            st.error(f"Error: {job.get('last_error', 'Unknown error')}")
                         else:
-                            st.error(f"Error: {result.get('error', 'Unknown error')}")
+                            st.info(f"Export queued (job {job_id}); it will be retried in the background.")
                     else:
                         st.error(f"Error: {response.status_code} - {response.text}")
                 except Exception as e:
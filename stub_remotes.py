@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Local stub for the remote services used by the MCP tools.
+
+Serves canned Overpass, open-meteo and n8n webhook responses so tests and
+benchmarks can point OVERPASS_URL, OPEN_METEO_URL and N8N_WEBHOOK_URL at
+localhost instead of the real remotes.
+
+Usage:
+    python stub_remotes.py [port]
+"""
+
+import json
+from datetime import date, timedelta
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+OVERPASS_RESPONSE = {
+    "elements": [
+        {"id": 101, "lat": 28.6129, "lon": 77.2295, "tags": {"tourism": "museum", "name": "National Museum"}},
+        {"id": 102, "lat": 28.5933, "lon": 77.2507, "tags": {"tourism": "museum", "name": "Humayun's Tomb Museum"}},
+        {"id": 103, "lat": 28.6507, "lon": 77.2334, "tags": {"amenity": "place_of_worship", "name": "Jama Masjid"}},
+        {"id": 104, "lat": 28.5535, "lon": 77.2588, "tags": {"amenity": "place_of_worship", "name": "Lotus Temple"}},
+        {"id": 105, "lat": 28.6505, "lon": 77.2303, "tags": {"amenity": "restaurant", "name": "Karim's"}},
+        {"id": 106, "lat": 28.6315, "lon": 77.2167, "tags": {"amenity": "restaurant", "name": "Saravana Bhavan"}},
+        {"id": 107, "lat": 28.5931, "lon": 77.2197, "tags": {"leisure": "park", "name": "Lodhi Garden"}}
+    ]
+}
+
+FORECAST_RESPONSE = {
+    "daily": {
+        "time": [(date.today() + timedelta(days=i)).isoformat() for i in range(3)],
+        "temperature_2m_max": [26.3, 26.7, 25.1],
+        "temperature_2m_min": [15.1, 15.2, 14.8],
+        "precipitation_sum": [10.0, 0.0, 0.4]
+    }
+}
+
+
+def overpass_response(query: str):
+    """Return only the canned elements matching the query's tag filters."""
+    filters = re.findall(r'\["([^"]+)"="([^"]+)"\]', query)
+    elements = [
+        element for element in OVERPASS_RESPONSE["elements"]
+        if any(element["tags"].get(key) == value for key, value in filters)
+    ]
+    return {"elements": elements}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body go out as separate writes; without TCP_NODELAY, keep-alive
+    # clients stall ~40 ms per call on Nagle + delayed ACK
+    disable_nagle_algorithm = True
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        server = self.server
+
+        if self.path.startswith("/v1/forecast"):
+            with server.lock:
+                server.forecast_calls += 1
+                fail = server.fail_forecast
+            if server.delay:
+                time.sleep(server.delay)
+            if fail:
+                self._send_json({"error": "unavailable"}, status=503)
+            else:
+                self._send_json(FORECAST_RESPONSE)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        body = self._read_body()
+        server = self.server
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        if self.path.startswith("/api/interpreter"):
+            query = parse_qs(body.decode("utf-8")).get("data", [""])[0]
+            with server.lock:
+                server.overpass_calls += 1
+            self._send_json(overpass_response(query))
+        elif self.path.startswith("/webhook"):
+            with server.lock:
+                server.webhook_calls.append(json.loads(body or b"{}"))
+                fail = server.fail_next > 0
+                if fail:
+                    server.fail_next -= 1
+            if fail:
+                self._send_json({"error": "unavailable"}, status=503)
+            else:
+                self._send_json({"status": "received"})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port: int = 0, delay: float = 0.0):
+    """Start the stub on a background thread and return (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.fail_next = 0
+    server.fail_forecast = False
+    server.forecast_calls = 0
+    server.overpass_calls = 0
+    server.webhook_calls = []
+    server.lock = threading.Lock()
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8090
+    server, base_url = start_stub_server(port)
+
+    print(f"Stub remotes listening on {base_url}")
+    print(f"  OVERPASS_URL={base_url}/api/interpreter")
+    print(f"  OPEN_METEO_URL={base_url}/v1/forecast")
+    print(f"  N8N_WEBHOOK_URL={base_url}/webhook")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to the path so we can import the modules
+sys.path.append('.')
+
+from stub_remotes import start_stub_server
+
+# Point every remote at the local stub; short backoff keeps the test quick
+server, base_url = start_stub_server()
+data_dir = tempfile.mkdtemp()
+os.environ["OVERPASS_URL"] = f"{base_url}/api/interpreter"
+os.environ["OPEN_METEO_URL"] = f"{base_url}/v1/forecast"
+os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook"
+os.environ["POI_STORE_PATH"] = os.path.join(data_dir, "poi_store.sqlite3")
+os.environ["JOB_DB_PATH"] = os.path.join(data_dir, "jobs.sqlite3")
+os.environ["JOB_RETRY_BACKOFF"] = "0.1"
+os.environ["JOB_MAX_ATTEMPTS"] = "3"
+os.environ["JOB_POLL_INTERVAL"] = "0.05"
+os.environ.setdefault("GEMINI_API_KEY", "stub-key")
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+
+def wait_for(client, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/export-jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "dead"):
+            return job
+        time.sleep(0.05)
+    return job
+
+
+def main():
+    print("=== Export Job Queue Test (local stub webhook) ===")
+
+    with TestClient(app) as client:
+        trip_id = client.post("/plan-trip", json={
+            "city": "Delhi",
+            "interests": ["history", "food"],
+            "days": 2,
+            "pace": "relaxed"
+        }).json()["trip_id"]
+
+        # 1. Enqueue returns at once with a job ID
+        start = time.perf_counter()
+        response = client.post("/export-itinerary", json={"email": "test@example.com", "trip_id": trip_id})
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        job_id = response.json()["data"]["job_id"]
+        print(f"1. Enqueued: {response.status_code == 202} - job {job_id} in {elapsed_ms:.1f} ms")
+
+        job = wait_for(client, job_id)
+        print(f"2. Delivered: {job['status'] == 'succeeded'} - {job['result']}")
+
+        # 3. Two failures, then success on the third attempt
+        server.fail_next = 2
+        job_id = client.post("/export-itinerary", json={"email": "retry@example.com", "trip_id": trip_id}).json()["data"]["job_id"]
+        job = wait_for(client, job_id)
+        print(f"3. Retried with backoff: {job['status'] == 'succeeded' and job['attempts'] == 3} - attempts {job['attempts']}")
+
+        # 4. Failing every attempt lands in the dead-letter table
+        server.fail_next = 3
+        job_id = client.post("/export-itinerary", json={"email": "dead@example.com", "trip_id": trip_id}).json()["data"]["job_id"]
+        job = wait_for(client, job_id)
+        dead = client.get("/export-jobs/dead-letters").json()["dead_letters"]
+        print(f"4. Dead-lettered: {job['status'] == 'dead' and any(d['job_id'] == job_id for d in dead)} - {job['last_error'][:60]}")
+
+        # 5. A batch queues one job per distinct recipient
+        response = client.post("/export-itinerary/batch", json={
+            "emails": ["a@example.com", "b@example.com", "a@example.com"],
+            "trip_id": trip_id
+        })
+        data = response.json()["data"]
+        jobs = [wait_for(client, job_id) for job_id in data["job_ids"]]
+        print(f"5. Batch queued: {response.status_code == 202 and len(jobs) == 2 and all(job['status'] == 'succeeded' for job in jobs)}"
+              f" - {len(jobs)} jobs")
+
+        # Per-recipient outcome; a recipient failing every attempt does not fail the others
+        server.fail_next = 3
+        response = client.post("/export-itinerary/batch", json={"emails": ["dead@example.com"], "trip_id": trip_id})
+        wait_for(client, response.json()["data"]["job_ids"][0])
+        failed = client.get(f"/export-jobs/batch/{response.json()['data']['batch_id']}").json()
+        sent = client.get(f"/export-jobs/batch/{data['batch_id']}").json()
+        statuses_ok = (
+            sent["sent"] == 2
+            and [r["email"] for r in sent["recipients"]] == ["a@example.com", "b@example.com"]
+            and failed["failed"] == 1 and failed["recipients"][0]["status"] == "failed"
+            and client.get("/export-jobs/batch/nope").status_code == 404
+        )
+        print(f"   Batch status: {statuses_ok} - sent {sent['sent']}, failed {failed['failed']}")
+        delivered = [call for call in server.webhook_calls if call["email"] in ("a@example.com", "b@example.com")]
+        print(f"   Batch payloads carry the trip: {all(call['trip']['trip_id'] == trip_id for call in delivered)}")
+
+        print(f"6. Unknown job: {client.get('/export-jobs/nope').status_code == 404}")
+        print(f"\nQueue stats: {client.get('/metrics').json()['export_jobs']}")
+        print(f"Webhook calls received: {len(server.webhook_calls)}")
+
+    server.shutdown()
+    print("\n=== All tests completed ===")
+
+
+if __name__ == "__main__":
+    main()
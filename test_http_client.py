@@ -0,0 +1,77 @@
+import os
+import sys
+import asyncio
+import tempfile
+import time
+
+# Add the current directory to the path so we can import the modules
+sys.path.append('.')
+
+from stub_remotes import start_stub_server
+
+# Point every remote at the local stub before the app reads its config
+server, base_url = start_stub_server()
+os.environ["OVERPASS_URL"] = f"{base_url}/api/interpreter"
+os.environ["OPEN_METEO_URL"] = f"{base_url}/v1/forecast"
+os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook"
+os.environ["POI_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "poi_store.sqlite3")
+os.environ["JOB_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+os.environ["JOB_RETRY_BACKOFF"] = "0.1"
+os.environ.setdefault("GEMINI_API_KEY", "stub-key")
+
+from fastapi.testclient import TestClient
+from app.mcp.http_client import http_client
+from app.mcp.poi_search import search_pois_async, POISearchInput
+from app.mcp.weather import get_delhi_weather_async
+
+
+async def run_async_tools():
+    pois = await search_pois_async(
+        POISearchInput(city="Delhi", interests=["history", "culture"], max_results=10)
+    )
+    weather = await get_delhi_weather_async()
+    await http_client.stop()
+    return pois, weather
+
+
+def main():
+    print("=== Async HTTP Client Test (local stub remotes) ===")
+    print(f"Stub: {base_url}")
+
+    pois, weather = asyncio.run(run_async_tools())
+    print(f"1. search_pois_async: {len(pois) == 4} - {[p.name for p in pois]}")
+    print(f"2. get_delhi_weather_async: {len(weather.forecast) == 3} - {weather.forecast[0]}")
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.get("/test-weather")
+        print(f"3. /test-weather: {response.status_code == 200}")
+
+        response = client.post("/plan-trip", json={
+            "city": "Delhi",
+            "interests": ["history", "food"],
+            "days": 2,
+            "pace": "relaxed"
+        })
+        print(f"4. /plan-trip: {response.status_code == 200}")
+        trip_id = response.json()["trip_id"]
+
+        # First webhook attempt fails with 503 and is retried by the export job queue
+        server.fail_next = 1
+        response = client.post("/export-itinerary", json={"email": "test@example.com", "trip_id": trip_id})
+        job_id = response.json()["data"]["job_id"]
+        for _ in range(100):
+            job = client.get(f"/export-jobs/{job_id}").json()
+            if job["status"] in ("succeeded", "dead"):
+                break
+            time.sleep(0.1)
+        print(f"5. /export-itinerary (retried): {response.status_code == 202 and job['status'] == 'succeeded'} - {job['result']}")
+        print(f"   Webhook calls received: {len(server.webhook_calls)}")
+
+    server.shutdown()
+    print("\n=== All tests completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,9 @@ from unittest.mock import patch
 # Add the current directory to the path so we can import the modules
 sys.path.append('.')
 
-from app.mcp.weather_adjustment import adjust_for_weather, RAIN_THRESHOLD
+from datetime import date, timedelta
+
+from app.mcp.weather_adjustment import adjust_for_weather, rainy_day_indexes, RAIN_THRESHOLD
 from app.mcp.weather import get_delhi_weather
 from app.state import TripState, TripConstraints, DayPlan, POIBlock
 
@@ -56,9 +58,34 @@ def create_mock_trip():
     
     return trip
 
+def check_future_start_date():
+    """A trip starting next week must be checked against its own dates, not today's."""
+    from app.mcp.weather import WeatherDay, WeatherOutput
+
+    trip = create_mock_trip()
+    today = date.today()
+    trip.constraints.start_date = today + timedelta(days=7)
+
+    # Rain today and on the trip's day 2; the trip's day 1 is dry, and the
+    # forecast ends before the trip's last day
+    forecast = [
+        WeatherDay(date=(today + timedelta(days=offset)).isoformat(), max_temp=25.0, min_temp=15.0,
+                   precipitation=10.0 if offset in (0, 8) else 0.0)
+        for offset in range(9)
+    ]
+    trip.days.append(DayPlan(day=3, blocks=[]))
+
+    with patch('app.mcp.weather_adjustment.get_city_weather', return_value=WeatherOutput(forecast=forecast)):
+        rainy = rainy_day_indexes(trip)
+
+    print(f"Future start date: {rainy == [1]} - rainy day indexes {rainy} (expected [1]: day 2 only)")
+
+
 def main():
     print("=== Weather Adjustment Test with Rainy Forecast ===")
     print(f"Rain threshold: {RAIN_THRESHOLD} mm")
+
+    check_future_start_date()
     
     # Create a mock trip
     trip = create_mock_trip()
@@ -72,13 +99,14 @@ def main():
             print(f"    - {block.name} ({'indoor' if block.indoor else 'outdoor'})")
     
     # Mock the weather function to return rainy forecast
-    with patch('app.mcp.weather_adjustment.get_delhi_weather') as mock_weather:
+    with patch('app.mcp.weather_adjustment.get_city_weather') as mock_weather:
         # Create mock WeatherDay objects
         from app.mcp.weather import WeatherDay, WeatherOutput
         
+        # Forecast days are matched to trip days by date
         mock_forecast = [
-            WeatherDay(date='2026-02-21', max_temp=26.3, min_temp=15.1, precipitation=10.0),  # 10mm - above threshold
-            WeatherDay(date='2026-02-22', max_temp=26.7, min_temp=15.2, precipitation=0.0)   # 0mm - below threshold
+            WeatherDay(date=trip.constraints.date_of(1).isoformat(), max_temp=26.3, min_temp=15.1, precipitation=10.0),  # 10mm - above threshold
+            WeatherDay(date=trip.constraints.date_of(2).isoformat(), max_temp=26.7, min_temp=15.2, precipitation=0.0)   # 0mm - below threshold
         ]
         
         mock_weather.return_value = WeatherOutput(forecast=mock_forecast)
@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+
+# Add the current directory to the path so we can import the modules
+sys.path.append('.')
+
+from stub_remotes import start_stub_server
+
+# Point every remote at the local stub
+server, base_url = start_stub_server()
+data_dir = tempfile.mkdtemp()
+os.environ["OVERPASS_URL"] = f"{base_url}/api/interpreter"
+os.environ["OPEN_METEO_URL"] = f"{base_url}/v1/forecast"
+os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook"
+os.environ["POI_STORE_PATH"] = os.path.join(data_dir, "poi_store.sqlite3")
+os.environ["JOB_DB_PATH"] = os.path.join(data_dir, "jobs.sqlite3")
+os.environ.setdefault("GEMINI_API_KEY", "stub-key")
+
+from fastapi.testclient import TestClient
+from app.main import app, orchestrator
+from calibrate_duration_model import load_trips, logged_visits
+
+
+def main():
+    print("=== Record Visit Test (local stub remotes) ===")
+
+    with TestClient(app) as client:
+        trip = client.post("/plan-trip", json={
+            "city": "Delhi",
+            "interests": ["history", "food"],
+            "days": 2,
+            "pace": "relaxed"
+        }).json()
+        trip_id = trip["trip_id"]
+        block = trip["days"][0]["blocks"][0]
+
+        # 1. Recording a visit stores the minutes on that block only
+        response = client.post("/record-visit", json={
+            "trip_id": trip_id, "day": 1, "poi_id": block["poi_id"], "actual_minutes": 47
+        })
+        blocks = [b for day in response.json()["days"] for b in day["blocks"]]
+        recorded = [b for b in blocks if b["actual_minutes"] is not None]
+        print(f"1. Visit recorded: {response.status_code == 200 and len(recorded) == 1} - "
+              f"{recorded[0]['name']}: {recorded[0]['actual_minutes']} min")
+
+        # 2. Calibration fits on the logged minutes and skips the rest
+        trips_path = os.path.join(data_dir, "trips.jsonl")
+        with open(trips_path, "w", encoding="utf-8") as f:
+            f.write(orchestrator.get_trip(trip_id).model_dump_json() + "\n")
+        visits = list(logged_visits(load_trips(trips_path)))
+        print(f"2. Calibration sees only logged visits: "
+              f"{len(visits) == 1 and visits[0][0] == block['category'] and visits[0][3] == 47} - "
+              f"{len(visits)} of {len(blocks)} block(s)")
+
+        # 3. Bad requests are rejected without touching the trip
+        bad_requests = {
+            "day out of range": {"day": 9, "poi_id": block["poi_id"], "actual_minutes": 30},
+            "day not a number": {"day": "1", "poi_id": block["poi_id"], "actual_minutes": 30},
+            "unknown poi_id": {"day": 1, "poi_id": "no-such-poi", "actual_minutes": 30},
+            "zero minutes": {"day": 1, "poi_id": block["poi_id"], "actual_minutes": 0},
+            "negative minutes": {"day": 1, "poi_id": block["poi_id"], "actual_minutes": -5}
+        }
+        for label, payload in bad_requests.items():
+            response = client.post("/record-visit", json={"trip_id": trip_id, **payload})
+            print(f"3. Rejected {label}: {response.status_code == 400} - {response.json()['detail']}")
+
+        unchanged = orchestrator.get_trip(trip_id).days[0].blocks[0].actual_minutes == 47
+        print(f"   Recorded minutes unchanged: {unchanged}")
+
+    server.shutdown()
+    print("\n=== All tests completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the current directory to the path so we can import the modules
+sys.path.append('.')
+
+from stub_remotes import start_stub_server
+
+# Slow stub Overpass so concurrent plan requests overlap
+server, base_url = start_stub_server(delay=0.5)
+os.environ["OVERPASS_URL"] = f"{base_url}/api/interpreter"
+os.environ["OPEN_METEO_URL"] = f"{base_url}/v1/forecast"
+os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook"
+os.environ["POI_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "poi_store.sqlite3")
+os.environ.setdefault("GEMINI_API_KEY", "stub-key")
+
+from fastapi.testclient import TestClient
+from app.main import app, orchestrator
+
+
+def main():
+    print("=== Request Coalescing Test (local stub remotes) ===")
+
+    payload = {"city": "Delhi", "interests": ["history", "food"], "days": 2, "pace": "relaxed"}
+
+    with TestClient(app) as client:
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            responses = list(pool.map(lambda _: client.post("/plan-trip", json=payload), range(10)))
+
+        trips = [response.json() for response in responses]
+        print(f"1. All requests succeeded: {all(r.status_code == 200 for r in responses)}")
+        print(f"2. Same itinerary for all: {all(t['days'] == trips[0]['days'] for t in trips)}")
+        print(f"3. Distinct trip IDs: {len({t['trip_id'] for t in trips}) == len(trips)}")
+
+        coalescing = client.get("/metrics").json()["coalescing"]
+        plan = coalescing["plan_trip"]
+        print(f"4. Plans computed: {plan['calls']}, coalesced: {plan['coalesced']} - "
+              f"{plan['calls'] + plan['coalesced'] == len(trips) and plan['coalesced'] > 0}")
+        print(f"   search_pois: {coalescing['search_pois']}")
+
+        # The cold POI store is seeded by one Overpass refresh, not one per request
+        different = client.post("/plan-trip", json={**payload, "interests": ["culture", "nature"]})
+        print(f"5. Overpass calls for a cold store: {server.overpass_calls == 1 and different.status_code == 200}"
+              f" - {server.overpass_calls}")
+
+        # Each trip has its own day list; the immutable days are shared
+        first = orchestrator.get_trip(trips[0]["trip_id"])
+        second = orchestrator.get_trip(trips[1]["trip_id"])
+        first.days[0] = first.days[0].renumbered(99)
+        print(f"6. Trips are independent: {second.days[0].day == 1 and first.days is not second.days}")
+
+    server.shutdown()
+    print("\n=== All tests completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -48,7 +48,8 @@ def test_streamlit_extensions():
     # Test 3: Voice command - EXPLAIN intent
     print("\n3. Testing voice command - EXPLAIN intent...")
     voice_explain = requests.post(f"{base_url}/voice-command", json={
-        "text": "Explain the itinerary"
+        "text": "Explain the itinerary",
+        "trip_id": trip_data.get("trip_id")
     })
     
     if voice_explain.status_code == 200:
@@ -81,7 +82,8 @@ def test_streamlit_extensions():
     # Test 5: Weather adjustment via voice command
     print("\n5. Testing weather adjustment via voice command...")
     weather_voice = requests.post(f"{base_url}/voice-command", json={
-        "text": "What if it rains?"
+        "text": "What if it rains?",
+        "trip_id": trip_data.get("trip_id")
     })
     
     if weather_voice.status_code == 200:
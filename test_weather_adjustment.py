@@ -21,7 +21,8 @@ if response.status_code == 200:
     # Test the weather adjustment
     print("\nTesting weather adjustment...")
     voice_response = requests.post('http://localhost:8000/voice-command', json={
-        'text': 'What if it rains?'
+        'text': 'What if it rains?',
+        'trip_id': trip_data.get('trip_id')
     })
     
     if voice_response.status_code == 200:
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+# Add the current directory to the path so we can import the modules
+sys.path.append('.')
+
+from stub_remotes import start_stub_server
+
+# Slow stub open-meteo so concurrent callers overlap
+server, base_url = start_stub_server(delay=0.5)
+os.environ["OPEN_METEO_URL"] = f"{base_url}/v1/forecast"
+os.environ["POI_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "poi_store.sqlite3")
+os.environ.setdefault("GEMINI_API_KEY", "stub-key")
+
+from app.mcp.weather import (
+    get_weather, get_delhi_weather, get_delhi_weather_async, weather_cache, weather_flight, _cache_key, DELHI_LAT, DELHI_LON
+)
+
+
+def main():
+    print("=== Weather Cache Test (local stub open-meteo) ===")
+
+    # 1. Twenty concurrent callers in one bucket -> one upstream fetch
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(lambda _: get_delhi_weather(), range(20)))
+    print(f"1. Coalesced cold fetch: {server.forecast_calls == 1} - "
+          f"{server.forecast_calls} upstream call(s), {weather_flight.stats()}")
+    print(f"   Same forecast for all callers: {all(r is results[0] for r in results)}")
+
+    # 2. Nearby coordinates share the bucket
+    start = time.perf_counter()
+    get_weather(DELHI_LAT + 0.02, DELHI_LON - 0.02)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"2. Nearby point served from cache: {server.forecast_calls == 1} ({elapsed_ms:.2f} ms)")
+
+    # 3. Upstream down with no entry for today -> yesterday's forecast
+    key = _cache_key(DELHI_LAT, DELHI_LON)
+    yesterday = _cache_key(DELHI_LAT, DELHI_LON, date.today() - timedelta(days=1))
+    weather_cache.set(yesterday, weather_cache.get(key))
+    weather_cache.invalidate(key)
+    server.fail_forecast = True
+    fallback = get_delhi_weather()
+    print(f"3. Stale fallback on error: {len(fallback.forecast) > 0} - {len(fallback.forecast)} day(s)")
+
+    # 4. Upstream down and nothing cached -> error surfaces
+    weather_cache.clear()
+    try:
+        get_delhi_weather()
+        print("4. Error without cache: False")
+    except Exception as e:
+        print(f"4. Error without cache: True - {type(e).__name__}")
+
+    # 5. Async callers share one fetch over the async client
+    server.fail_forecast = False
+    calls_before = server.forecast_calls
+
+    async def fetch_concurrently():
+        return await asyncio.gather(*(get_delhi_weather_async() for _ in range(20)))
+
+    results = asyncio.run(fetch_concurrently())
+    print(f"5. Coalesced async fetch: {server.forecast_calls - calls_before == 1} - "
+          f"{server.forecast_calls - calls_before} upstream call(s), "
+          f"same forecast: {all(r is results[0] for r in results)}")
+
+    # 6. A stale async hit is served at once and refreshed in the background
+    key = _cache_key(DELHI_LAT, DELHI_LON)
+    value, _ = weather_cache._entries[key]
+    weather_cache._entries[key] = (value, time.monotonic() - weather_cache.ttl - 1)
+    calls_before = server.forecast_calls
+
+    start = time.perf_counter()
+    stale = asyncio.run(get_delhi_weather_async())
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    deadline = time.monotonic() + 5
+    while weather_cache.refreshes < 1 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    print(f"6. Stale async hit without waiting: {stale is value and elapsed_ms < 100} ({elapsed_ms:.2f} ms), "
+          f"revalidated: {weather_cache.refreshes == 1 and server.forecast_calls - calls_before == 1}")
+
+    print(f"\nCache stats: {weather_cache.stats()}")
+    server.shutdown()
+    print("\n=== All tests completed ===")
+
+
+if __name__ == "__main__":
+    main()